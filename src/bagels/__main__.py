@@ -1,17 +1,29 @@
+from datetime import datetime, timedelta
 from pathlib import Path
-from time import sleep
 
 import click
 from rich.progress import (
     BarColumn,
+    MofNCompleteColumn,
     Progress,
+    ProgressColumn,
     TaskProgressColumn,
     TextColumn,
     TimeRemainingColumn,
 )
+from rich.text import Text
 
 from bagels.locations import config_file, database_file, set_custom_root
-from bagels.versioning import get_current_version, get_pypi_version, needs_update
+
+
+class RowsPerSecondColumn(ProgressColumn):
+    """Renders the rate of a task counting rows."""
+
+    def render(self, task) -> Text:
+        speed = task.finished_speed or task.speed
+        if speed is None:
+            return Text("? rows/s", style="progress.data.speed")
+        return Text(f"{speed:,.0f} rows/s", style="progress.data.speed")
 
 
 @click.group(invoke_without_command=True)
@@ -43,17 +55,34 @@ def cli(ctx, at: Path | None, migrate: str | None, source: Path | None):
         if migrate == "actualbudget":
             try:
                 click.echo(f"Starting migration from {source}")
-                from bagels.models.database.app import init_db
+                _init_storage()
 
-                init_db()
-
-                from bagels.locations import database_file
                 from bagels.migrations.migrate_actualbudget import (
                     BudgetToBagelsMigration,
                 )
 
                 migrator = BudgetToBagelsMigration(str(source), str(database_file()))
-                migrator.migrate()
+                with Progress(
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    MofNCompleteColumn(),
+                    RowsPerSecondColumn(),
+                    TimeRemainingColumn(),
+                    transient=True,
+                ) as progress:
+                    task = progress.add_task(
+                        "Migrating transactions...",
+                        total=migrator.count_transactions(),
+                    )
+                    migrator.migrate(
+                        on_progress=lambda rows: progress.advance(task, rows)
+                    )
+
+                from bagels.migrations.migrate_actualbudget import (
+                    rebuild_derived_data,
+                )
+
+                rebuild_derived_data()
                 click.echo(click.style("Migration completed successfully!", fg="green"))
                 return
             except Exception as e:
@@ -74,29 +103,6 @@ def cli(ctx, at: Path | None, migrate: str | None, source: Path | None):
 
             load_config()
 
-            from bagels.config import CONFIG
-
-            if CONFIG.state.check_for_updates:
-                progress.update(task, advance=1, description="Checking for updates...")
-
-                if needs_update():
-                    new = get_pypi_version()
-                    cur = get_current_version()
-                    click.echo(
-                        click.style(
-                            f"New version available ({cur} -> {new})! Update with:",
-                            fg="yellow",
-                        )
-                    )
-                    click.echo(click.style("```uv tool upgrade bagels```", fg="cyan"))
-                    click.echo(
-                        click.style(
-                            "You can disable this check in-app using the command palette.",
-                            fg="bright_black",
-                        )
-                    )
-                    sleep(2)
-
             progress.update(task, advance=1, description="Initializing database...")
 
             from bagels.models.database.app import init_db
@@ -123,5 +129,424 @@ def locate(thing_to_locate: str) -> None:
         print(database_file())
 
 
+def _init_storage() -> None:
+    """Loads the configuration and database for commands that run outside the app."""
+    from bagels.config import load_config
+
+    load_config()
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+
+
+@cli.group()
+def db() -> None:
+    """Database maintenance commands."""
+
+
+@db.command("balances")
+@click.option(
+    "--rebuild", is_flag=True, help="Recompute the balance ledger from scratch."
+)
+@click.pass_context
+def db_balances(ctx, rebuild: bool) -> None:
+    """Verify the account balance ledger against the full record history."""
+    _init_storage()
+
+    from bagels.managers.accounts import (
+        rebuild_account_balances,
+        verify_account_balances,
+    )
+
+    if rebuild:
+        count = rebuild_account_balances()
+        click.echo(f"Rebuilt balances of {count} accounts.")
+
+    mismatches = verify_account_balances()
+    if not mismatches:
+        click.echo(click.style("Account balances are consistent.", fg="green"))
+        return
+
+    for account, ledger_balance, computed_balance in mismatches:
+        click.echo(
+            click.style(
+                f"{account.name}: ledger {ledger_balance} != computed {computed_balance}",
+                fg="red",
+            )
+        )
+    click.echo("Run `bagels db balances --rebuild` to fix.")
+    ctx.exit(1)
+
+
+@db.command("totals")
+@click.option(
+    "--rebuild", is_flag=True, help="Recompute the monthly totals from scratch."
+)
+@click.pass_context
+def db_totals(ctx, rebuild: bool) -> None:
+    """Verify the monthly totals against the full record history."""
+    _init_storage()
+
+    from bagels.managers.monthly_totals import (
+        rebuild_monthly_totals,
+        verify_monthly_totals,
+    )
+
+    if rebuild:
+        count = rebuild_monthly_totals()
+        click.echo(f"Rebuilt {count} monthly totals.")
+
+    mismatches = verify_monthly_totals()
+    if not mismatches:
+        click.echo(click.style("Monthly totals are consistent.", fg="green"))
+        return
+
+    for key, stored_amount, computed_amount in mismatches:
+        click.echo(
+            click.style(
+                f"{key}: stored {stored_amount} != computed {computed_amount}",
+                fg="red",
+            )
+        )
+    click.echo("Run `bagels db totals --rebuild` to fix.")
+    ctx.exit(1)
+
+
+@db.command("pragmas")
+def db_pragmas() -> None:
+    """Show the SQLite settings in effect, as configured in the database section."""
+    _init_storage()
+
+    from bagels.config import CONFIG
+    from bagels.models.database.app import get_pragmas
+
+    for pragma, value in get_pragmas().items():
+        configured = getattr(CONFIG.database, pragma)
+        click.echo(f"{pragma}: {value} (configured: {configured})")
+
+
+@db.command("plans")
+@click.option(
+    "--compare",
+    is_flag=True,
+    help="Also show the plans without the managed indexes.",
+)
+def db_plans(compare: bool) -> None:
+    """Show how SQLite executes the most frequent lookups."""
+    _init_storage()
+
+    from bagels.models.database.app import get_query_plans, get_unindexed_query_plans
+
+    plans = get_query_plans()
+    unindexed = get_unindexed_query_plans() if compare else {}
+    for name, steps in plans.items():
+        click.echo(click.style(name, bold=True))
+        if compare:
+            for step in unindexed[name]:
+                click.echo(click.style(f"  before: {step}", fg="red"))
+        for step in steps:
+            click.echo(
+                click.style(f"  {'after: ' if compare else ''}{step}", fg="green")
+            )
+
+
+@cli.command("import")
+@click.argument(
+    "statement", type=click.Path(exists=True, dir_okay=False, path_type=Path)
+)
+@click.option("--account", help="Account to import into, unless set by a rule.")
+@click.option(
+    "--rules",
+    "rules_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="YAML file of CSV columns, account names and categorization rules.",
+)
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "ofx", "qif"]),
+    help="Statement format. Defaults to the file extension.",
+)
+@click.option(
+    "--dry-run", is_flag=True, help="Count what would be imported, without saving."
+)
+@click.pass_context
+def import_command(
+    ctx,
+    statement: Path,
+    account: str | None,
+    rules_file: Path | None,
+    file_format: str | None,
+    dry_run: bool,
+) -> None:
+    """Import a CSV, OFX or QIF bank statement, skipping lines already recorded."""
+    _init_storage()
+
+    from bagels.importers.rules import StatementImportError, load_rules
+    from bagels.importers.statement import import_statement
+
+    try:
+        with Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            RowsPerSecondColumn(),
+            transient=True,
+        ) as progress:
+            task = progress.add_task(f"Importing {statement.name}...", total=None)
+            result = import_statement(
+                statement,
+                load_rules(rules_file),
+                account=account,
+                file_format=file_format,
+                dry_run=dry_run,
+                on_progress=lambda rows: progress.advance(task, rows),
+            )
+    except StatementImportError as e:
+        click.echo(click.style(f"Import failed: {e}", fg="red"))
+        ctx.exit(1)
+
+    click.echo(
+        click.style(
+            f"{'Would import' if dry_run else 'Imported'} {result.imported} records, "
+            f"skipped {result.duplicates} already recorded and {result.skipped} by rules.",
+            fg="green",
+        )
+    )
+
+
+@cli.command("export")
+@click.argument(
+    "directory", type=click.Path(file_okay=False, path_type=Path), default="export"
+)
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "jsonl", "parquet", "arrow"]),
+    default="csv",
+    show_default=True,
+    help="File format. Parquet and Arrow need pyarrow.",
+)
+@click.option(
+    "--table",
+    "tables",
+    multiple=True,
+    type=click.Choice(["records", "splits", "accounts", "categories", "persons"]),
+    help="Table to export, repeatable. Defaults to all of them.",
+)
+@click.option(
+    "--from",
+    "start",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only export records and splits from this date.",
+)
+@click.option(
+    "--to",
+    "end",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only export records and splits until this date, included.",
+)
+@click.option(
+    "--account",
+    "account_names",
+    multiple=True,
+    help="Only export records and splits from or to this account, repeatable.",
+)
+@click.pass_context
+def export_command(
+    ctx,
+    directory: Path,
+    file_format: str,
+    tables: tuple[str, ...],
+    start: datetime | None,
+    end: datetime | None,
+    account_names: tuple[str, ...],
+) -> None:
+    """Export the ledger to a directory, one file per table."""
+    _init_storage()
+
+    from bagels.exporters.ledger import LedgerExportError, export_ledger
+
+    try:
+        with Progress(
+            TextColumn("[progress.description]{task.description}"),
+            MofNCompleteColumn(),
+            RowsPerSecondColumn(),
+            transient=True,
+        ) as progress:
+            tasks = {}
+
+            def on_progress(table: str, rows: int) -> None:
+                if table not in tasks:
+                    tasks[table] = progress.add_task(
+                        f"Exporting {table}...", total=None
+                    )
+                progress.advance(tasks[table], rows)
+
+            counts = export_ledger(
+                directory,
+                file_format,
+                tables=list(tables) or None,
+                start=start,
+                end=end + timedelta(days=1) if end else None,
+                account_names=list(account_names) or None,
+                on_progress=on_progress,
+            )
+    except LedgerExportError as e:
+        click.echo(click.style(f"Export failed: {e}", fg="red"))
+        ctx.exit(1)
+
+    for table, count in counts.items():
+        click.echo(f"{table}: {count} rows")
+    click.echo(click.style(f"Exported to {directory.resolve()}", fg="green"))
+
+
+@cli.command("profile-startup")
+@click.option(
+    "--top", default=15, show_default=True, help="Packages and modules to list."
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the profile as JSON.")
+@click.option("--child", is_flag=True, hidden=True)
+@click.pass_context
+def profile_startup_command(ctx, top: int, as_json: bool, child: bool) -> None:
+    """Time each phase of startup until the first frame, and the imports behind it."""
+    import json
+
+    from bagels.startup import profile_startup, run_startup_phases
+
+    if child:
+        click.echo(json.dumps(run_startup_phases()))
+        return
+
+    profile = profile_startup(ctx.parent.params["at"], top)
+    if as_json:
+        click.echo(json.dumps(profile, indent=2))
+        return
+
+    imports = profile["imports"]
+    sections = {
+        f"Startup: {profile['total']:.0f} ms": profile["phases"],
+        f"Imports: {imports['total']:.0f} ms in {imports['modules']} modules, by package": imports[
+            "packages"
+        ],
+        "Bagels modules, with their imports": imports["bagels"],
+        "Slowest modules": imports["slowest"],
+    }
+    for title, times in sections.items():
+        click.echo(click.style(title, bold=True))
+        for name, ms in times.items():
+            click.echo(f"  {ms:>9.1f} ms  {name}")
+    click.echo(
+        click.style(
+            "Import times are measured with -X importtime, which adds some overhead.",
+            fg="bright_black",
+        )
+    )
+
+
+@cli.group()
+def bench() -> None:
+    """Generate synthetic data and benchmark the app against it."""
+
+
+@bench.command("generate")
+@click.option(
+    "--records",
+    type=click.IntRange(min=0),
+    default=10000,
+    show_default=True,
+    help="Records to create.",
+)
+@click.option(
+    "--accounts",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Accounts to create.",
+)
+@click.option(
+    "--people",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="People to create.",
+)
+@click.option(
+    "--years",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Years the records span, until today.",
+)
+@click.option("--seed", default=0, show_default=True, help="Random seed.")
+@click.option(
+    "--into-current-db",
+    is_flag=True,
+    help="Add the ledger to the current database rather than requiring --at.",
+)
+@click.pass_context
+def bench_generate(
+    ctx,
+    records: int,
+    accounts: int,
+    people: int,
+    years: int,
+    seed: int,
+    into_current_db: bool,
+) -> None:
+    """Add a synthetic ledger to the database of the directory given with --at."""
+    if ctx.find_root().params.get("at") is None and not into_current_db:
+        # the ledger cannot be told apart from real data once added
+        raise click.UsageError(
+            f"This would add {records} synthetic records to {database_file()} and "
+            "reset its balances. Pass --at with a separate directory, or "
+            "--into-current-db to add them anyway."
+        )
+    _init_storage()
+
+    from bagels.managers.samples import create_synthetic_entries
+
+    counts = create_synthetic_entries(records, accounts, people, years, seed)
+    click.echo(", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+@bench.command("run")
+@click.option("--repeat", default=5, show_default=True, help="Runs per benchmark.")
+@click.option(
+    "--sizes",
+    help="Comma separated record counts to generate and benchmark, each in a temporary directory, instead of the current database.",
+)
+@click.option(
+    "--home/--no-home", default=True, help="Whether to benchmark Home.rebuild."
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the JSON results to a file instead of stdout.",
+)
+def bench_run(repeat: int, sizes: str | None, home: bool, output: Path | None) -> None:
+    """Time the heaviest reads and print the results as JSON."""
+    import json
+
+    if sizes:
+        from bagels.benchmark import run_scaled_benchmarks
+
+        sizes = [int(size) for size in sizes.split(",")]
+        results = run_scaled_benchmarks(sizes, repeat=repeat, home=home)
+    else:
+        _init_storage()
+
+        from bagels.benchmark import run_benchmarks
+
+        results = run_benchmarks(repeat=repeat, home=home)
+
+    report = json.dumps(results, indent=2)
+    if output:
+        output.write_text(report)
+    else:
+        click.echo(report)
+
+
 if __name__ == "__main__":
     cli()
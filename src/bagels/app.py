@@ -1,6 +1,7 @@
+from importlib import import_module
 from importlib.metadata import metadata
 
-from textual import events, log, on
+from textual import events, log, on, work
 from textual.app import App as TextualApp
 from textual.app import ComposeResult
 from textual.command import CommandPalette
@@ -16,15 +17,15 @@ from textual.widgets import Footer, Label, Tab, Tabs
 from bagels.components.jump_overlay import JumpOverlay
 from bagels.components.jumper import Jumper
 from bagels.config import CONFIG, write_state
-from bagels.home import Home
 from bagels.locations import data_directory
-from bagels.manager import Manager
 from bagels.provider import AppProvider
 from bagels.themes import BUILTIN_THEMES, Theme
+from bagels.versioning import get_available_update
 
+# pages are imported when first opened, so the Manager's plots stay off startup
 PAGES = [
-    {"name": "Home", "class": Home},
-    {"name": "Manager", "class": Manager},
+    {"name": "Home", "module": "bagels.home", "class": "Home"},
+    {"name": "Manager", "module": "bagels.manager", "class": "Manager"},
 ]
 
 
@@ -84,6 +85,24 @@ class App(TextualApp):
             },
             screen=self.screen,
         )
+        # ------------- updates -------------- #
+        if CONFIG.state.check_for_updates and not self.is_testing:
+            self._check_for_updates()
+
+    @work(thread=True, exclusive=True, group="update-check", exit_on_error=False)
+    def _check_for_updates(self) -> None:
+        """Looks for a new version off the event loop, so startup never waits on the
+        network, and notifies of it."""
+        new = get_available_update()
+        if new:
+            self.call_from_thread(
+                self.notify,
+                f"Bagels {new} is available (you have {self.project_info['version']}). "
+                "Update with [b]uv tool upgrade bagels[/]. You can disable this check "
+                "using the command palette.",
+                title="New version",
+                timeout=10,
+            )
 
     # used by the textual app to get the theme variables
     def get_css_variables(self) -> dict[str, str]:
@@ -198,11 +217,12 @@ class App(TextualApp):
                 currentContent.remove()
             except NoMatches:
                 pass
-            page_class = next(
-                page["class"]
+            page = next(
+                page
                 for page in PAGES
                 if page["name"].lower() == event.tab.id.replace("tab-", "")
             )
+            page_class = getattr(import_module(page["module"]), page["class"])
             page_instance = page_class(classes="content")
             await self.mount(page_instance)
             self.query_one(".content").set_classes(f"content {self.layout}")
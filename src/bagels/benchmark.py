@@ -0,0 +1,160 @@
+import asyncio
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy import func, select
+
+from bagels.managers.accounts import get_all_accounts_with_balance
+from bagels.managers.cache import clear_cache
+from bagels.managers.categories import get_all_categories_records
+from bagels.managers.persons import get_persons_with_net_due
+from bagels.managers.records import get_daily_balance, get_records
+from bagels.models.account import Account
+from bagels.models.database.app import Session
+from bagels.models.person import Person
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.versioning import get_current_version
+
+
+def _daily_balance_this_year():
+    today = datetime.now()
+    return get_daily_balance(datetime(today.year, 1, 1), today + timedelta(days=1))
+
+
+BENCHMARKS = {
+    "get_records": lambda: get_records(offset=0, offset_type="year"),
+    "get_daily_balance": _daily_balance_this_year,
+    "get_all_accounts_with_balance": get_all_accounts_with_balance,
+    "get_persons_with_net_due": get_persons_with_net_due,
+    "get_all_categories_records": lambda: get_all_categories_records(
+        offset=0, offset_type="year", is_income=False
+    ),
+}
+
+
+# region Timing
+# -------------- timing -------------- #
+
+
+def _summarize(timings: list[float]) -> dict:
+    # in milliseconds
+    return {
+        "runs": len(timings),
+        "min": round(min(timings) * 1000, 3),
+        "median": round(statistics.median(timings) * 1000, 3),
+        "mean": round(statistics.mean(timings) * 1000, 3),
+        "max": round(max(timings) * 1000, 3),
+    }
+
+
+def _time(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        clear_cache()  # measure the queries, not the cache
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return _summarize(timings)
+
+
+async def _time_home_rebuild(repeat: int) -> dict:
+    from bagels.app import App
+    from bagels.home import Home
+
+    app = App(is_testing=True)
+    async with app.run_test(size=(140, 40)) as pilot:
+        await pilot.pause()
+        home = app.query_one(Home)
+        timings = []
+        for _ in range(repeat):
+            clear_cache()
+            start = perf_counter()
+            home.rebuild()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            timings.append(perf_counter() - start)
+    return _summarize(timings)
+
+
+# region Run
+# --------------- run ---------------- #
+
+
+def get_data_size() -> dict[str, int]:
+    session = Session()
+    try:
+        return {
+            model.__tablename__: session.scalar(select(func.count()).select_from(model))
+            for model in (Account, Person, Record, Split)
+        }
+    finally:
+        session.close()
+
+
+def run_benchmarks(repeat: int = 5, home: bool = True) -> dict:
+    """Times the heaviest reads against the current database.
+
+    Every run starts with an empty query cache. Timings are in milliseconds.
+    """
+    results = {name: _time(func, repeat) for name, func in BENCHMARKS.items()}
+    if home:
+        results["Home.rebuild"] = asyncio.run(_time_home_rebuild(repeat))
+
+    return {
+        "version": get_current_version(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "data": get_data_size(),
+        "results": results,
+    }
+
+
+def run_scaled_benchmarks(
+    sizes: list[int],
+    accounts: int = 3,
+    people: int = 5,
+    years: int = 5,
+    repeat: int = 5,
+    home: bool = True,
+) -> list[dict]:
+    """Benchmarks freshly generated ledgers of each size, each in its own process and data directory."""
+    reports = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            bagels = [sys.executable, "-m", "bagels", "--at", root, "bench"]
+            output = Path(root) / "benchmark.json"
+            subprocess.run(
+                [
+                    *bagels,
+                    "generate",
+                    f"--records={size}",
+                    f"--accounts={accounts}",
+                    f"--people={people}",
+                    f"--years={years}",
+                ],
+                check=True,
+                capture_output=True,
+            )
+            subprocess.run(
+                [
+                    *bagels,
+                    "run",
+                    f"--repeat={repeat}",
+                    f"--output={output}",
+                    *([] if home else ["--no-home"]),
+                ],
+                check=True,
+                capture_output=True,
+            )
+            reports.append(json.loads(output.read_text()))
+    return reports
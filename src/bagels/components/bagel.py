@@ -1,8 +1,6 @@
 from textual.app import ComposeResult
 from textual.widgets import Label, Static
 
-from bagels.bagel import get_string, phi_spacing, render_frame, theta_spacing
-
 
 class Bagel(Static):
     A = B = 1
@@ -17,6 +15,9 @@ class Bagel(Static):
             self.update_bagel()
 
     def update_bagel(self) -> None:
+        # numpy is slow to import, and the bagel is only shown without accounts
+        from bagels.bagel import get_string, phi_spacing, render_frame, theta_spacing
+
         bagel = self.query_one("#bagel")
         self.A += theta_spacing
         self.B += phi_spacing
@@ -252,6 +252,69 @@ class RowRenderables(NamedTuple):
     cells: list[RenderableType]
 
 
+class _LazyRowData(dict):
+    """The cells of the table, indexed by row key, where the cells of virtual rows
+    are only built the first time they are accessed.
+
+    Args:
+        on_materialize: Called with the key of a virtual row once its cells are built.
+    """
+
+    def __init__(self, on_materialize: Callable[[RowKey], None]) -> None:
+        super().__init__()
+        self._sources: dict[RowKey, Callable[[], dict[ColumnKey, Any]]] = {}
+        self._on_materialize = on_materialize
+
+    def add_source(
+        self, row_key: RowKey, source: Callable[[], dict[ColumnKey, Any]]
+    ) -> None:
+        """Register the function building the cells of a virtual row."""
+        self._sources[row_key] = source
+
+    def materialize_all(self) -> None:
+        """Build the cells of every virtual row."""
+        for row_key in list(self._sources):
+            self[row_key]
+
+    def __missing__(self, row_key: RowKey) -> dict[ColumnKey, Any]:
+        source = self._sources.pop(row_key)
+        cells = self[row_key] = source()
+        self._on_materialize(row_key)
+        return cells
+
+    def get(self, row_key: RowKey, default: Any = None) -> Any:
+        try:
+            return self[row_key]
+        except KeyError:
+            return default
+
+    def __contains__(self, row_key: object) -> bool:
+        return super().__contains__(row_key) or row_key in self._sources
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._sources)
+
+    def __iter__(self):
+        self.materialize_all()
+        return super().__iter__()
+
+    def __delitem__(self, row_key: RowKey) -> None:
+        if self._sources.pop(row_key, None) is None:
+            super().__delitem__(row_key)
+
+    def items(self):
+        self.materialize_all()
+        return super().items()
+
+    def values(self):
+        self.materialize_all()
+        return super().values()
+
+    def clear(self) -> None:
+        super().clear()
+        self._sources.clear()
+
+
 class DataTable(ScrollView, Generic[CellType], can_focus=True):
     """A tabular widget that contains data."""
 
@@ -284,6 +347,9 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
     | end | Move to the end position (rightmost column). |
     """
 
+    VIRTUAL_SAMPLE_SIZE: ClassVar[int] = 100
+    """Number of virtual rows measured up front to estimate the column widths."""
+
     COMPONENT_CLASSES: ClassVar[set[str]] = {
         "datatable--cursor",
         "datatable--hover",
@@ -700,11 +766,14 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """
 
         super().__init__(name=name, id=id, classes=classes, disabled=disabled)
-        self._data: dict[RowKey, dict[ColumnKey, CellType]] = {}
+        self._data: dict[RowKey, dict[ColumnKey, CellType]] = _LazyRowData(
+            self._on_virtual_row_materialized
+        )
         """Contains the cells of the table, indexed by row key and column key.
         The final positioning of a cell on screen cannot be determined solely by this
         structure. Instead, we must check _row_locations and _column_locations to find
-        where each cell currently resides in space."""
+        where each cell currently resides in space. The cells of virtual rows are only
+        built when first accessed, typically when the row scrolls into view."""
 
         self.columns: dict[ColumnKey, Column] = {}
         """Metadata about the columns of the table, indexed by their key."""
@@ -747,6 +816,10 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """Tracking newly added rows to be used in calculation of dimensions on idle."""
         self._updated_cells: set[CellKey] = set()
         """Track which cells were updated, so that we can refresh them once on idle."""
+        self._virtual_row_count = 0
+        """Number of virtual rows added since the table was last cleared."""
+        self._updating_dimensions = False
+        """Set while measuring rows, which may build the cells of virtual rows."""
 
         self._show_hover_cursor = False
         """Used to hide the mouse hover cursor when the user uses the keyboard."""
@@ -1375,6 +1448,8 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """
         console = self.app.console
         auto_height_rows: list[tuple[int, Row, list[RenderableType]]] = []
+        previous_widths = [column.content_width for column in self.columns.values()]
+        self._updating_dimensions = True
         for row_key in new_rows:
             row_index = self._row_locations.get(row_key)
 
@@ -1401,6 +1476,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
 
             if row.auto_height:
                 auto_height_rows.append((row_index, row, cells_in_row))
+        self._updating_dimensions = False
 
         # If there are rows that need to have their height computed, render them correctly
         # so that we can cache this rendering for later.
@@ -1473,6 +1549,13 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             self._total_row_height + header_height,
         )
 
+        if previous_widths != [
+            column.content_width for column in self.columns.values()
+        ]:
+            # Rows built while scrolling may widen columns that were already rendered.
+            self._update_count += 1
+            self.refresh()
+
     def _get_cell_region(self, coordinate: Coordinate) -> Region:
         """Get the region of the cell at the given spatial coordinate."""
         if not self.is_valid_coordinate(coordinate):
@@ -1560,6 +1643,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         self.hover_coordinate = Coordinate(0, 0)
         self._label_column = Column(self._label_column_key, Text(), auto_width=True)
         self._labelled_row_exists = False
+        self._virtual_row_count = 0
         self.refresh()
         self.scroll_x = 0
         self.scroll_y = 0
@@ -1660,13 +1744,80 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         if len(cells) > len(self.ordered_columns):
             raise ValueError("More values provided than there are columns.")
 
-        row_index = self.row_count
-        # Map the key of this row to its current index
-        self._row_locations[row_key] = row_index
         self._data[row_key] = {
             column.key: cell
             for column, cell in zip_longest(self.ordered_columns, cells)
         }
+        self._add_row_metadata(row_key, height, label, style_name)
+        self._new_rows.add(row_key)
+        return row_key
+
+    def add_virtual_row(
+        self,
+        source: Callable[[], Iterable[CellType]],
+        *,
+        height: int = 1,
+        key: str | None = None,
+        label: TextType | None = None,
+        style_name: str | None = None,
+    ) -> RowKey:
+        """Add a row at the bottom of the DataTable, whose cells are only built when
+        the row is first accessed, usually when it scrolls into view.
+
+        Only the first `VIRTUAL_SAMPLE_SIZE` virtual rows are measured up front, to
+        estimate the column widths. Columns widen as other rows scroll into view.
+
+        Args:
+            source: A function returning the cell data of the row.
+            height: The height of a row (in lines). Virtual rows cannot auto-detect it.
+            key: A key which uniquely identifies this row. If None, it will be generated
+                for you and returned.
+            label: The label for the row. Will be displayed to the left if supplied.
+            style_name: The name of the style to apply to the row.
+
+        Returns:
+            Unique identifier for this row.
+        """
+        row_key = RowKey(key)
+        if row_key in self._row_locations:
+            raise DuplicateKey(f"The row key {row_key!r} already exists.")
+
+        ordered_columns = self.ordered_columns
+
+        def build_cells() -> dict[ColumnKey, CellType]:
+            cells = tuple(source())
+            if len(cells) > len(ordered_columns):
+                raise ValueError("More values provided than there are columns.")
+            return {
+                column.key: cell for column, cell in zip_longest(ordered_columns, cells)
+            }
+
+        self._data.add_source(row_key, build_cells)
+        self._add_row_metadata(row_key, height, label, style_name)
+        if self._virtual_row_count < self.VIRTUAL_SAMPLE_SIZE:
+            self._new_rows.add(row_key)
+        self._virtual_row_count += 1
+        return row_key
+
+    def _on_virtual_row_materialized(self, row_key: RowKey) -> None:
+        """Measure virtual rows built outside of the sample, once idle."""
+        if self._updating_dimensions:
+            return
+        self._new_rows.add(row_key)
+        self._require_update_dimensions = True
+        self.check_idle()
+
+    def _add_row_metadata(
+        self,
+        row_key: RowKey,
+        height: int | None,
+        label: TextType | None,
+        style_name: str | None,
+    ) -> None:
+        """Register a row, whose cells are already stored, at the bottom of the table."""
+        row_index = self.row_count
+        # Map the key of this row to its current index
+        self._row_locations[row_key] = row_index
 
         label = Text.from_markup(label, end="") if isinstance(label, str) else label
 
@@ -1680,7 +1831,6 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             height is None,
             style_name,
         )
-        self._new_rows.add(row_key)
         self._require_update_dimensions = True
         self.cursor_coordinate = self.cursor_coordinate
 
@@ -1695,7 +1845,6 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
 
         self._update_count += 1
         self.check_idle()
-        return row_key
 
     def add_columns(self, *labels: TextType) -> list[ColumnKey]:
         """Add a number of columns.
@@ -1757,8 +1906,9 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
 
         self._row_locations = new_row_locations
 
-        # Prevent the removed cells from triggering dimension updates
-        for column_key in self._data.get(row_key):
+        # Prevent the removed cells from triggering dimension updates, without building
+        # the cells of a virtual row
+        for column_key in self.columns:
             self._updated_cells.discard(CellKey(row_key, column_key))
 
         del self.rows[row_key]
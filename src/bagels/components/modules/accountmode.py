@@ -77,9 +77,15 @@ class AccountMode(ScrollableContainer):
     # region Builder
     # -------------- Builder ------------- #
 
-    def rebuild(self) -> None:
+    def load(self) -> list:
+        """Fetches the data of the module. Safe to call from a worker thread."""
+        return get_all_accounts_with_balance()
+
+    def rebuild(self, accounts: list | None = None) -> None:
+        if accounts is None:
+            accounts = self.load()
         net_balance = 0
-        for account in get_all_accounts_with_balance():
+        for account in accounts:
             net_balance += account.balance
             test_mounted = self.query(f"#account-{account.id}-container")
             if len(test_mounted) == 0:
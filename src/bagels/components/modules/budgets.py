@@ -4,9 +4,8 @@ from textual.widgets import Button, Input, Label, Static
 
 from bagels.config import CONFIG, write_state
 from bagels.managers.utils import (
-    dynamic_cache,
     get_income_to_use,
-    get_period_figures,
+    get_period_summary,
     try_method_query_one,
 )
 from bagels.models.category import Nature
@@ -113,10 +112,9 @@ class Budgets(Static):
 
     def _rebuild_income_bar(self) -> None:
         offset = self.page_parent.offset
-        net_income = dynamic_cache(get_income_to_use, offset)
-        net_expenses = dynamic_cache(
-            get_period_figures, isIncome=False, offset=offset, offset_type="month"
-        )
+        net_income = get_income_to_use(offset)
+        figures = get_period_summary(offset=offset, offset_type="month")
+        net_expenses = figures.expense
         amount_to_save = round(
             net_income * CONFIG.state.budgeting.savings_percentage
             if self.savings_assess_metric.startswith("percentage")
@@ -130,26 +128,8 @@ class Budgets(Static):
             else CONFIG.state.budgeting.wants_spending_amount,
             CONFIG.defaults.round_decimals,
         )
-        expenses_must = round(
-            dynamic_cache(
-                get_period_figures,
-                isIncome=False,
-                offset=offset,
-                offset_type="month",
-                nature=Nature.MUST,
-            ),
-            CONFIG.defaults.round_decimals,
-        )
-        expenses_need = round(
-            dynamic_cache(
-                get_period_figures,
-                isIncome=False,
-                offset=offset,
-                offset_type="month",
-                nature=Nature.NEED,
-            ),
-            CONFIG.defaults.round_decimals,
-        )
+        expenses_must = figures.expense_by_nature[Nature.MUST]
+        expenses_need = figures.expense_by_nature[Nature.NEED]
         expenses_want = round(
             net_expenses - expenses_must - expenses_need,
             CONFIG.defaults.round_decimals,
@@ -96,8 +96,13 @@ class DateMode(Static):
         # Update calendar labels
         calendar_rows = self.query(".calendar-row")
 
+        # Classes are only reassigned when they change, as restyling is costly
+        days_to_first = (target_date.weekday() - self.first_day_of_week) % 7
+        week_start = target_date - timedelta(days=days_to_first)
+        week_end = week_start + timedelta(days=6)
+
         for row_idx, row in enumerate(calendar_rows):
-            row.remove_class("target_week")
+            is_target_week = False
             for col_idx, label in enumerate(row.query("Label")):
                 day_idx = row_idx * 7 + col_idx
                 if day_idx >= len(calendar_days):
@@ -108,35 +113,32 @@ class DateMode(Static):
                 # Set day number
                 label.update(str(date.day))
 
-                # Reset classes
-                label.set_classes("")
+                classes = set()
 
                 # Add not current month class
                 if not is_current:
-                    label.add_class("not_current_month")
+                    classes.add("not_current_month")
 
                 # Add today class
                 if date.date() == today.date():
-                    label.add_class("today")
+                    classes.add("today")
 
                 # Add target class
                 if date.date() == target_date.date():
-                    label.add_class("target")
+                    classes.add("target")
 
                 # Add type-specific classes
                 match filter_offset_type:
                     case "week":
-                        # Calculate week start based on first_day_of_week
-                        days_to_first = (
-                            target_date.weekday() - self.first_day_of_week
-                        ) % 7
-                        week_start = target_date - timedelta(days=days_to_first)
-                        week_end = week_start + timedelta(days=6)
                         if week_start.date() <= date.date() <= week_end.date():
-                            row.add_class("target_week")
+                            is_target_week = True
                     case "month":
                         if is_current:
-                            label.add_class("target_month")
+                            classes.add("target_month")
+
+                if classes != set(label.classes):
+                    label.set_classes(" ".join(classes))
+            row.set_class(is_target_week, "target_week")
 
         self.page_parent.update_filter_label(self.query_one(".current-filter-label"))
 
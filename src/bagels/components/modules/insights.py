@@ -28,16 +28,66 @@ class Insights(Static):
     # region Builder
     # -------------- Builder ------------- #
 
-    def rebuild(self) -> None:
-        self.use_account = self.page_parent.filter["byAccount"]
-        period_net = self._update_labels()
-        items = self.get_percentage_bar_items(period_net)
-        self.percentage_bar.set_total(period_net, False)
+    def get_load_params(self) -> dict:
+        """Returns what the module shows, read from the page: on the UI thread only."""
+        params = {
+            "use_account": self.page_parent.filter["byAccount"],
+            "offset": self.page_parent.filter["offset"],
+            "offset_type": self.page_parent.filter["offset_type"],
+            "is_income": self.page_parent.mode["isIncome"],
+        }
+        if params["use_account"]:
+            params["account_id"] = self.page_parent.mode["accountId"]["default_value"]
+        return params
+
+    def load(self, params: dict) -> dict:
+        """Fetches the data of the module for get_load_params. Safe to call from a
+        worker thread."""
+        use_account = params["use_account"]
+        offset = params["offset"]
+        offset_type = params["offset_type"]
+        is_income = params["is_income"]
+
+        figures_params = {
+            "offset": offset,
+            "offset_type": offset_type,
+            "isIncome": is_income,
+        }
+        categories_params = {
+            "offset": offset,
+            "offset_type": offset_type,
+            "is_income": is_income,
+        }
+        if use_account:
+            figures_params["accountId"] = params["account_id"]
+            categories_params["account_id"] = params["account_id"]
+
+        period_net = get_period_figures(**figures_params)
+        period_average = get_period_average(
+            period_net, offset=offset, offset_type=offset_type
+        )
+        category_records = (
+            get_all_categories_records(**categories_params) if period_net != 0 else []
+        )
+        return {
+            "use_account": use_account,
+            "period_net": period_net,
+            "period_average": period_average,
+            "category_records": category_records,
+        }
+
+    def rebuild(self, data: dict | None = None) -> None:
+        if data is None:
+            data = self.load(self.get_load_params())
+        self.use_account = data["use_account"]
+        self._update_labels(data["period_net"], data["period_average"])
+        items = self.get_percentage_bar_items(data["category_records"])
+        self.percentage_bar.set_total(data["period_net"], False)
         self.percentage_bar.set_items(items)
         # data = self.get_period_barchart_data()
         # self.period_barchart.set_data(data)
 
-    def _update_labels(self) -> None:
+    def _update_labels(self, period_net, period_average) -> None:
         current_filter_label = self.query_one(".current-filter-label")
         period_net_label = self.query_one(".period-net")
         period_average_label = self.query_one(".period-average")
@@ -56,50 +106,12 @@ class Insights(Static):
             )
         average_label.update(f"{label} per day")
 
-        if self.use_account:
-            params = {
-                "offset": self.page_parent.filter["offset"],
-                "offset_type": self.page_parent.filter["offset_type"],
-                "accountId": self.page_parent.mode["accountId"]["default_value"],
-                "isIncome": mode_isIncome,
-            }
-        else:
-            params = {
-                "offset": self.page_parent.filter["offset"],
-                "offset_type": self.page_parent.filter["offset_type"],
-                "isIncome": mode_isIncome,
-            }
-
-        period_net = get_period_figures(**params)
-        period_average = get_period_average(
-            period_net,
-            offset=self.page_parent.filter["offset"],
-            offset_type=self.page_parent.filter["offset_type"],
-        )
         period_net_label.update(str(period_net))
         period_average_label.update(str(period_average))
 
-        return period_net
-
     def get_percentage_bar_items(
-        self, period_net=1, limit: int = 5
+        self, category_records: list, limit: int = 5
     ) -> list[PercentageBarItem]:
-        if period_net == 0:
-            return []
-        if self.use_account:
-            category_records = get_all_categories_records(
-                offset=self.page_parent.filter["offset"],
-                offset_type=self.page_parent.filter["offset_type"],
-                is_income=self.page_parent.mode["isIncome"],
-                account_id=self.page_parent.mode["accountId"]["default_value"],
-            )
-        else:
-            category_records = get_all_categories_records(
-                offset=self.page_parent.filter["offset"],
-                offset_type=self.page_parent.filter["offset_type"],
-                is_income=self.page_parent.mode["isIncome"],
-            )
-
         # Sort categories by percentage in descending order
         items = []
         if len(category_records) <= limit:
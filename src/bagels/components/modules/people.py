@@ -14,10 +14,11 @@ from bagels.managers.persons import (
 )
 from bagels.modals.confirmation import ConfirmationModal
 from bagels.modals.input import InputModal
+from bagels.utils.format import format_date_to_readable
 
 
 class People(Static):
-    COLUMNS = ("Name", "Net due")
+    COLUMNS = ("Name", "Net due", "Last activity")
 
     BINDINGS = [
         Binding(CONFIG.hotkeys.edit, "edit_person", "Edit"),
@@ -32,6 +33,7 @@ class People(Static):
         )
         super().__setattr__("border_title", "People")
         self.current_row = None
+        self._people = None
 
     # --------------- Hooks -------------- #
 
@@ -46,6 +48,11 @@ class People(Static):
     # ------------- Builders ------------- #
 
     def rebuild(self) -> None:
+        people = get_persons_with_net_due()
+        if people is self._people:
+            return  # cached result, nothing changed since the last rebuild
+        self._people = people
+
         table: DataTable = self.query_one("#people-table")
         empty_indicator: Static = self.query_one(".empty-indicator")
 
@@ -53,10 +60,14 @@ class People(Static):
         if not table.columns:
             table.add_columns(*self.COLUMNS)
 
-        people = get_persons_with_net_due()
         if people:
             for person in people:
-                table.add_row(person.name, person.due, key=person.id)
+                last_activity = (
+                    format_date_to_readable(person.lastActivity)
+                    if person.lastActivity
+                    else "-"
+                )
+                table.add_row(person.name, person.due, last_activity, key=person.id)
             table.zebra_stripes = True
 
         empty_indicator.display = not people
@@ -1,11 +1,14 @@
 from typing import ClassVar
 
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container
 from textual.events import DescendantBlur, DescendantFocus
 from textual.reactive import reactive
+from textual.timer import Timer
 from textual.widgets import Button, Input, Static, Switch
+from textual.worker import Worker, get_current_worker
 
 from bagels.components.datatable import DataTable
 from bagels.components.indicators import EmptyIndicator
@@ -13,6 +16,9 @@ from bagels.components.modules.records._cud import RecordCUD
 from bagels.components.modules.records._table_builder import RecordTableBuilder
 from bagels.config import CONFIG
 from bagels.forms.person_forms import PersonForm
+from bagels.managers.records import filter_records, is_records_filter_refinement
+
+FILTER_DEBOUNCE = 0.15  # seconds without typing before filtering
 
 
 class DisplayMode:
@@ -54,6 +60,7 @@ Records .label-highlight-match {
 
     can_focus = True
     show_splits = True
+    _filter_timer: Timer | None = None
     displayMode = reactive(DisplayMode.DATE)
     FILTERS = {}
     FILTER_LABEL_TIPS = {
@@ -126,10 +133,46 @@ Records .label-highlight-match {
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if self.FILTERS["enabled"]():
-            self.rebuild(focus=False)
+            # coalesce keystrokes
+            if self._filter_timer is not None:
+                self._filter_timer.stop()
+            self._filter_timer = self.set_timer(FILTER_DEBOUNCE, self.apply_filters)
 
     def on_switch_changed(self, event: Switch.Changed) -> None:
-        self.rebuild(focus=False)
+        self.apply_filters()
+
+    def apply_filters(self) -> None:
+        """Rebuilds the table for the current filters.
+
+        Filters narrowing down the last loaded records are applied in memory. Otherwise
+        the records are queried in a worker, replacing any query still running.
+        """
+        self._filter_timer = None
+        self.workers.cancel_group(self, "records-filter")
+        load_params = self.get_load_params()
+        mode, params = load_params
+        if mode == DisplayMode.DATE and self.loaded_records:
+            loaded_params, records = self.loaded_records
+            if is_records_filter_refinement(loaded_params, params):
+                self.rebuild(focus=False, data=filter_records(records, **params))
+                return
+        self._load_filtered_records(load_params)
+
+    @work(thread=True, exclusive=True, group="records-filter")
+    def _load_filtered_records(self, load_params: tuple[str, dict]) -> None:
+        # the filters were read on the UI thread: the worker only queries
+        worker = get_current_worker()
+        data = self.load(load_params)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._show_filtered_records, worker, data, load_params
+            )
+
+    def _show_filtered_records(
+        self, worker: Worker, data: list, load_params: tuple[str, dict]
+    ) -> None:
+        if not worker.is_cancelled:
+            self.rebuild(focus=False, data=data, load_params=load_params)
 
     def on_descendant_focus(self, event: DescendantFocus) -> None:
         if event.widget.id.startswith("filter-"):
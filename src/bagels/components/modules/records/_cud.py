@@ -20,6 +20,7 @@ from bagels.modals.confirmation import ConfirmationModal
 from bagels.modals.input import InputModal
 from bagels.modals.record import RecordModal
 from bagels.modals.transfer import TransferModal
+from bagels.models.database.app import unit_of_work
 
 
 class RecordCUD:
@@ -27,9 +28,10 @@ class RecordCUD:
         def check_result(result) -> None:
             if result:
                 try:
-                    create_record_and_splits(result["record"], result["splits"])
-                    if result["createTemplate"]:
-                        create_template_from_record(result["record"])
+                    with unit_of_work():
+                        create_record_and_splits(result["record"], result["splits"])
+                        if result["createTemplate"]:
+                            create_template_from_record(result["record"])
                 except Exception as e:
                     self.app.notify(
                         title="Error", message=f"{e}", severity="error", timeout=10
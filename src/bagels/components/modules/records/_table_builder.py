@@ -1,4 +1,5 @@
 from datetime import timedelta
+from functools import partial
 
 from rich.text import Text
 
@@ -8,10 +9,8 @@ from bagels.config import CONFIG
 from bagels.managers.persons import (
     get_persons_with_splits,
 )
-from bagels.managers.records import (
-    get_record_total_split_amount,
-    get_records,
-)
+from bagels.managers.records import get_records
+from bagels.managers.utils import get_search_terms
 from bagels.utils.format import format_date_to_readable
 
 
@@ -21,19 +20,56 @@ class DisplayMode:
 
 
 class RecordTableBuilder:
-    def rebuild(self, focus=True) -> None:
+    loaded_records: tuple[dict, list] | None = None
+
+    def get_load_params(self) -> tuple[str, dict]:
+        """Returns the display mode and query of the rows to show, read from the filter
+        widgets and the page: on the UI thread only."""
+        match self.displayMode:
+            case DisplayMode.PERSON:
+                return DisplayMode.PERSON, self._get_person_record_params()
+            case mode:
+                return mode, self._get_record_params()
+
+    def load(self, load_params: tuple[str, dict]) -> list:
+        """Fetches the rows for get_load_params. Safe to call from a worker thread."""
+        mode, params = load_params
+        match mode:
+            case DisplayMode.PERSON:
+                return get_persons_with_splits(**params)
+            case _:
+                return get_records(**params)
+
+    def rebuild(
+        self,
+        focus=True,
+        data: list | None = None,
+        load_params: tuple[str, dict] | None = None,
+    ) -> None:
+        """Rebuilds the table, from data loaded for load_params if given.
+
+        Data given without load_params, such as loaded records filtered in memory, is
+        shown without replacing the loaded records.
+        """
         if not hasattr(self, "table"):
             return
         table = self.table
         empty_indicator: EmptyIndicator = self.query_one(".empty-indicator")
+        if load_params is not None and load_params[0] != self.displayMode:
+            data = None  # loaded for another display mode
+        if data is None:
+            load_params = self.get_load_params()
+            data = self.load(load_params)
+        if load_params is not None and load_params[0] == DisplayMode.DATE:
+            # later filters narrowing these down are applied in memory
+            self.loaded_records = (load_params[1], data)
         self._initialize_table(table)
-        records = self._fetch_records()
 
         match self.displayMode:
             case DisplayMode.PERSON:
-                self._build_person_view(table, records)
+                self._build_person_view(table, data)
             case DisplayMode.DATE:
-                self._build_date_view(table, records)
+                self._build_date_view(table, data)
             case _:
                 pass
 
@@ -47,7 +83,7 @@ class RecordTableBuilder:
             else:
                 self.focus()
 
-    def _fetch_records(self):
+    def _get_record_params(self) -> dict:
         params = {
             "offset": self.page_parent.filter["offset"],
             "offset_type": self.page_parent.filter["offset_type"],
@@ -58,9 +94,7 @@ class RecordTableBuilder:
             params["category_piped_names"] = self.FILTERS["category"]()
             params["operator_amount"] = self.FILTERS["amount"]()
             params["label"] = self.FILTERS["label"]()
-        return get_records(
-            **params,
-        )
+        return params
 
     def _initialize_table(self, table: DataTable) -> None:
         table.clear()
@@ -84,7 +118,7 @@ class RecordTableBuilder:
             highlight_style = self.get_component_rich_style("label-highlight-match")
             text = Text(text)
             text.highlight_words(
-                [self.FILTERS["label"]()],
+                get_search_terms(self.FILTERS["label"]()),
                 style=highlight_style,
                 case_sensitive=False,
             )
@@ -92,17 +126,11 @@ class RecordTableBuilder:
 
     # region Date view
     def _build_date_view(self, table: DataTable, records: list) -> None:
+        # Rows are virtual: their cells are only formatted once they scroll into view
         prev_group = None
         for record in records:
             flow_icon = self._get_flow_icon(len(record.splits) > 0, record.isIncome)
 
-            category_string, amount_string, account_string = self._format_record_fields(
-                record, flow_icon
-            )
-
-            # Highlight label if filtering
-            label_string = self._get_label_string(record.label)
-
             # Add group header based on filter type
             group_string = None
             match self.page_parent.filter["offset_type"]:
@@ -139,12 +167,8 @@ class RecordTableBuilder:
                 self._add_group_header_row(table, group_string)
 
             # Add main record row
-            table.add_row(
-                " ",
-                category_string,
-                amount_string,
-                label_string,
-                account_string,
+            table.add_virtual_row(
+                partial(self._get_record_row, record, flow_icon),
                 key=f"r-{str(record.id)}",
             )
 
@@ -152,6 +176,14 @@ class RecordTableBuilder:
             if record.splits and self.show_splits:
                 self._add_split_rows(table, record, flow_icon)
 
+    def _get_record_row(self, record, flow_icon: str) -> tuple:
+        category_string, amount_string, account_string = self._format_record_fields(
+            record, flow_icon
+        )
+        # Highlight label if filtering
+        label_string = self._get_label_string(record.label)
+        return " ", category_string, amount_string, label_string, account_string
+
     def _get_flow_icon(self, recordHasSplits: bool, is_income: bool) -> str:
         if recordHasSplits and not self.show_splits:
             flow_icon_positive = "[green]=[/green]"
@@ -181,9 +213,7 @@ class RecordTableBuilder:
             category_string = f"[{color_tag}]{CONFIG.symbols.category_color}[/{color_tag}] {record.category.name}"
 
             if record.splits and not self.show_splits:
-                amount_self = round(
-                    record.amount - get_record_total_split_amount(record.id), 2
-                )
+                amount_self = round(record.amount - record.splitTotal, 2)
                 amount_string = f"{flow_icon} {amount_self}"
             else:
                 amount_string = f"{flow_icon} {record.amount}"
@@ -198,45 +228,48 @@ class RecordTableBuilder:
         table.add_row("//", string, "", "", "", style_name="group-header", key=key)
 
     def _add_split_rows(self, table: DataTable, record, flow_icon: str) -> None:
-        color = record.category.color.lower()
-        amount_self = round(
-            record.amount - get_record_total_split_amount(record.id),
-            CONFIG.defaults.round_decimals,
+        for split in record.splits:
+            table.add_virtual_row(
+                partial(self._get_split_row, record, split),
+                key=f"s-{str(split.id)}",
+            )
+
+        # Add net amount row
+        table.add_virtual_row(
+            partial(self._get_split_total_row, record),
+            style_name="net",
         )
+
+    def _get_split_row(self, record, split) -> tuple:
+        color = record.category.color.lower()
         split_flow_icon = (
             f"[red]{CONFIG.symbols.amount_negative}[/red]"
             if record.isIncome
             else f"[green]{CONFIG.symbols.amount_positive}[/green]"
         )
         line_char = f"[{color}]{CONFIG.symbols.line_char}[/{color}]"
-        finish_line_char = f"[{color}]{CONFIG.symbols.finish_line_char}[/{color}]"
-
-        for split in record.splits:
-            paid_status_icon = self._get_split_status_icon(split)
-            date_string = (
-                Text(f"Paid {format_date_to_readable(split.paidDate)}", style="italic")
-                if split.paidDate
-                else Text("-")
-            )
-
-            table.add_row(
-                " ",
-                f"{line_char} {paid_status_icon} {split.person.name}",
-                f"{split_flow_icon} {split.amount}",
-                date_string,
-                split.account.name if split.account else "-",
-                key=f"s-{str(split.id)}",
-            )
+        paid_status_icon = self._get_split_status_icon(split)
+        date_string = (
+            Text(f"Paid {format_date_to_readable(split.paidDate)}", style="italic")
+            if split.paidDate
+            else Text("-")
+        )
+        return (
+            " ",
+            f"{line_char} {paid_status_icon} {split.person.name}",
+            f"{split_flow_icon} {split.amount}",
+            date_string,
+            split.account.name if split.account else "-",
+        )
 
-        # Add net amount row
-        table.add_row(
-            "",
-            f"{finish_line_char} Self total",
-            f"= {amount_self}",
-            "",
-            "",
-            style_name="net",
+    def _get_split_total_row(self, record) -> tuple:
+        color = record.category.color.lower()
+        amount_self = round(
+            record.amount - record.splitTotal,
+            CONFIG.defaults.round_decimals,
         )
+        finish_line_char = f"[{color}]{CONFIG.symbols.finish_line_char}[/{color}]"
+        return "", f"{finish_line_char} Self total", f"= {amount_self}", "", ""
 
     def _get_split_status_icon(self, split) -> str:
         if split.isPaid:
@@ -246,7 +279,7 @@ class RecordTableBuilder:
 
     # region Person view
 
-    def _fetch_person_records(self) -> list:
+    def _get_person_record_params(self) -> dict:
         params = {
             "offset": self.page_parent.filter["offset"],
             "offset_type": self.page_parent.filter["offset_type"],
@@ -255,10 +288,9 @@ class RecordTableBuilder:
             params["category_piped_names"] = self.FILTERS["category"]()
             params["operator_amount"] = self.FILTERS["amount"]()
             params["label"] = self.FILTERS["label"]()
-        return get_persons_with_splits(**params)
+        return params
 
-    def _build_person_view(self, table: DataTable, _) -> None:
-        persons = self._fetch_person_records()
+    def _build_person_view(self, table: DataTable, persons: list) -> None:
 
         # Display each person and their splits
         for person in persons:
@@ -1,8 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from functools import lru_cache
 
-import numpy as np
 
 from bagels.components.tplot.plot import Plot
 from bagels.config import CONFIG
@@ -46,7 +44,6 @@ class BasePlot(ABC):
 class SpendingPlot(BasePlot):
     name: str = "Spending"
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
         return get_spending(start_of_period, end_of_period)
 
@@ -67,7 +64,6 @@ class SpendingPlot(BasePlot):
 class SpendingTrajectoryPlot(BasePlot):
     name: str = "Spending Trajectory"
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
         return get_spending_trend(start_of_period, end_of_period)
 
@@ -95,6 +91,8 @@ class SpendingTrajectoryPlot(BasePlot):
         # Estimate data trend by creating an array of length len(dates) - len(data), filled with values from linear regression.
         # Plot the data by using reversed dates to put at the right hand side of the plot
         if len(data) >= 2:
+            import numpy as np  # only the trend needs it
+
             x = np.arange(len(data))
             coefficients = np.polyfit(x, data, 1)
             trend = np.poly1d(coefficients)
@@ -131,7 +129,6 @@ class BalancePlot(BasePlot):
     name: str = "Balance"
     supports_cross_periods = True
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
         return get_daily_balance(start_of_period, end_of_period)
 
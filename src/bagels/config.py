@@ -1,13 +1,21 @@
+import atexit
+import copy
+import hashlib
+import json
 import os
 import platform
 import subprocess
+import threading
 import warnings
+from pathlib import Path
 from typing import Any, Literal
 
-import yaml
+import msgpack
 from pydantic import BaseModel, Field, ValidationError
 
-from bagels.locations import config_file
+from bagels.locations import config_cache_file, config_file, state_file
+
+STATE_FLUSH_DELAY = 1.0  # seconds without state changes before they are saved
 
 
 class Defaults(BaseModel):
@@ -18,6 +26,16 @@ class Defaults(BaseModel):
     plot_marker: Literal["braille", "fhd", "hd", "dot"] = "braille"
 
 
+class Database(BaseModel):
+    # SQLite pragmas applied to every connection. See https://sqlite.org/pragma.html
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    cache_size: int = -65536  # negative values are in KiB: 64 MiB page cache
+    mmap_size: int = Field(ge=0, default=268435456)  # 256 MiB, 0 disables
+    temp_store: Literal["default", "file", "memory"] = "memory"
+    foreign_keys: bool = True
+
+
 class DatemodeHotkeys(BaseModel):
     go_to_day: str = "g"
 
@@ -108,11 +126,18 @@ class Config(BaseModel):
     hotkeys: Hotkeys = Hotkeys()
     symbols: Symbols = Symbols()
     defaults: Defaults = Defaults()
+    database: Database = Database()
     state: State = State()
 
     def __init__(self, **data):
         try:
             config_data = self._load_yaml_config()
+            # state saved by the app overrides the state in the config file
+            saved_state = _state_store.load()
+            if saved_state:
+                config_data["state"] = _merge_dicts(
+                    config_data.get("state") or {}, saved_state
+                )
             merged_data = {**self.model_dump(), **config_data, **data}
             super().__init__(**merged_data)
             self.ensure_yaml_fields()
@@ -146,6 +171,8 @@ class Config(BaseModel):
         if not config_path.is_file():
             return {}
 
+        import yaml
+
         try:
             with open(config_path, "r") as f:
                 config = yaml.safe_load(f)
@@ -155,6 +182,8 @@ class Config(BaseModel):
             return {}
 
     def ensure_yaml_fields(self):
+        import yaml
+
         try:
             with open(config_file(), "r") as f:
                 config = yaml.safe_load(f) or {}
@@ -170,7 +199,10 @@ class Config(BaseModel):
             return current
 
         default_config = self.model_dump()
-        config = update_config(default_config, config)
+        updated_config = update_config(default_config, copy.deepcopy(config))
+        if updated_config == config:
+            return  # no field missing: leave the file as it is
+        config = updated_config
 
         with open(config_file(), "w") as f:
             yaml.dump(config, f, default_flow_style=False)
@@ -178,7 +210,11 @@ class Config(BaseModel):
     @classmethod
     def get_default(cls):
         return cls(
-            hotkeys=Hotkeys(), symbols=Symbols(), defaults=Defaults(), state=State()
+            hotkeys=Hotkeys(),
+            symbols=Symbols(),
+            defaults=Defaults(),
+            database=Database(),
+            state=State(),
         )
 
 
@@ -202,7 +238,75 @@ def open_config_file():
         subprocess.run(["xdg-open", config_path])
 
 
+# region Snapshot
+# ------------- snapshot ------------- #
+
+
+def _get_file_key(path: Path) -> str | None:
+    # hashed rather than stat'ed, as edits within the mtime resolution are missed
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _get_snapshot_key() -> list:
+    # the models are part of the key, so snapshots of another version are not used
+    return [
+        _get_file_key(Path(__file__)),
+        _get_file_key(config_file()),
+        _get_file_key(state_file()),
+    ]
+
+
+def _construct(model: type[BaseModel], data: dict) -> BaseModel:
+    """Builds a model and its nested models from validated data, without validating."""
+    values = {}
+    for name, field in model.model_fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            value = _construct(annotation, value)
+        values[name] = value
+    return model.model_construct(**values)
+
+
+def _load_config_snapshot() -> "Config | None":
+    """Returns the config as last loaded, if neither the config nor the state file
+    changed since."""
+    try:
+        with open(config_cache_file(), "rb") as f:
+            snapshot = msgpack.unpackb(f.read())
+        if snapshot["key"] != _get_snapshot_key():
+            return None
+        return _construct(Config, snapshot["config"])
+    except Exception:
+        return None  # missing, outdated or corrupt: load the config file instead
+
+
+def _save_config_snapshot(config: "Config") -> None:
+    # keyed after loading, as loading adds missing fields to the config file
+    key = _get_snapshot_key()
+    path = config_cache_file()
+    temp_path = path.with_suffix(".tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(msgpack.packb({"key": key, "config": config.model_dump()}))
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # loaded from the config file again next time
+
+
 def load_config():
+    global CONFIG
+    CONFIG = _load_config_snapshot()
+    if CONFIG is not None:
+        return
+
+    import yaml
+
     f = config_file()
     if not f.exists():
         try:
@@ -212,11 +316,11 @@ def load_config():
         except OSError:
             pass
 
-    global CONFIG
     try:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             CONFIG = Config()  # ignore warnings about empty env file
+        _save_config_snapshot(CONFIG)
     except ConfigurationError as e:
         print("\nConfiguration Error:")
         print("==================")
@@ -240,22 +344,104 @@ def load_config():
         raise SystemExit(1)
 
 
+# region State
+# --------------- state -------------- #
+
+
+def _merge_dicts(base: dict, overrides: dict) -> dict:
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_dicts(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class _StateStore:
+    """State changed by the app, kept in memory and saved to the state file in batches.
+
+    Changes are saved once STATE_FLUSH_DELAY passes without another one, such as after
+    typing in an input, and on exit. The file is replaced atomically, and only written
+    if its content changed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: dict | None = None
+        self._saved: dict = {}
+        self._timer: threading.Timer | None = None
+
+    def _read(self) -> dict:
+        try:
+            with open(state_file(), "r") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Error loading state file: {e}")
+            return {}
+
+    def load(self) -> dict:
+        """Returns the saved state, as of the last flush."""
+        with self._lock:
+            self._state = self._read()
+            self._saved = copy.deepcopy(self._state)
+            return copy.deepcopy(self._state)
+
+    def set(self, keys: list[str], value: Any) -> None:
+        with self._lock:
+            if self._state is None:
+                self._state = self._read()
+                self._saved = copy.deepcopy(self._state)
+            d = self._state
+            for k in keys[:-1]:
+                d = d.setdefault(k, {})
+            d[keys[-1]] = value
+
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(STATE_FLUSH_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._state is None or self._state == self._saved:
+                return
+
+            path = state_file()
+            temp_path = path.with_suffix(".tmp")
+            try:
+                with open(temp_path, "w") as f:
+                    json.dump(self._state, f, indent=2)
+                os.replace(temp_path, path)
+            except OSError as e:
+                warnings.warn(f"Error saving state file: {e}")
+                return
+            self._saved = copy.deepcopy(self._state)
+
+
+_state_store = _StateStore()
+atexit.register(_state_store.flush)
+
+
+def flush_state() -> None:
+    """Saves pending state changes now, instead of after STATE_FLUSH_DELAY."""
+    _state_store.flush()
+
+
 def write_state(key: str, value: Any) -> None:
-    """Write a state value to the config.yaml file, supporting nested keys with dot operator."""
-    try:
-        with open(config_file(), "r") as f:
-            config = yaml.safe_load(f) or {}
-    except FileNotFoundError:
-        config = {}
+    """Set a state value, supporting nested keys with dot operator.
 
+    The value applies at once, and is saved to the state file shortly after.
+    """
     keys = key.split(".")
-    d = config.setdefault("state", {})
-    for k in keys[:-1]:
-        d = d.setdefault(k, {})
-    d[keys[-1]] = value
-
-    with open(config_file(), "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
+    _state_store.set(keys, value)
 
     # update the global config object
     global CONFIG
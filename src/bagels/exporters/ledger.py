@@ -0,0 +1,264 @@
+"""Exports the ledger to files for analysis, one file per table.
+
+Rows are read with Core selects, a chunk at a time, and written as they are read, so
+ledgers of any size are exported in constant memory without loading ORM entities.
+CSV and JSON Lines need nothing more; Parquet and Arrow IPC files keep the column types
+and need pyarrow, which is imported only when those formats are used.
+"""
+
+import csv
+import json
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, or_, select
+
+from bagels.models.account import Account
+from bagels.models.category import Category
+from bagels.models.database.app import Session
+from bagels.models.person import Person
+from bagels.models.record import Record
+from bagels.models.split import Split
+
+EXPORT_CHUNK_SIZE = 5000  # rows read and written at a time
+
+EXPORT_TABLES = {
+    "records": Record,
+    "splits": Split,
+    "accounts": Account,
+    "categories": Category,
+    "persons": Person,
+}
+
+
+class LedgerExportError(Exception):
+    """Raised when the ledger cannot be exported as asked."""
+
+    pass
+
+
+def _to_text(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+# region Writers
+# -------------- writers ------------- #
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: list):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(column.name for column in columns)
+
+    def write(self, rows: list[tuple]) -> None:
+        self.writer.writerows([_to_text(value) for value in row] for row in rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _JsonLinesWriter:
+    def __init__(self, path: Path, columns: list):
+        self.file = open(path, "w", encoding="utf-8")
+        self.names = [column.name for column in columns]
+
+    def write(self, rows: list[tuple]) -> None:
+        self.file.writelines(
+            json.dumps(dict(zip(self.names, map(_to_text, row)))) + "\n" for row in rows
+        )
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise LedgerExportError(
+            "Parquet and Arrow exports need pyarrow: pip install pyarrow"
+        )
+    return pyarrow
+
+
+class _ArrowWriter:
+    """Writes Arrow IPC files, one record batch per chunk."""
+
+    def __init__(self, path: Path, columns: list):
+        pa = _import_pyarrow()
+        self.pa = pa
+        self.schema = pa.schema(
+            [
+                pa.field(column.name, self._get_type(column), column.nullable)
+                for column in columns
+            ]
+        )
+        self.writer = self._open(path)
+
+    def _get_type(self, column):
+        pa = self.pa
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()  # strings, and enums by value
+
+    def _open(self, path: Path):
+        return self.pa.ipc.new_file(path, self.schema)
+
+    def _get_batch(self, rows: list[tuple]):
+        columns = zip(*rows)
+        arrays = [
+            self.pa.array(
+                [value.value if isinstance(value, Enum) else value for value in column],
+                type=field.type,
+            )
+            for column, field in zip(columns, self.schema)
+        ]
+        return self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def write(self, rows: list[tuple]) -> None:
+        self.writer.write_batch(self._get_batch(rows))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _ParquetWriter(_ArrowWriter):
+    """Writes Parquet files, one row group per chunk."""
+
+    def _open(self, path: Path):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(path, self.schema)
+
+
+WRITERS = {
+    "csv": _CsvWriter,
+    "jsonl": _JsonLinesWriter,
+    "parquet": _ParquetWriter,
+    "arrow": _ArrowWriter,
+}
+
+
+# region Export
+# -------------- export -------------- #
+
+
+def _get_account_ids(session, account_names: list[str]) -> list[int]:
+    ids = []
+    for name in account_names:
+        account_id = session.scalar(
+            select(Account.id).where(Account.name == name, Account.deletedAt.is_(None))
+        )
+        if account_id is None:
+            raise LedgerExportError(f"No account named '{name}'")
+        ids.append(account_id)
+    return ids
+
+
+def _select_table(
+    table: str,
+    start: datetime | None,
+    end: datetime | None,
+    account_ids: list[int] | None,
+):
+    """Returns the select of a table's rows, with records and splits filtered."""
+    model = EXPORT_TABLES[table]
+    if table not in ("records", "splits"):
+        # referenced by the exported records: exported whole
+        return select(*model.__table__.columns).order_by(model.id)
+
+    record_filters = []
+    if start is not None:
+        record_filters.append(Record.date >= start)
+    if end is not None:
+        record_filters.append(Record.date < end)
+    if account_ids is not None:
+        record_filters.append(
+            or_(
+                Record.accountId.in_(account_ids),
+                Record.transferToAccountId.in_(account_ids),
+            )
+        )
+
+    if table == "records":
+        # in the order of the date index, so nothing is sorted before streaming
+        return (
+            select(*Record.__table__.columns)
+            .where(*record_filters)
+            .order_by(Record.date)
+        )
+    query = select(*Split.__table__.columns).order_by(Split.id)
+    if record_filters:
+        query = query.where(
+            Split.recordId.in_(select(Record.id).where(*record_filters))
+        )
+    return query
+
+
+def export_ledger(
+    directory: Path,
+    file_format: str = "csv",
+    tables: list[str] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    account_names: list[str] | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    on_progress=None,
+) -> dict[str, int]:
+    """Exports tables of the ledger to `directory`, as <table>.<file_format> files.
+
+    Args:
+        directory (Path): Where to write the files, created if missing.
+        file_format (str): One of WRITERS.
+        tables (list[str]): Names of EXPORT_TABLES, or None for all of them.
+        start (datetime): Only export records and splits from this date.
+        end (datetime): Only export records and splits before this date.
+        account_names (list[str]): Only export records and splits from or to these accounts.
+        on_progress: Called with the table and the number of rows after each chunk.
+
+    Returns:
+        dict[str, int]: Rows exported per table.
+    """
+    writer_class = WRITERS[file_format]
+    if file_format in ("parquet", "arrow"):
+        _import_pyarrow()  # fail before writing anything
+
+    counts = {}
+    session = Session()
+    try:
+        account_ids = (
+            _get_account_ids(session, account_names) if account_names else None
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        for table in tables or EXPORT_TABLES:
+            query = _select_table(table, start, end, account_ids)
+            writer = writer_class(
+                directory / f"{table}.{file_format}", list(query.selected_columns)
+            )
+            counts[table] = 0
+            try:
+                result = session.execute(
+                    query, execution_options={"yield_per": chunk_size}
+                )
+                for rows in result.partitions():
+                    writer.write(rows)
+                    counts[table] += len(rows)
+                    if on_progress:
+                        on_progress(table, len(rows))
+            finally:
+                writer.close()
+        return counts
+    finally:
+        session.close()
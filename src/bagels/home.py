@@ -1,8 +1,11 @@
 from datetime import datetime, timedelta
+from time import sleep
 
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.widgets import Label, Static
+from textual.worker import Worker, get_current_worker
 
 from bagels.components.modules.accountmode import AccountMode
 from bagels.components.modules.datemode import DateMode
@@ -10,12 +13,14 @@ from bagels.components.modules.incomemode import IncomeMode
 from bagels.components.modules.insights import Insights
 from bagels.components.modules.records import Records
 from bagels.components.modules.templates import Templates
-from bagels.components.modules.welcome import Welcome
 from bagels.config import CONFIG
 from bagels.managers.accounts import get_accounts_count, get_all_accounts
 from bagels.managers.categories import get_categories_count
+from bagels.models.database.app import unit_of_work
 from bagels.utils.format import format_period_to_readable
 
+REBUILD_DEBOUNCE = 0.1  # seconds to wait for further input before loading
+
 # class HomeModeDefaultT(TypedDict):
 #     default_value: None
 #     default_value_text: str
@@ -106,12 +111,52 @@ class Home(Static):
     # -------------- Helpers ------------- #
 
     def rebuild(self, templates=False) -> None:
-        self.insights_module.rebuild()
-        self.accounts_module.rebuild()
         self.income_mode_module.rebuild()
         self.date_mode_module.rebuild()
+        # read on the UI thread: the worker is handed plain values
+        params = {"insights": self.insights_module.get_load_params()}
         if self.isReady:
-            self.record_module.rebuild()
+            params["records"] = self.record_module.get_load_params()
+        self._load_modules(params, templates)
+
+    @work(thread=True, exclusive=True, group="home-rebuild")
+    def _load_modules(self, params: dict, templates: bool) -> None:
+        """Fetches the data of the modules off the event loop, then updates them.
+
+        A new rebuild cancels the running one, so when scrubbing through periods only
+        the last one is loaded and displayed. The worker only queries: what to load is
+        read beforehand, and the modules are updated on the UI thread.
+        """
+        worker = get_current_worker()
+        sleep(REBUILD_DEBOUNCE)
+        if worker.is_cancelled:
+            return
+
+        # modules share one session and connection for the whole refresh
+        with unit_of_work():
+            data = {
+                "insights": self.insights_module.load(params["insights"]),
+                "accounts": self.accounts_module.load(),
+            }
+            if "records" in params and not worker.is_cancelled:
+                data["records"] = self.record_module.load(params["records"])
+
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._apply_modules, worker, params, data, templates
+            )
+
+    def _apply_modules(
+        self, worker: Worker, params: dict, data: dict, templates: bool
+    ) -> None:
+        if worker.is_cancelled:
+            return
+        self.insights_module.rebuild(data["insights"])
+        self.accounts_module.rebuild(data["accounts"])
+        if "records" in data:
+            self.record_module.rebuild(
+                data=data["records"], load_params=params["records"]
+            )
             if templates:
                 self.templates_module.rebuild(reset_state=True)
 
@@ -298,4 +343,7 @@ class Home(Static):
                     yield self.templates_module
                     yield self.record_module
                 else:
+                    # only new users see it, and its markdown viewer is slow to import
+                    from bagels.components.modules.welcome import Welcome
+
                     yield Welcome()
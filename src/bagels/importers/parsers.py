@@ -0,0 +1,252 @@
+"""Streaming parsers of bank statements.
+
+Each parser takes the path of a statement and the import rules, and yields one
+StatementLine per transaction while reading the file, so statements of any size are
+imported in constant memory.
+"""
+
+import csv
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache
+from pathlib import Path
+
+from bagels.importers.rules import CsvFormat, ImportRules, StatementImportError
+
+
+@dataclass(slots=True)
+class StatementLine:
+    date: datetime
+    amount: float  # negative for money out of the account
+    label: str
+    account: str | None = None  # account number or name given by the statement
+    category: str | None = None  # category name given by the statement
+
+
+@cache
+def _parse_date(text: str, date_format: str) -> datetime:
+    # statements repeat few distinct dates, and strptime is slow
+    return datetime.strptime(text, date_format)
+
+
+def parse_amount(text: str, decimal_separator: str = ".") -> float:
+    """Parses an amount as found in statements: with currency symbols, thousands
+    separators, and negatives as a leading or trailing minus or in parentheses."""
+    text = text.strip()
+    negative = text.startswith("(") and text.endswith(")")
+    if decimal_separator != ".":
+        text = text.replace(".", "").replace(decimal_separator, ".")
+    digits = re.sub(r"[^\d.\-]", "", text)
+    if digits.endswith("-"):
+        digits = "-" + digits[:-1]
+    if not digits.strip("-."):
+        raise ValueError(f"Invalid amount: '{text}'")
+    amount = float(digits)
+    return -abs(amount) if negative else amount
+
+
+# region CSV
+# ---------------- csv --------------- #
+
+
+def _get_column_index(column: str | int, header: list[str] | None) -> int:
+    if isinstance(column, int):
+        return column
+    if header is None:
+        raise StatementImportError(
+            f"Column '{column}' is named, but the CSV format has no header"
+        )
+    names = [name.strip().lower() for name in header]
+    try:
+        return names.index(column.strip().lower())
+    except ValueError:
+        raise StatementImportError(
+            f"Column '{column}' not found in the CSV header: {', '.join(header)}"
+        )
+
+
+def _get_csv_columns(fmt: CsvFormat, header: list[str] | None) -> dict:
+    labels = fmt.label if isinstance(fmt.label, list) else [fmt.label]
+    columns = {
+        "date": _get_column_index(fmt.date, header),
+        "label": [_get_column_index(label, header) for label in labels],
+    }
+    for key in ("amount", "debit", "credit", "account", "category"):
+        column = getattr(fmt, key)
+        columns[key] = None if column is None else _get_column_index(column, header)
+    if columns["amount"] is None and columns["debit"] is None:
+        raise StatementImportError("The CSV format needs an amount or debit column")
+    return columns
+
+
+def _get_csv_amount(row: list[str], columns: dict, fmt: CsvFormat) -> float:
+    if columns["amount"] is not None:
+        amount = parse_amount(row[columns["amount"]], fmt.decimal_separator)
+        return -amount if fmt.negate else amount
+    # separate debit and credit columns, one of which is empty
+    debit, credit = row[columns["debit"]].strip(), ""
+    if columns["credit"] is not None:
+        credit = row[columns["credit"]].strip()
+    if credit:
+        return abs(parse_amount(credit, fmt.decimal_separator))
+    return -abs(parse_amount(debit, fmt.decimal_separator)) if debit else 0
+
+
+def parse_csv(path: Path, rules: ImportRules):
+    """Yields the lines of a CSV statement, read with the columns of rules.csv."""
+    fmt = rules.csv
+    with open(path, newline="", encoding=fmt.encoding) as file:
+        reader = csv.reader(file, delimiter=fmt.delimiter)
+        for _ in range(fmt.skip_rows):
+            next(reader, None)
+        header = next(reader, None) if fmt.has_header else None
+        columns = _get_csv_columns(fmt, header)
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                label = " ".join(
+                    row[index].strip() for index in columns["label"] if row[index]
+                )
+                yield StatementLine(
+                    date=_parse_date(row[columns["date"]].strip(), fmt.date_format),
+                    amount=_get_csv_amount(row, columns, fmt),
+                    label=label,
+                    account=row[columns["account"]].strip()
+                    if columns["account"] is not None
+                    else None,
+                    category=row[columns["category"]].strip()
+                    if columns["category"] is not None
+                    else None,
+                )
+            except (IndexError, ValueError) as e:
+                raise StatementImportError(
+                    f"Invalid CSV row {reader.line_num}: {e}"
+                ) from e
+
+
+# region OFX
+# ---------------- ofx --------------- #
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_OFX_READ_SIZE = 65536
+
+
+def _iter_ofx_elements(file):
+    """Yields (is closing, tag, text) of the elements of an OFX file, read in blocks.
+
+    OFX 1.x is SGML, where leaf elements are not closed, and files are often a single
+    line, so elements are matched across blocks instead of lines.
+    """
+    buffer = ""
+    while block := file.read(_OFX_READ_SIZE):
+        buffer += block
+        # an element is complete once the next one has started
+        end = buffer.rfind("<")
+        for match in _OFX_TAG.finditer(buffer, 0, end):
+            yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[end:]
+    for match in _OFX_TAG.finditer(buffer):
+        yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+
+
+def _parse_ofx_date(text: str) -> datetime:
+    # YYYYMMDD, followed by an optional time and timezone
+    return _parse_date(text[:8], "%Y%m%d")
+
+
+def parse_ofx(path: Path, rules: ImportRules):
+    """Yields the transactions of an OFX statement, of OFX 1.x (SGML) or 2.x (XML)."""
+    with open(path, encoding="utf-8", errors="replace") as file:
+        account = None
+        transaction = None
+        for closing, tag, text in _iter_ofx_elements(file):
+            if tag == "ACCTID" and not closing:
+                account = text
+            elif tag == "STMTTRN":
+                if not closing:
+                    transaction = {}
+                    continue
+                if transaction is None:
+                    continue
+                try:
+                    label = transaction.get("NAME") or transaction.get("MEMO") or ""
+                    yield StatementLine(
+                        date=_parse_ofx_date(transaction["DTPOSTED"]),
+                        amount=parse_amount(transaction["TRNAMT"]),
+                        label=label,
+                        account=account,
+                    )
+                except (KeyError, ValueError) as e:
+                    raise StatementImportError(
+                        f"Invalid OFX transaction {transaction}: {e}"
+                    ) from e
+                transaction = None
+            elif transaction is not None and not closing and text:
+                transaction[tag] = text
+
+
+# region QIF
+# ---------------- qif --------------- #
+
+
+def _parse_qif_date(text: str, date_format: str) -> datetime:
+    # Quicken writes years after 1999 as 'YY, e.g. 1/31'24
+    text = text.strip().replace(" ", "")
+    if "'" in text:
+        text = text.replace("'", "/")
+        day_first, _, year = text.rpartition("/")
+        text = f"{day_first}/{2000 + int(year)}"
+    return _parse_date(text, date_format)
+
+
+def parse_qif(path: Path, rules: ImportRules):
+    """Yields the transactions of a QIF statement, with dates in rules.qif.date_format."""
+    date_format = rules.qif.date_format
+    with open(path, encoding="utf-8", errors="replace") as file:
+        fields = {}
+        for line_number, line in enumerate(file, start=1):
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("!"):
+                continue
+            code, value = line[0], line[1:].strip()
+            if code != "^":
+                # splits repeat the S, E and $ codes: keep the first of each
+                fields.setdefault(code, value)
+                continue
+
+            if "D" in fields and ("T" in fields or "U" in fields):
+                try:
+                    yield StatementLine(
+                        date=_parse_qif_date(fields["D"], date_format),
+                        amount=parse_amount(fields.get("T") or fields["U"]),
+                        label=fields.get("P") or fields.get("M") or "",
+                        category=fields.get("L"),
+                    )
+                except ValueError as e:
+                    raise StatementImportError(
+                        f"Invalid QIF transaction ending on line {line_number}: {e}"
+                    ) from e
+            fields = {}
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+    "qif": parse_qif,
+}
+
+
+def get_parser(path: Path, file_format: str | None = None):
+    """Returns the parser of a format, or of the file's extension without one."""
+    file_format = (file_format or path.suffix.lstrip(".")).lower()
+    if file_format == "qfx":  # Quicken's OFX
+        file_format = "ofx"
+    try:
+        return PARSERS[file_format]
+    except KeyError:
+        raise StatementImportError(
+            f"Unknown statement format '{file_format}', expected one of: {', '.join(PARSERS)}"
+        )
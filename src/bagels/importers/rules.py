@@ -0,0 +1,97 @@
+"""Rules of statement imports: how to read CSV and QIF files, and which account and
+category each statement line goes to. They are read from a YAML file, for example:
+
+    account: Checking
+    csv:
+      date: Date
+      date_format: "%d/%m/%Y"
+      label: [Payee, Reference]
+      amount: Amount
+    rules:
+      - match: "uber|lyft"
+        category: Transport
+      - match: "transfer to savings"
+        skip: true
+"""
+
+import re
+from pathlib import Path
+
+import yaml
+from pydantic import BaseModel, ValidationError, field_validator
+
+
+class StatementImportError(Exception):
+    """Raised when a statement or its import rules cannot be read."""
+
+    pass
+
+
+class CsvFormat(BaseModel):
+    # columns are header names, or 0-based indexes
+    delimiter: str = ","
+    encoding: str = "utf-8-sig"
+    has_header: bool = True
+    skip_rows: int = 0  # lines before the header, such as a bank's preamble
+    date: str | int = "Date"
+    date_format: str = "%Y-%m-%d"
+    label: str | int | list[str | int] = "Description"
+    amount: str | int | None = "Amount"  # signed, negative for money out
+    debit: str | int | None = None  # used without an amount column
+    credit: str | int | None = None
+    account: str | int | None = None
+    category: str | int | None = None
+    decimal_separator: str = "."
+    negate: bool = False  # for banks listing money out as positive amounts
+
+
+class QifFormat(BaseModel):
+    date_format: str = "%m/%d/%Y"
+
+
+class ImportRule(BaseModel):
+    match: str  # regular expression searched in labels, ignoring case
+    category: str | None = None
+    account: str | None = None
+    label: str | None = None  # replaces the statement's label
+    skip: bool = False  # leaves matching lines out of the import
+
+    @field_validator("match")
+    @classmethod
+    def validate_match(cls, value: str) -> str:
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise ValueError(f"invalid regular expression: {e}")
+        return value
+
+
+class ImportRules(BaseModel):
+    account: str | None = None  # default account
+    accounts: dict[str, str] = {}  # account numbers of statements to account names
+    category: str | None = None  # default category, else Uncategorized
+    csv: CsvFormat = CsvFormat()
+    qif: QifFormat = QifFormat()
+    rules: list[ImportRule] = []  # the first matching rule applies
+
+
+def load_rules(path: Path | None) -> ImportRules:
+    """Loads import rules from a YAML file, or the default rules without one."""
+    if path is None:
+        return ImportRules()
+    try:
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        if not isinstance(data, dict):
+            raise StatementImportError(f"Import rules {path} must be a mapping")
+        return ImportRules(**data)
+    except (OSError, yaml.YAMLError) as e:
+        raise StatementImportError(f"Could not read import rules {path}: {e}")
+    except ValidationError as e:
+        messages = [
+            f"{'.'.join(str(x) for x in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+        raise StatementImportError(
+            f"Invalid import rules {path}:\n" + "\n".join(messages)
+        )
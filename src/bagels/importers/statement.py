@@ -0,0 +1,232 @@
+"""Imports bank statements as records.
+
+Lines are parsed while the statement is read, mapped to accounts and categories by the
+import rules, and inserted one batch at a time, each batch in one transaction. Lines
+already recorded, such as those of a statement imported twice or entered by hand, are
+skipped: records are matched by fingerprint, loaded once per account for the dates the
+statement covers.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import batched
+from pathlib import Path
+
+from bagels.config import CONFIG
+from bagels.importers.parsers import StatementLine, get_parser
+from bagels.importers.rules import ImportRules, StatementImportError
+from bagels.managers.accounts import get_all_accounts
+from bagels.managers.categories import create_category, get_all_categories_by_freq
+from bagels.managers.records import (
+    create_records_and_splits,
+    get_record_fingerprint,
+    get_record_fingerprints,
+)
+from bagels.models.category import Nature
+
+IMPORT_CHUNK_SIZE = 1000  # statement lines per batch, and per transaction
+
+# the category of lines nothing categorizes, without a default one in the rules
+UNCATEGORIZED = {"name": "Uncategorized", "nature": Nature.WANT, "color": "#808080"}
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0  # left out by rules, or without an amount
+
+
+def _get_ids_by_name(items) -> dict[str, int]:
+    ids = {}
+    for item in items:
+        ids.setdefault(item.name.strip().lower(), item.id)
+    return ids
+
+
+class _LineMapper:
+    """Maps statement lines to record data, following the import rules."""
+
+    def __init__(self, rules: ImportRules, account: str | None):
+        self.rules = rules
+        self.patterns = [re.compile(rule.match, re.IGNORECASE) for rule in rules.rules]
+        self.account_ids = _get_ids_by_name(get_all_accounts(get_hidden=True))
+        self.category_ids = _get_ids_by_name(
+            category for category, _ in get_all_categories_by_freq()
+        )
+        self.default_account = account or rules.account
+
+        # fail before reading the statement on names that do not exist
+        for name in [self.default_account, *rules.accounts.values()]:
+            self._get_account_id(name)
+        for rule in rules.rules:
+            self._get_account_id(rule.account)
+            self._get_category_id(rule.category)
+        self._get_category_id(rules.category)
+
+    def _get_account_id(self, name: str | None) -> int | None:
+        if name is None:
+            return None
+        try:
+            return self.account_ids[name.strip().lower()]
+        except KeyError:
+            raise StatementImportError(f"No account named '{name}'")
+
+    def _get_category_id(self, name: str | None) -> int | None:
+        if name is None:
+            return None
+        try:
+            return self.category_ids[name.strip().lower()]
+        except KeyError:
+            raise StatementImportError(f"No category named '{name}'")
+
+    def get_uncategorized_id(self) -> int:
+        """Returns the ID of the Uncategorized category, creating it if missing."""
+        name = UNCATEGORIZED["name"].lower()
+        if name not in self.category_ids:
+            self.category_ids[name] = create_category(UNCATEGORIZED).id
+        return self.category_ids[name]
+
+    def map(self, line: StatementLine) -> dict | None:
+        """Returns the record data of a line, or None if a rule skips it.
+
+        Lines nothing categorizes get no category: see get_uncategorized_id.
+        """
+        rule = next(
+            (
+                rule
+                for rule, pattern in zip(self.rules.rules, self.patterns)
+                if pattern.search(line.label)
+            ),
+            None,
+        )
+        if rule is not None and rule.skip:
+            return None
+
+        account = rule.account if rule and rule.account else None
+        if account is None and line.account is not None:
+            account = self.rules.accounts.get(line.account)
+            if account is None and line.account.strip().lower() in self.account_ids:
+                account = line.account
+        account = account or self.default_account
+        if account is None:
+            raise StatementImportError(
+                "No account to import into: pass --account or set one in the rules"
+            )
+
+        category_id = None
+        if rule and rule.category:
+            category_id = self._get_category_id(rule.category)
+        elif line.category:
+            # the statement's own category, when it is one of ours
+            category_id = self.category_ids.get(line.category.strip().lower())
+        if category_id is None:
+            category_id = self._get_category_id(self.rules.category)
+
+        return {
+            "label": (rule.label if rule and rule.label else line.label) or "Imported",
+            "amount": abs(line.amount),
+            "date": line.date,
+            "accountId": self._get_account_id(account),
+            "categoryId": category_id,
+            "isIncome": line.amount > 0,
+        }
+
+
+class _Fingerprints:
+    """Fingerprints of the existing records of the dates seen so far, per account.
+
+    The dates loaded of an account only ever grow, so records imported in earlier
+    batches are never loaded, and lines repeated within a statement are all imported.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.loaded = {}  # account ID: (first day, day after the last)
+
+    def _load(self, account_id: int, start: datetime, end: datetime) -> None:
+        if start < end:
+            self.counts.update(get_record_fingerprints(account_id, start, end))
+
+    def load(self, records: list[dict]) -> None:
+        days = {}
+        for record in records:
+            day = record["date"].replace(hour=0, minute=0, second=0, microsecond=0)
+            first, last = days.get(record["accountId"], (day, day))
+            days[record["accountId"]] = (min(first, day), max(last, day))
+
+        for account_id, (first, last) in days.items():
+            end = last + timedelta(days=1)
+            if account_id not in self.loaded:
+                self._load(account_id, first, end)
+                self.loaded[account_id] = (first, end)
+                continue
+            loaded_start, loaded_end = self.loaded[account_id]
+            self._load(account_id, first, loaded_start)
+            self._load(account_id, loaded_end, end)
+            self.loaded[account_id] = (min(first, loaded_start), max(end, loaded_end))
+
+    def take(self, record: dict) -> bool:
+        """Returns whether a record is already recorded, matching it to one record."""
+        fingerprint = get_record_fingerprint(
+            record["date"],
+            record["amount"],
+            record["isIncome"],
+            record["accountId"],
+            record["label"],
+        )
+        if self.counts[fingerprint] > 0:
+            self.counts[fingerprint] -= 1
+            return True
+        return False
+
+
+def import_statement(
+    path: Path,
+    rules: ImportRules,
+    account: str | None = None,
+    file_format: str | None = None,
+    dry_run: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_progress=None,
+) -> ImportResult:
+    """Imports the lines of a statement as records.
+
+    Args:
+        path (Path): The statement file.
+        rules (ImportRules): Formats and mappings of the import.
+        account (str): Name of the account to import into, unless set by a rule.
+        file_format (str): One of PARSERS, or None to use the file extension.
+        dry_run (bool): Count what would be imported without writing anything.
+        on_progress: Called with the number of lines read after each batch.
+    """
+    parse = get_parser(path, file_format)
+    mapper = _LineMapper(rules, account)
+    fingerprints = _Fingerprints()
+    result = ImportResult()
+
+    for lines in batched(parse(path, rules), chunk_size):
+        records = []
+        for line in lines:
+            amount = round(line.amount, CONFIG.defaults.round_decimals)
+            record = mapper.map(line) if amount else None
+            if record is None:
+                result.skipped += 1
+            else:
+                records.append(record)
+
+        fingerprints.load(records)
+        new_records = [record for record in records if not fingerprints.take(record)]
+        result.duplicates += len(records) - len(new_records)
+        result.imported += len(new_records)
+        if new_records and not dry_run:
+            for record in new_records:
+                if record["categoryId"] is None:
+                    record["categoryId"] = mapper.get_uncategorized_id()
+            create_records_and_splits([(record, []) for record in new_records])
+        if on_progress:
+            on_progress(len(lines))
+
+    return result
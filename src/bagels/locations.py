@@ -1,6 +1,11 @@
 from pathlib import Path
 from typing import Optional
-from xdg_base_dirs import xdg_config_home, xdg_data_home
+from xdg_base_dirs import (
+    xdg_cache_home,
+    xdg_config_home,
+    xdg_data_home,
+    xdg_state_home,
+)
 
 # Store the custom root directory
 _custom_root: Optional[Path] = None
@@ -33,9 +38,31 @@ def config_directory() -> Path:
     return _app_directory(xdg_config_home())
 
 
+def state_directory() -> Path:
+    """Return (possibly creating) the application state directory."""
+    return _app_directory(xdg_state_home())
+
+
+def cache_directory() -> Path:
+    """Return (possibly creating) the application cache directory."""
+    return _app_directory(xdg_cache_home())
+
+
 def config_file() -> Path:
     return config_directory() / "config.yaml"
 
 
+def config_cache_file() -> Path:
+    return cache_directory() / "config.msgpack"
+
+
+def state_file() -> Path:
+    return state_directory() / "state.json"
+
+
 def database_file() -> Path:
     return data_directory() / "db.db"
+
+
+def update_check_file() -> Path:
+    return data_directory() / "update_check.json"
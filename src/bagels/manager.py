@@ -10,6 +10,7 @@ from bagels.components.modules.people import People
 from bagels.components.modules.spending import Spending
 from bagels.managers.accounts import get_accounts_count
 from bagels.managers.categories import get_categories_count
+from bagels.models.database.app import unit_of_work
 
 
 class Manager(Static):
@@ -35,10 +36,11 @@ class Manager(Static):
 
     def rebuild(self) -> None:
         if self.isReady:
-            self.spendings_module.rebuild()
-            self.categories_module.rebuild()
-            self.budgets_module.rebuild()
-            self.people_module.rebuild()
+            with unit_of_work():
+                self.spendings_module.rebuild()
+                self.categories_module.rebuild()
+                self.budgets_module.rebuild()
+                self.people_module.rebuild()
 
     # region Callbacks
     # ------------- Callbacks ------------ #
@@ -1,16 +1,22 @@
+from collections import defaultdict
 from datetime import datetime
 
-from sqlalchemy import select
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import joinedload
 
 from bagels.config import CONFIG
+from bagels.managers.cache import cached_query
+from bagels.managers.views import AccountView
 from bagels.models.account import Account
-from bagels.models.database.app import db_engine
+from bagels.models.account_balance import (
+    AccountBalance,
+    build_account_balances,
+    select_account_nets,
+)
+from bagels.models.database.app import Session
 from bagels.models.record import Record
 from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Create
 
@@ -20,6 +26,8 @@ def create_account(data):
     try:
         new_account = Account(**data)
         session.add(new_account)
+        session.flush()
+        session.add(AccountBalance(accountId=new_account.id, net=0))
         session.commit()
         session.refresh(new_account)
         session.expunge(new_account)
@@ -31,8 +39,57 @@ def create_account(data):
 # region Read
 
 
+def _calculate_account_net(accountId, session):
+    """Returns the net movement of an account from its entire history of records and splits."""
+    net = 0
+
+    # Get all records for this account
+    records = session.query(Record).filter(Record.accountId == accountId).all()
+
+    # Calculate balance from records
+    for record in records:
+        if record.isTransfer:
+            # For transfers, subtract full amount (transfers out)
+            net -= record.amount
+        elif record.isIncome:
+            # For income records, add full amount
+            net += record.amount
+        else:
+            # For expense records, subtract full amount
+            net -= record.amount
+
+    # Get all records where this account is the transfer destination
+    transfer_to_records = (
+        session.query(Record)
+        .filter(Record.transferToAccountId == accountId, Record.isTransfer == True)  # noqa
+        .all()
+    )
+
+    # Add transfers into this account
+    for record in transfer_to_records:
+        net += record.amount
+
+    # Get all splits where this account is specified
+    splits = (
+        session.query(Split)
+        .filter(Split.accountId == accountId)
+        .options(joinedload(Split.record))
+        .all()
+    )
+
+    # Add paid splits (they represent money coming into this account)
+    for split in splits:
+        if split.isPaid:
+            if split.record.isIncome:
+                net -= split.amount
+            else:
+                net += split.amount
+
+    return net
+
+
 def get_account_balance(accountId, session=None):
-    """Returns the net balance of an account.
+    """Returns the net balance of an account, computed from its entire history.
 
     Rules:
     - Consider all record "account" and split "account"
@@ -57,43 +114,7 @@ def get_account_balance(accountId, session=None):
             .first()
             .beginningBalance
         )
-
-        # Get all records for this account
-        records = session.query(Record).filter(Record.accountId == accountId).all()
-
-        # Calculate balance from records
-        for record in records:
-            if record.isTransfer:
-                # For transfers, subtract full amount (transfers out)
-                balance -= record.amount
-            elif record.isIncome:
-                # For income records, add full amount
-                balance += record.amount
-            else:
-                # For expense records, subtract full amount
-                balance -= record.amount
-
-        # Get all records where this account is the transfer destination
-        transfer_to_records = (
-            session.query(Record)
-            .filter(Record.transferToAccountId == accountId, Record.isTransfer == True)  # noqa
-            .all()
-        )
-
-        # Add transfers into this account
-        for record in transfer_to_records:
-            balance += record.amount
-
-        # Get all splits where this account is specified
-        splits = session.query(Split).filter(Split.accountId == accountId).all()
-
-        # Add paid splits (they represent money coming into this account)
-        for split in splits:
-            if split.isPaid:
-                if split.record.isIncome:
-                    balance -= split.amount
-                else:
-                    balance += split.amount
+        balance += _calculate_account_net(accountId, session)
 
         return round(balance, CONFIG.defaults.round_decimals)
     finally:
@@ -110,6 +131,7 @@ def _get_base_accounts_query(get_hidden=False):
     return stmt
 
 
+@cached_query
 def get_all_accounts(get_hidden=False):
     session = Session()
     try:
@@ -119,6 +141,7 @@ def get_all_accounts(get_hidden=False):
         session.close()
 
 
+@cached_query
 def get_accounts_count(get_hidden=False):
     session = Session()
     try:
@@ -128,22 +151,33 @@ def get_accounts_count(get_hidden=False):
         session.close()
 
 
-def get_all_accounts_with_balance(get_hidden=False):
+@cached_query
+def get_all_accounts_with_balance(get_hidden=False) -> list[AccountView]:
     session = Session()
     try:
-        stmt = _get_base_accounts_query(get_hidden)
-        accounts = session.scalars(stmt).all()
-        for account in accounts:
-            account.balance = get_account_balance(account.id, session)
-        return accounts
+        stmt = _get_base_accounts_query(get_hidden).with_only_columns(
+            Account.id,
+            Account.name,
+            Account.description,
+            Account.beginningBalance,
+            Account.repaymentDate,
+            Account.hidden,
+        )
+        accounts = session.execute(stmt).all()
+        balances = _get_ledger_balances(accounts, session)
+        return [
+            AccountView(*account, balance=balances[account.id]) for account in accounts
+        ]
     finally:
         session.close()
 
 
+@cached_query
 def get_account_balance_by_id(account_id):
     session = Session()
     try:
-        return get_account_balance(account_id, session)
+        account = session.get(Account, account_id)
+        return _get_ledger_balances([account], session)[account_id]
     finally:
         session.close()
 
@@ -188,3 +222,190 @@ def delete_account(account_id):
         return False
     finally:
         session.close()
+
+
+# region Ledger
+
+
+def _add_record_changes(
+    changes, amount, account_id, transfer_to_account_id, is_income, is_transfer, sign
+) -> None:
+    if is_transfer:
+        changes[account_id] -= sign * amount
+        changes[transfer_to_account_id] += sign * amount
+    elif is_income:
+        changes[account_id] += sign * amount
+    else:
+        changes[account_id] -= sign * amount
+
+
+def _add_split_changes(changes, amount, account_id, is_paid, is_income, sign) -> None:
+    if is_paid and account_id is not None:
+        changes[account_id] += sign * (-amount if is_income else amount)
+
+
+def get_split_balance_changes(split, is_income: bool, sign: int = 1) -> dict:
+    """Returns the account balance changes caused by a split, keyed by account ID.
+
+    Only paid splits with an account move money: back out of the account for income
+    records, into the account for expense records.
+    """
+    changes = defaultdict(float)
+    _add_split_changes(
+        changes, split.amount, split.accountId, split.isPaid, is_income, sign
+    )
+    return changes
+
+
+def get_record_balance_changes(record, sign: int = 1) -> dict:
+    """Returns the account balance changes caused by a record and its splits, keyed by account ID.
+
+    Args:
+        record (Record): The record, with its splits loadable.
+        sign (int): 1 when the record is added, -1 when it is removed.
+    """
+    changes = defaultdict(float)
+    _add_record_changes(
+        changes,
+        record.amount,
+        record.accountId,
+        record.transferToAccountId,
+        record.isIncome,
+        record.isTransfer,
+        sign,
+    )
+    for split in record.splits:
+        _add_split_changes(
+            changes, split.amount, split.accountId, split.isPaid, record.isIncome, sign
+        )
+    return changes
+
+
+def get_row_balance_changes(record: dict, splits: list[dict], sign: int = 1) -> dict:
+    """Returns the account balance changes caused by a record and its splits given as
+    rows, for writes that insert rows without loading entities.
+
+    Args:
+        record (dict): The record's row, with every column the ledger reads.
+        splits (list[dict]): The rows of its splits, likewise.
+        sign (int): 1 when the record is added, -1 when it is removed.
+    """
+    changes = defaultdict(float)
+    _add_record_changes(
+        changes,
+        record["amount"],
+        record["accountId"],
+        record["transferToAccountId"],
+        record["isIncome"],
+        record["isTransfer"],
+        sign,
+    )
+    for split in splits:
+        _add_split_changes(
+            changes,
+            split["amount"],
+            split["accountId"],
+            split["isPaid"],
+            record["isIncome"],
+            sign,
+        )
+    return changes
+
+
+def merge_balance_changes(*all_changes: dict) -> dict:
+    """Sums several balance change mappings into one."""
+    merged = defaultdict(float)
+    for changes in all_changes:
+        for account_id, amount in changes.items():
+            merged[account_id] += amount
+    return merged
+
+
+def adjust_account_balances(session, changes: dict) -> None:
+    """Applies balance changes to the ledger within the caller's transaction.
+
+    Accounts without a ledger row are left alone, as their balance is computed from
+    history until the row is built.
+    """
+    for account_id, amount in changes.items():
+        if account_id is None or not amount:
+            continue
+        session.execute(
+            update(AccountBalance)
+            .where(AccountBalance.accountId == account_id)
+            .values(net=AccountBalance.net + amount)
+            # ledger rows are not loaded as entities: skip matching the identity map
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _get_ledger_balances(accounts, session) -> dict:
+    """Returns the ledger balance of each account. Reads only: accounts without a
+    ledger row are computed from history, and left without one."""
+    account_ids = [account.id for account in accounts]
+    ledger = dict(
+        session.execute(
+            select(AccountBalance.accountId, AccountBalance.net).where(
+                AccountBalance.accountId.in_(account_ids)
+            )
+        ).all()
+    )
+    missing = [account_id for account_id in account_ids if account_id not in ledger]
+    if missing:
+        ledger.update(
+            session.execute(select_account_nets().where(Account.id.in_(missing))).all()
+        )
+
+    return {
+        account.id: round(
+            account.beginningBalance + ledger[account.id],
+            CONFIG.defaults.round_decimals,
+        )
+        for account in accounts
+    }
+
+
+def reset_account_balances(session) -> None:
+    """Rebuilds the ledger from history within the caller's transaction, after writes
+    that bypass the managers."""
+    session.execute(delete(AccountBalance))
+    build_account_balances(session)
+
+
+def rebuild_account_balances() -> int:
+    """Recomputes the ledger of every account from scratch. Returns the number of accounts."""
+    session = Session()
+    try:
+        reset_account_balances(session)
+        session.commit()
+        return session.scalar(select(func.count(Account.id)))
+    finally:
+        session.close()
+
+
+def verify_account_balances() -> list[tuple[Account, float, float]]:
+    """Compares the ledger with balances computed from history.
+
+    Returns:
+        list of (account, ledger balance, computed balance) for every mismatching account.
+    """
+    session = Session()
+    try:
+        accounts = session.scalars(select(Account)).all()
+        ledger = {
+            row.accountId: row.net for row in session.scalars(select(AccountBalance))
+        }
+        mismatches = []
+        for account in accounts:
+            if account.id not in ledger:
+                continue
+            ledger_balance = round(
+                account.beginningBalance + ledger[account.id],
+                CONFIG.defaults.round_decimals,
+            )
+            computed_balance = get_account_balance(account.id, session)
+            if ledger_balance != computed_balance:
+                mismatches.append((account, ledger_balance, computed_balance))
+        return mismatches
+    finally:
+        session.close()
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bagels.models.database.app import has_uncommitted_writes
+
+MAX_ENTRIES = 256
+
+_lock = Lock()
+_entries: OrderedDict = OrderedDict()
+_data_version = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+# region Version
+# -------------- version ------------- #
+
+
+def get_data_version() -> int:
+    """Returns the global data version, bumped on every committed write."""
+    return _data_version
+
+
+def bump_data_version() -> None:
+    """Marks all cached query results as stale."""
+    global _data_version
+    with _lock:
+        _data_version += 1
+        _entries.clear()
+
+
+@event.listens_for(Engine, "commit")
+def receive_commit(conn):
+    # Every create / update / delete goes through a commit, while reads close their
+    # session without one, so commits are exactly the points where cached data expires.
+    bump_data_version()
+
+
+# region Cache
+# --------------- cache -------------- #
+
+
+def cached_query(func):
+    """Caches the results of a manager read function, keyed by its arguments.
+
+    Results are shared between callers and must be treated as read-only. Entries expire
+    when the data version changes or the day changes (periods are relative to today),
+    and the least recently used entries are evicted past MAX_ENTRIES. Calls passing an
+    explicit session, or made in a unit of work holding uncommitted writes, bypass the
+    cache, as they may see those writes.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if kwargs.get("session") is not None or has_uncommitted_writes():
+            return func(*args, **kwargs)
+
+        key = (
+            func.__module__,
+            func.__qualname__,
+            args,
+            tuple(sorted(kwargs.items())),
+            date.today(),
+        )
+        try:
+            with _lock:
+                if key in _entries:
+                    _entries.move_to_end(key)
+                    _stats["hits"] += 1
+                    return _entries[key]
+                _stats["misses"] += 1
+                version = _data_version
+        except TypeError:  # unhashable arguments
+            return func(*args, **kwargs)
+
+        result = func(*args, **kwargs)
+
+        with _lock:
+            if version == _data_version:
+                _entries[key] = result
+                if len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+        return result
+
+    return wrapper
+
+
+def clear_cache() -> None:
+    """Drops every cached result and resets statistics."""
+    with _lock:
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
+
+
+def get_cache_stats() -> dict:
+    """Returns hit / miss statistics of the query cache."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "size": len(_entries),
+            "max_size": MAX_ENTRIES,
+            "version": _data_version,
+            "hit_rate": round(_stats["hits"] / lookups, 2) if lookups else 0,
+        }
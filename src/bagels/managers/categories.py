@@ -2,17 +2,24 @@ from datetime import datetime
 
 from rich.text import Text
 from sqlalchemy import desc, func, select
-from sqlalchemy.orm import joinedload, sessionmaker
-
-from bagels.managers.utils import get_start_end_of_period
+from sqlalchemy.orm import aliased, joinedload
+
+from bagels.managers.cache import cached_query
+from bagels.managers.monthly_totals import set_category_nature
+from bagels.managers.utils import (
+    get_period_months,
+    get_split_total_column,
+    get_start_end_of_period,
+)
+from bagels.managers.views import CategoryAmountView, CategoryRef, CategoryView
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.models.database.app import Session
+from bagels.models.monthly_total import MonthlyTotal
 from bagels.models.record import Record
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Get
+@cached_query
 def get_categories_count():
     """Count all categories excluding deleted ones."""
     session = Session()
@@ -23,56 +30,82 @@ def get_categories_count():
         session.close()
 
 
-def get_all_categories_tree() -> list[tuple[Category, Text, int]]:
+def _select_category_views():
+    parent = aliased(Category)
+    return (
+        select(
+            Category.id,
+            Category.name,
+            Category.color,
+            Category.nature,
+            Category.parentCategoryId,
+            parent.name,
+            parent.color,
+        )
+        .outerjoin(parent, Category.parentCategoryId == parent.id)
+        .filter(Category.deletedAt.is_(None))
+    )
+
+
+def _get_category_view(row) -> CategoryView:
+    return CategoryView(
+        id=row[0],
+        name=row[1],
+        color=row[2],
+        nature=row[3],
+        parentCategoryId=row[4],
+        parentCategory=CategoryRef(row[4], row[5], row[6])
+        if row[4] is not None
+        else None,
+    )
+
+
+@cached_query
+def get_all_categories_tree() -> list[tuple[CategoryView, Text, int]]:
     """Retrieve all categories in a hierarchical tree format."""
     session = Session()
     try:
-        stmt = (
-            select(Category)
-            .options(joinedload(Category.parentCategory))
-            .order_by(Category.id)
-            .filter(Category.deletedAt.is_(None))
-        )
-        categories = session.scalars(stmt).all()
+        stmt = _select_category_views().order_by(Category.id)
+        categories = [_get_category_view(row) for row in session.execute(stmt)]
+
+        children = {}
+        for category in categories:
+            children.setdefault(category.parentCategoryId, []).append(category)
 
         def build_category_tree(parent_id=None, depth=0):
             result = []
-            for category in categories:
-                if category.parentCategoryId == parent_id:
-                    if depth == 0:
-                        node = Text("●", style=category.color)
-                    else:
-                        node = Text(
-                            " " * (depth - 1)
-                            + ("└" if is_last(category, parent_id) else "├"),
-                            style=category.color,
-                        )
-                    result.append((category, node, depth))
-                    result.extend(build_category_tree(category.id, depth + 1))
+            siblings = children.get(parent_id, [])
+            for category in siblings:
+                if depth == 0:
+                    node = Text("●", style=category.color)
+                else:
+                    node = Text(
+                        " " * (depth - 1) + ("└" if category is siblings[-1] else "├"),
+                        style=category.color,
+                    )
+                result.append((category, node, depth))
+                result.extend(build_category_tree(category.id, depth + 1))
             return result
 
-        def is_last(category, parent_id):
-            siblings = [cat for cat in categories if cat.parentCategoryId == parent_id]
-            return category == siblings[-1]
-
         return build_category_tree()
     finally:
         session.close()
 
 
-def get_all_categories_by_freq():
+@cached_query
+def get_all_categories_by_freq() -> list[tuple[CategoryView, int]]:
     """Retrieve all categories ordered by the frequency of their usage in records."""
     session = Session()
     try:
+        record_count = func.count(Record.id).label("record_count")
         stmt = (
-            select(Category, func.count(Category.records).label("record_count"))
-            .outerjoin(Category.records)
+            _select_category_views()
+            .add_columns(record_count)
+            .outerjoin(Record, Record.categoryId == Category.id)
             .group_by(Category.id)
-            .order_by(desc("record_count"))
-            .options(joinedload(Category.parentCategory))
-            .filter(Category.deletedAt.is_(None))
+            .order_by(desc(record_count))
         )
-        return session.execute(stmt).all()
+        return [(_get_category_view(row), row[-1]) for row in session.execute(stmt)]
     finally:
         session.close()
 
@@ -92,61 +125,72 @@ def get_category_by_id(category_id):
         session.close()
 
 
+@cached_query
 def get_all_categories_records(
     offset: int = 0,
     offset_type: str = "month",
     is_income: bool = True,
     subcategories: bool = False,
     account_id: int = None,
-):
+) -> list[CategoryAmountView]:
     """
     Retrieve all categories with their net income or expenses, sorted by total amount.
     """
     session = Session()
     try:
-        start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
-
-        stmt = select(Record).options(joinedload(Record.category))
-        if account_id is not None:
-            stmt = stmt.filter(Record.accountId == account_id)
-        stmt = stmt.filter(
-            Record.date >= start_of_period,
-            Record.date < end_of_period,
-            Record.isIncome == is_income,
+        # whole months are read from the monthly totals, weeks and days from records
+        months = get_period_months(offset_type, offset)
+        if months is not None:
+            source_category_id = MonthlyTotal.categoryId
+            source_amount = MonthlyTotal.amount
+            filters = [
+                MonthlyTotal.month.between(*months),
+                MonthlyTotal.isIncome == is_income,
+            ]
+            if account_id is not None:
+                filters.append(MonthlyTotal.accountId == account_id)
+        else:
+            start_of_period, end_of_period = get_start_end_of_period(
+                offset, offset_type
+            )
+            source_category_id = Record.categoryId
+            source_amount = Record.amount - get_split_total_column()
+            filters = [
+                Record.date >= start_of_period,
+                Record.date < end_of_period,
+                Record.isIncome == is_income,
+            ]
+            if account_id is not None:
+                filters.append(Record.accountId == account_id)
+
+        # subcategory amounts count towards their parent unless asked otherwise
+        record_category = aliased(Category)
+        category_id = (
+            source_category_id
+            if subcategories
+            else func.coalesce(record_category.parentCategoryId, source_category_id)
+        ).label("categoryId")
+        totals = (
+            select(category_id, func.sum(source_amount).label("amount"))
+            .join(record_category, source_category_id == record_category.id)
+            .filter(*filters)
+            .group_by(category_id)
+            .subquery()
         )
 
-        category_totals = {}
-        records = session.scalars(stmt).all()
-        for record in records:
-            split_total = sum(split.amount for split in record.splits)
-            record_amount = record.amount - split_total
-
-            if record.category is None:
-                continue
-
-            category_id = record.categoryId
-            if not subcategories and record.category.parentCategoryId:
-                category_id = record.category.parentCategoryId
-
-            if category_id not in category_totals:
-                category_totals[category_id] = 0
-            category_totals[category_id] += record_amount
-
         stmt = (
-            select(Category)
-            .filter(
-                Category.id.in_(category_totals.keys()), Category.deletedAt.is_(None)
+            select(
+                Category.id,
+                Category.name,
+                Category.color,
+                Category.nature,
+                totals.c.amount,
             )
-            .options(joinedload(Category.parentCategory))
+            .join(totals, totals.c.categoryId == Category.id)
+            .filter(Category.deletedAt.is_(None), totals.c.amount != 0)
+            .order_by(totals.c.amount.desc())
         )
-        categories = session.scalars(stmt).all()
-        for category in categories:
-            category.amount = category_totals[category.id]
-
-        categories = [cat for cat in categories if cat.amount != 0]
-        categories.sort(key=lambda cat: cat.amount, reverse=True)
-
-        return categories
+        return [CategoryAmountView(*row) for row in session.execute(stmt)]
     finally:
         session.close()
 
@@ -175,6 +219,8 @@ def update_category(category_id, data):
         if category:
             for key, value in data.items():
                 setattr(category, key, value)
+            if "nature" in data:
+                set_category_nature(session, category_id, category.nature)
             session.commit()
             session.refresh(category)
             session.expunge(category)
@@ -0,0 +1,158 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from bagels.config import CONFIG
+from bagels.models.category import Category
+from bagels.models.database.app import Session
+from bagels.models.monthly_total import (
+    MonthlyTotal,
+    build_monthly_totals,
+    get_month,
+    select_monthly_totals,
+)
+
+_KEY_COLUMNS = ("month", "accountId", "categoryId", "isIncome", "nature")
+
+
+# region Changes
+# -------------- changes ------------- #
+
+
+def _get_record_key(session, record) -> tuple:
+    category = session.get(Category, record.categoryId) if record.categoryId else None
+    return (
+        get_month(record.date),
+        record.accountId,
+        record.categoryId,
+        record.isIncome,
+        category.nature if category else None,
+    )
+
+
+def get_record_total_changes(session, record, sign: int = 1) -> dict:
+    """Returns the monthly total changes caused by a record less its splits.
+
+    Args:
+        record (Record): The record, with its splits loadable.
+        sign (int): 1 when the record is added, -1 when it is removed.
+    """
+    if record.isTransfer:
+        return {}
+    amount = record.amount - sum(split.amount for split in record.splits)
+    return {_get_record_key(session, record): sign * amount}
+
+
+def get_split_total_changes(session, split, sign: int = 1) -> dict:
+    """Returns the monthly total changes caused by a split, which lessens its record."""
+    if split.record.isTransfer:
+        return {}
+    return {_get_record_key(session, split.record): -sign * split.amount}
+
+
+def adjust_monthly_totals(session, *all_changes: dict) -> None:
+    """Applies monthly total changes within the caller's transaction.
+
+    Existing totals are looked up once, then updated and created with one executemany
+    each, so large batches of changes cost a few statements.
+    """
+    merged = defaultdict(float)
+    for changes in all_changes:
+        for key, amount in changes.items():
+            merged[key] += amount
+    decimals = CONFIG.defaults.round_decimals
+    merged = {
+        key: round(amount, decimals)
+        for key, amount in merged.items()
+        if round(amount, decimals)
+    }
+    if not merged:
+        return
+
+    key_columns = [getattr(MonthlyTotal, column) for column in _KEY_COLUMNS]
+    existing = {
+        tuple(row[1:]): row[0]
+        for row in session.execute(
+            select(MonthlyTotal.id, *key_columns).where(
+                MonthlyTotal.month.in_({key[0] for key in merged})
+            )
+        )
+    }
+    updates = [
+        {"total_id": existing[key], "change": amount}
+        for key, amount in merged.items()
+        if key in existing
+    ]
+    inserts = [
+        {**dict(zip(_KEY_COLUMNS, key)), "amount": amount}
+        for key, amount in merged.items()
+        if key not in existing
+    ]
+
+    # on the table rather than the entity, for plain executemany statements
+    table = MonthlyTotal.__table__
+    if updates:
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("total_id"))
+            .values(amount=func.round(table.c.amount + bindparam("change"), decimals)),
+            updates,
+        )
+    if inserts:
+        session.execute(insert(MonthlyTotal), inserts)
+
+
+def set_category_nature(session, category_id: int, nature) -> None:
+    """Updates the nature of a category's monthly totals within the caller's transaction."""
+    session.execute(
+        update(MonthlyTotal)
+        .where(MonthlyTotal.categoryId == category_id)
+        .values(nature=nature)
+    )
+
+
+# region Rebuild
+# -------------- rebuild ------------- #
+
+
+def rebuild_monthly_totals() -> int:
+    """Recomputes the monthly totals from scratch. Returns the number of rows."""
+    session = Session()
+    try:
+        build_monthly_totals(session)
+        session.commit()
+        return session.scalar(select(func.count()).select_from(MonthlyTotal))
+    finally:
+        session.close()
+
+
+def verify_monthly_totals() -> list[tuple[tuple, float, float]]:
+    """Compares the monthly totals with totals computed from history.
+
+    Returns:
+        list of (key, stored amount, computed amount) for every mismatching key, where
+        key is (month, accountId, categoryId, isIncome, nature).
+    """
+    session = Session()
+    try:
+        stored = {
+            tuple(row[:-1]): row[-1]
+            for row in session.execute(
+                select(
+                    *(getattr(MonthlyTotal, column) for column in _KEY_COLUMNS),
+                    MonthlyTotal.amount,
+                )
+            )
+        }
+        computed = {
+            tuple(row[:-1]): row[-1] for row in session.execute(select_monthly_totals())
+        }
+        mismatches = []
+        for key in stored.keys() | computed.keys():
+            stored_amount = stored.get(key, 0)
+            computed_amount = computed.get(key, 0)
+            if round(stored_amount - computed_amount, CONFIG.defaults.round_decimals):
+                mismatches.append((key, stored_amount, computed_amount))
+        return sorted(mismatches, key=lambda mismatch: mismatch[0][:2])
+    finally:
+        session.close()
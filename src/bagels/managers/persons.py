@@ -1,17 +1,30 @@
-from dataclasses import dataclass
-
-from sqlalchemy import and_, column, desc, func, select
-from sqlalchemy.orm import contains_eager, sessionmaker
-
-from bagels.managers.utils import get_operator_amount, get_start_end_of_period
+from sqlalchemy import and_, case, delete, func, insert, select
+
+from bagels.config import CONFIG
+
+from bagels.managers.cache import cached_query
+from bagels.managers.utils import (
+    get_label_search_filter,
+    get_operator_amount,
+    get_start_end_of_period,
+)
+from bagels.managers.views import (
+    AccountRef,
+    CategoryRef,
+    PersonDueView,
+    PersonSplitView,
+    PersonView,
+    SplitRecordView,
+    get_shared_ref,
+)
+from bagels.models.account import Account
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.models.database.app import Session
 from bagels.models.person import Person
+from bagels.models.person_balance import PersonBalance
 from bagels.models.record import Record
 from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Create
 
@@ -51,13 +64,14 @@ def get_person_by_id(person_id) -> Person:
         session.close()
 
 
+@cached_query
 def get_persons_with_splits(
     offset: int = 0,
     offset_type: str = "month",
     category_piped_names: str = None,
     operator_amount: str = None,
     label: str = None,
-):
+) -> list[PersonView]:
     """Get all persons with their splits for the specified period."""
     session = Session()
     try:
@@ -65,17 +79,28 @@ def get_persons_with_splits(
 
         # Build the base query
         stmt = (
-            select(Person)
-            .options(
-                contains_eager(Person.splits)
-                .contains_eager(Split.record)
-                .contains_eager(Record.category),
-                contains_eager(Person.splits).contains_eager(Split.account),
+            select(
+                Person.id,
+                Person.name,
+                Split.id,
+                Split.amount,
+                Split.isPaid,
+                Split.paidDate,
+                Account.id,
+                Account.name,
+                Account.hidden,
+                Record.id,
+                Record.label,
+                Record.date,
+                Record.isIncome,
+                Category.id,
+                Category.name,
+                Category.color,
             )
-            .join(Person.splits)
-            .join(Split.record)
-            .outerjoin(Record.category)
-            .outerjoin(Split.account)
+            .join(Split, Split.personId == Person.id)
+            .join(Record, Split.recordId == Record.id)
+            .outerjoin(Category, Record.categoryId == Category.id)
+            .outerjoin(Account, Split.accountId == Account.id)
         )
 
         # Apply date filter
@@ -95,71 +120,85 @@ def get_persons_with_splits(
                 stmt = stmt.filter(Split.amount.op(operator)(amount))
 
         # Apply label filter
-        if label not in [None, ""]:
-            stmt = stmt.filter(Record.label.ilike(f"%{label}%"))
-
-        # Apply ordering and distinct
-        stmt = stmt.order_by(Record.date.asc()).distinct()
-
-        result = session.scalars(stmt)
-        return result.unique().all()
+        label_filter = get_label_search_filter(label)
+        if label_filter is not None:
+            stmt = stmt.filter(label_filter)
+
+        # Apply ordering
+        stmt = stmt.order_by(Record.date.asc(), Split.id)
+
+        # Group splits by person, in order of their first split
+        refs = {}
+        persons = {}
+        for row in session.execute(stmt):
+            person_id, person_name = row[0], row[1]
+            if person_id not in persons:
+                persons[person_id] = (person_name, [])
+            persons[person_id][1].append(
+                PersonSplitView(
+                    id=row[2],
+                    amount=row[3],
+                    isPaid=row[4],
+                    paidDate=row[5],
+                    account=get_shared_ref(refs, AccountRef, *row[6:9]),
+                    record=SplitRecordView(
+                        id=row[9],
+                        label=row[10],
+                        date=row[11],
+                        isIncome=row[12],
+                        category=get_shared_ref(refs, CategoryRef, *row[13:16]),
+                    ),
+                )
+            )
+        return [
+            PersonView(id=person_id, name=name, splits=tuple(splits))
+            for person_id, (name, splits) in persons.items()
+        ]
     finally:
         session.close()
 
 
-@dataclass
-class PersonWithDue:
-    person: Person
-    due: float
-
-
-def get_persons_with_net_due() -> list[Person]:
-    """Retrieve all persons with their net due amount."""
+@cached_query
+def get_persons_with_net_due() -> list[PersonDueView]:
+    """Retrieve all persons with their unpaid, paid and net due amounts, and the date of
+    their last split, largest net due first."""
     session = Session()
     try:
         stmt = (
             select(
-                Person,
-                (
-                    func.coalesce(
-                        select(func.sum(Split.amount))
-                        .select_from(Split)
-                        .join(Record)
-                        .where(
-                            Split.personId == Person.id,
-                            Record.isIncome == False,  # noqa: E712
-                            Split.isPaid == False,  # noqa: E712
-                        )
-                        .correlate(Person)
-                        .scalar_subquery(),
-                        0,
-                    )
-                    - func.coalesce(
-                        select(func.sum(Split.amount))
-                        .select_from(Split)
-                        .join(Record)
-                        .where(
-                            Split.personId == Person.id,
-                            Record.isIncome == True,  # noqa: E712
-                            Split.isPaid == False,  # noqa: E712
-                        )
-                        .correlate(Person)
-                        .scalar_subquery(),
-                        0,
-                    )
-                ).label("due"),
+                Person.id,
+                Person.name,
+                PersonBalance.personId,
+                PersonBalance.owed,
+                PersonBalance.owing,
+                PersonBalance.paid,
+                PersonBalance.lastActivity,
             )
-            .select_from(Person)
+            .outerjoin(PersonBalance, PersonBalance.personId == Person.id)
             .where(Person.deletedAt.is_(None))
-            .order_by(desc(func.abs(column("due"))), Person.name)
         )
-
-        result = session.execute(stmt).all()
-        persons_with_due = []
-        for person, due in result:
-            person.due = due
-            persons_with_due.append(person)
-        return persons_with_due
+        rows = session.execute(stmt).all()
+        missing = [row[0] for row in rows if row[2] is None]
+        if missing:
+            refresh_person_balances(session, missing)
+            session.commit()
+            rows = session.execute(stmt).all()
+
+        decimals = CONFIG.defaults.round_decimals
+        persons = [
+            PersonDueView(
+                id=person_id,
+                name=name,
+                owed=owed,
+                owing=owing,
+                paid=paid,
+                due=round(owed - owing, decimals),
+                lastActivity=last_activity,
+            )
+            for person_id, name, _, owed, owing, paid, last_activity in rows
+        ]
+        persons.sort(key=lambda person: (-abs(person.due), person.name))
+        return persons
     finally:
         session.close()
 
@@ -202,7 +241,10 @@ def delete_person(person_id) -> bool:
                 # Soft delete if person has splits
                 person.deletedAt = func.now()
             else:
-                # Hard delete if person has no splits
+                # Hard delete if person has no splits, with their totals
+                session.execute(
+                    delete(PersonBalance).where(PersonBalance.personId == person_id)
+                )
                 session.delete(person)
 
             session.commit()
@@ -210,3 +252,75 @@ def delete_person(person_id) -> bool:
         return False
     finally:
         session.close()
+
+
+# region Balances
+# ------------- balances ------------- #
+
+
+def _select_person_balances(person_ids):
+    """Returns a select computing the rows of PersonBalance of persons from their splits."""
+    unpaid = Split.isPaid == False  # noqa: E712
+    unpaid_expense = and_(unpaid, Record.isIncome == False)  # noqa: E712
+    unpaid_income = and_(unpaid, Record.isIncome == True)  # noqa: E712
+    # the later of the record and its repayment
+    activity = func.max(Record.date, func.coalesce(Split.paidDate, Record.date))
+    decimals = CONFIG.defaults.round_decimals
+    totals = (
+        select(
+            Split.personId,
+            func.sum(case((unpaid_expense, Split.amount), else_=0)).label("owed"),
+            func.sum(case((unpaid_income, Split.amount), else_=0)).label("owing"),
+            func.sum(case((unpaid, 0), else_=Split.amount)).label("paid"),
+            func.max(activity).label("lastActivity"),
+        )
+        .join(Record, Split.recordId == Record.id)
+        .where(Split.personId.in_(person_ids))
+        .group_by(Split.personId)
+        .subquery()
+    )
+    return (
+        select(
+            Person.id,
+            func.round(func.coalesce(totals.c.owed, 0), decimals),
+            func.round(func.coalesce(totals.c.owing, 0), decimals),
+            func.round(func.coalesce(totals.c.paid, 0), decimals),
+            totals.c.lastActivity,
+        )
+        .outerjoin(totals, totals.c.personId == Person.id)
+        .where(Person.id.in_(person_ids))
+    )
+
+
+def refresh_person_balances(session, person_ids) -> None:
+    """Recomputes the split totals of persons within the caller's transaction.
+
+    Totals are recomputed rather than adjusted, as the last activity of a person cannot
+    be taken back when a split is removed. Pending changes of the session are flushed
+    first, so they are included.
+    """
+    person_ids = {person_id for person_id in person_ids if person_id is not None}
+    if not person_ids:
+        return
+    session.flush()
+    session.execute(
+        delete(PersonBalance)
+        .where(PersonBalance.personId.in_(person_ids))
+        # totals are not loaded as entities: skip matching the identity map
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(
+        insert(PersonBalance).from_select(
+            ["personId", "owed", "owing", "paid", "lastActivity"],
+            _select_person_balances(person_ids),
+        )
+    )
+
+
+def reset_person_balances(session) -> None:
+    """Drops the split totals within the caller's transaction, after writes that bypass
+    the managers.
+
+    Totals are then computed from history on their next lookup.
+    """
+    session.execute(delete(PersonBalance))
@@ -1,11 +1,12 @@
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload, sessionmaker
+from sqlalchemy.orm import joinedload
 
-from bagels.models.database.app import db_engine
+from bagels.managers.cache import cached_query
+from bagels.managers.utils import get_label_search_filter
+from bagels.models.database.app import Session
+from bagels.models.database.search import record_template_fts
 from bagels.models.record_template import RecordTemplate
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region c
 def create_template(data):
@@ -30,6 +31,7 @@ def create_template_from_record(record):
 
 
 # region r
+@cached_query
 def get_all_templates():
     session = Session()
     try:
@@ -46,6 +48,7 @@ def get_all_templates():
         session.close()
 
 
+@cached_query
 def get_record_templates():
     session = Session()
     try:
@@ -63,6 +66,7 @@ def get_record_templates():
         session.close()
 
 
+@cached_query
 def get_transfer_templates():
     session = Session()
     try:
@@ -80,6 +84,28 @@ def get_transfer_templates():
         session.close()
 
 
+@cached_query
+def search_templates(text: str):
+    """Returns the templates with a label matching the search, in their order."""
+    label_filter = get_label_search_filter(text, RecordTemplate.id, record_template_fts)
+    if label_filter is None:
+        return []
+    session = Session()
+    try:
+        stmt = (
+            select(RecordTemplate)
+            .options(
+                joinedload(RecordTemplate.category),
+                joinedload(RecordTemplate.account),
+            )
+            .filter(label_filter)
+            .order_by(RecordTemplate.order)
+        )
+        return session.scalars(stmt).all()
+    finally:
+        session.close()
+
+
 def get_template_by_id(recordtemplate_id) -> RecordTemplate:
     session = Session()
     try:
@@ -1,18 +1,52 @@
+import operator
+from collections import Counter
 from datetime import datetime, timedelta
 
-from sqlalchemy import func
-from sqlalchemy.orm import joinedload, sessionmaker
-
-from bagels.managers.splits import create_split, get_splits_by_record_id, update_split
-from bagels.managers.utils import get_operator_amount, get_start_end_of_period
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import aliased, joinedload
+
+from bagels.config import CONFIG
+from bagels.managers.accounts import (
+    adjust_account_balances,
+    get_record_balance_changes,
+    get_row_balance_changes,
+    merge_balance_changes,
+)
+from bagels.managers.cache import cached_query
+from bagels.managers.monthly_totals import (
+    adjust_monthly_totals,
+    get_record_total_changes,
+)
+from bagels.managers.persons import refresh_person_balances
+from bagels.managers.splits import get_splits_by_record_id, update_split
+from bagels.managers.utils import (
+    get_label_search_filter,
+    get_operator_amount,
+    get_search_query,
+    get_search_terms,
+    get_split_total_column,
+    get_split_totals_subquery,
+    get_start_end_of_period,
+    is_search_match,
+)
+from bagels.managers.views import (
+    VIEW_ID_CHUNK_SIZE,
+    AccountRef,
+    CategoryRef,
+    PersonRef,
+    RecordView,
+    SplitView,
+    get_shared_ref,
+)
 from bagels.models.account import Account
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.models.database.app import Session, unit_of_work
+from bagels.models.database.search import record_fts
+from bagels.models.monthly_total import select_monthly_totals
+from bagels.models.person import Person
 from bagels.models.record import Record
 from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Create
 def create_record(record_data: dict):
@@ -20,6 +54,9 @@ def create_record(record_data: dict):
     try:
         record = Record(**record_data)
         session.add(record)
+        session.flush()
+        adjust_account_balances(session, get_record_balance_changes(record))
+        adjust_monthly_totals(session, get_record_total_changes(session, record))
         session.commit()
         session.refresh(record)
         session.expunge(record)
@@ -29,13 +66,87 @@ def create_record(record_data: dict):
 
 
 def create_record_and_splits(record_data: dict, splits_data: list[dict]):
+    """Creates a record and its splits in one transaction."""
+    [record_id] = create_records_and_splits([(record_data, splits_data)])
+    return get_record_by_id(record_id)
+
+
+def _get_row(model, data: dict) -> dict:
+    """Returns the row of an entity inserted without loading it: the data, with the
+    model's scalar column defaults and what its @validates hooks would store.
+
+    Columns with callable defaults, such as timestamps, are left to the insert.
+    """
+    row = {
+        column.key: column.default.arg if column.default is not None else None
+        for column in model.__table__.columns
+        if column.default is None or column.default.is_scalar
+    }
+    row.update(data)
+    for key, (validator, _) in model.__mapper__.validators.items():
+        if key in row:
+            row[key] = validator(None, key, row[key])
+    return row
+
+
+def create_records_and_splits(entries: list[tuple[dict, list[dict]]]) -> list[int]:
+    """Creates many records with their splits in one transaction, as for imports.
+
+    The records and splits are inserted with one executemany per table, without loading
+    them as entities, and the ledgers are adjusted once for the whole batch.
+
+    Args:
+        entries (list[tuple[dict, list[dict]]]): (record data, splits data) pairs.
+
+    Returns:
+        list[int]: The IDs of the created records, in the order of entries.
+    """
+    if not entries:
+        return []
     session = Session()
     try:
-        record = create_record(record_data)
-        for split in splits_data:
-            split["recordId"] = record.id
-            create_split(split)
-        return record
+        # SQLite cannot return the generated ids of a batch in order, so assign them
+        # here to insert the splits with their record's id.
+        first_record_id = (session.scalar(select(func.max(Record.id))) or 0) + 1
+        split_id = session.scalar(select(func.max(Split.id))) or 0
+        record_rows, split_rows, balance_changes = [], [], []
+        for record_id, (record_data, splits_data) in enumerate(
+            entries, start=first_record_id
+        ):
+            record = _get_row(Record, {**record_data, "id": record_id})
+            splits = []
+            for split_data in splits_data:
+                split_id += 1
+                splits.append(
+                    _get_row(
+                        Split, {**split_data, "id": split_id, "recordId": record_id}
+                    )
+                )
+            record_rows.append(record)
+            split_rows.extend(splits)
+            balance_changes.append(get_row_balance_changes(record, splits))
+
+        # rows leaving out None values would be inserted in separate statements
+        session.execute(
+            insert(Record).execution_options(render_nulls=True), record_rows
+        )
+        if split_rows:
+            session.execute(
+                insert(Split).execution_options(render_nulls=True), split_rows
+            )
+        adjust_account_balances(session, merge_balance_changes(*balance_changes))
+        adjust_monthly_totals(
+            session,
+            {
+                tuple(row[:-1]): row[-1]
+                for row in session.execute(
+                    select_monthly_totals().where(Record.id >= first_record_id)
+                )
+            },
+        )
+        refresh_person_balances(session, [split["personId"] for split in split_rows])
+        session.commit()
+        return list(range(first_record_id, first_record_id + len(entries)))
     finally:
         session.close()
 
@@ -64,12 +175,102 @@ def get_record_by_id(record_id: int, populate_splits: bool = False):
 def get_record_total_split_amount(record_id: int):
     session = Session()
     try:
-        splits = get_splits_by_record_id(record_id)
-        return sum(split.amount for split in splits)
+        total = (
+            session.query(func.sum(Split.amount))
+            .filter(Split.recordId == record_id)
+            .scalar()
+        )
+        return total or 0
     finally:
         session.close()
 
 
+def _select_record_views():
+    to_account = aliased(Account)
+    return (
+        select(
+            Record.id,
+            Record.label,
+            Record.amount,
+            Record.date,
+            Record.isIncome,
+            Record.isTransfer,
+            Account.id,
+            Account.name,
+            Account.hidden,
+            Category.id,
+            Category.name,
+            Category.color,
+            to_account.id,
+            to_account.name,
+            to_account.hidden,
+            get_split_total_column(),
+        )
+        .join(Account, Record.accountId == Account.id)
+        .outerjoin(Category, Record.categoryId == Category.id)
+        .outerjoin(to_account, Record.transferToAccountId == to_account.id)
+    )
+
+
+def _get_split_views(session, record_ids: list[int], refs: dict) -> dict:
+    """Returns the split views of each record, by record id."""
+    splits = {}
+    for start in range(0, len(record_ids), VIEW_ID_CHUNK_SIZE):
+        stmt = (
+            select(
+                Split.recordId,
+                Split.id,
+                Split.amount,
+                Split.isPaid,
+                Split.paidDate,
+                Person.id,
+                Person.name,
+                Account.id,
+                Account.name,
+                Account.hidden,
+            )
+            .join(Person, Split.personId == Person.id)
+            .outerjoin(Account, Split.accountId == Account.id)
+            .where(Split.recordId.in_(record_ids[start : start + VIEW_ID_CHUNK_SIZE]))
+            .order_by(Split.id)
+        )
+        for row in session.execute(stmt):
+            splits.setdefault(row[0], []).append(
+                SplitView(
+                    id=row[1],
+                    amount=row[2],
+                    isPaid=row[3],
+                    paidDate=row[4],
+                    person=get_shared_ref(refs, PersonRef, row[5], row[6]),
+                    account=get_shared_ref(refs, AccountRef, *row[7:10]),
+                )
+            )
+    return splits
+
+
+def _get_record_views(session, stmt) -> list[RecordView]:
+    rows = session.execute(stmt).all()
+    refs = {}
+    splits = _get_split_views(session, [row[0] for row in rows], refs)
+    return [
+        RecordView(
+            id=row[0],
+            label=row[1],
+            amount=row[2],
+            date=row[3],
+            isIncome=row[4],
+            isTransfer=row[5],
+            account=get_shared_ref(refs, AccountRef, *row[6:9]),
+            category=get_shared_ref(refs, CategoryRef, *row[9:12]),
+            transferToAccount=get_shared_ref(refs, AccountRef, *row[12:15]),
+            splitTotal=row[15],
+            splits=tuple(splits.get(row[0], ())),
+        )
+        for row in rows
+    ]
+
+
+@cached_query
 def get_records(
     offset: int = 0,
     offset_type: str = "month",
@@ -77,47 +278,193 @@ def get_records(
     category_piped_names: str = None,
     operator_amount: str = None,
     label: str = None,
-):
+) -> list[RecordView]:
     session = Session()
     try:
-        query = session.query(Record).options(
-            joinedload(Record.category),
-            joinedload(Record.account),
-            joinedload(Record.transferToAccount),
-            joinedload(Record.splits).options(
-                joinedload(Split.account), joinedload(Split.person)
-            ),
-        )
+        stmt = _select_record_views()
 
         start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
-        query = query.filter(
-            Record.date >= start_of_period, Record.date < end_of_period
-        )
+        stmt = stmt.where(Record.date >= start_of_period, Record.date < end_of_period)
 
         if account_id not in [None, ""]:
-            query = query.filter(Record.accountId == account_id)
+            stmt = stmt.where(Record.accountId == account_id)
         if category_piped_names not in [None, ""]:
             category_names = category_piped_names.split("|")
-            query = query.join(Record.category).filter(
-                Category.name.in_(category_names)
-            )
+            stmt = stmt.where(Category.name.in_(category_names))
         if operator_amount not in [None, ""]:
             operator, amount = get_operator_amount(operator_amount)
             if operator and amount:
-                query = query.filter(Record.amount.op(operator)(amount))
-        if label not in [None, ""]:
-            query = query.filter(Record.label.ilike(f"%{label}%"))
+                stmt = stmt.where(Record.amount.op(operator)(amount))
+        label_filter = get_label_search_filter(label)
+        if label_filter is not None:
+            stmt = stmt.where(label_filter)
+
+        stmt = stmt.order_by(func.date(Record.date).desc(), Record.createdAt.desc())
+
+        return _get_record_views(session, stmt)
+    finally:
+        session.close()
+
+
+@cached_query
+def search_records(
+    text: str, limit: int = 100, account_id: int = None
+) -> list[RecordView]:
+    """Searches record labels across all periods.
+
+    Every term of `text` matches words starting with it, so "ub ri" finds "Uber ride".
+    Records are ranked by relevance, then most recent first.
+    """
+    query = get_search_query(text)
+    if query is None:
+        return []
+    session = Session()
+    try:
+        stmt = (
+            _select_record_views()
+            .join(record_fts, record_fts.c.rowid == Record.id)
+            .where(record_fts.c.label.match(query))
+            .order_by(record_fts.c.rank, Record.date.desc())
+            .limit(limit)
+        )
+        if account_id not in [None, ""]:
+            stmt = stmt.where(Record.accountId == account_id)
+        return _get_record_views(session, stmt)
+    finally:
+        session.close()
+
+
+def get_record_fingerprint(
+    date: datetime, amount: float, is_income: bool, account_id: int, label: str
+) -> tuple:
+    """Identifies a record when looking for duplicates: by its day, signed amount,
+    account, and the words of its label ignoring case and accents."""
+    signed_amount = amount if is_income else -amount
+    return (
+        date.strftime("%Y-%m-%d"),
+        round(signed_amount, CONFIG.defaults.round_decimals),
+        account_id,
+        " ".join(get_search_terms(label)),
+    )
 
-        createdAt_column = getattr(Record, "createdAt")
-        date_column = func.date(getattr(Record, "date"))
-        query = query.order_by(date_column.desc(), createdAt_column.desc())
 
-        records = query.all()
-        return records
+def get_record_fingerprints(account_id: int, start_date, end_date) -> Counter:
+    """Counts the records of an account by fingerprint, from start_date up to end_date."""
+    session = Session()
+    try:
+        stmt = select(Record.date, Record.amount, Record.isIncome, Record.label).where(
+            Record.date >= start_date,
+            Record.date < end_date,
+            Record.accountId == account_id,
+        )
+        return Counter(
+            get_record_fingerprint(date, amount, is_income, account_id, label)
+            for date, amount, is_income, label in session.execute(stmt)
+        )
     finally:
         session.close()
 
 
+# region Filter
+# ------------- filter --------------- #
+
+_AMOUNT_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
+
+def _get_amount_filter(operator_amount: str | None):
+    # mirrors get_records, which ignores invalid or zero amounts
+    if operator_amount in [None, ""]:
+        return None
+    op, amount = get_operator_amount(operator_amount)
+    return (op, amount) if op and amount else None
+
+
+def _get_amount_bounds(amount_filter) -> tuple:
+    # (low, low inclusive, high, high inclusive)
+    op, amount = amount_filter
+    inf = float("inf")
+    return {
+        ">": (amount, False, inf, False),
+        ">=": (amount, True, inf, False),
+        "=": (amount, True, amount, True),
+        "<=": (-inf, False, amount, True),
+        "<": (-inf, False, amount, False),
+    }[op]
+
+
+def is_records_filter_refinement(previous: dict, current: dict) -> bool:
+    """Returns whether every record matching the `current` get_records arguments also
+    matches the `previous` ones, so they can be found among the previous results with
+    filter_records instead of querying again.
+    """
+    for key in ("offset", "offset_type", "account_id"):
+        if previous.get(key) != current.get(key):
+            return False
+
+    previous_categories = previous.get("category_piped_names")
+    current_categories = current.get("category_piped_names")
+    if previous_categories not in [None, ""] and (
+        current_categories in [None, ""]
+        or not set(current_categories.split("|")) <= set(previous_categories.split("|"))
+    ):
+        return False
+
+    # every previous term must be a prefix of a current term
+    current_terms = get_search_terms(current.get("label"))
+    for previous_term in get_search_terms(previous.get("label")):
+        if not any(term.startswith(previous_term) for term in current_terms):
+            return False
+
+    previous_amount = _get_amount_filter(previous.get("operator_amount"))
+    if previous_amount is None:
+        return True
+    current_amount = _get_amount_filter(current.get("operator_amount"))
+    if current_amount is None:
+        return False
+    low, low_inclusive, high, high_inclusive = _get_amount_bounds(previous_amount)
+    new_low, new_low_inclusive, new_high, new_high_inclusive = _get_amount_bounds(
+        current_amount
+    )
+    return (
+        new_low > low or (new_low == low and (low_inclusive or not new_low_inclusive))
+    ) and (
+        new_high < high
+        or (new_high == high and (high_inclusive or not new_high_inclusive))
+    )
+
+
+def filter_records(
+    records: list,
+    category_piped_names: str = None,
+    operator_amount: str = None,
+    label: str = None,
+    **_,
+) -> list:
+    """Applies the filters of get_records to already loaded records, keeping their order."""
+    if category_piped_names not in [None, ""]:
+        category_names = set(category_piped_names.split("|"))
+        records = [
+            record
+            for record in records
+            if record.category and record.category.name in category_names
+        ]
+    amount_filter = _get_amount_filter(operator_amount)
+    if amount_filter:
+        op, amount = amount_filter
+        compare = _AMOUNT_OPERATORS[op]
+        records = [record for record in records if compare(record.amount, amount)]
+    terms = get_search_terms(label)
+    if terms:
+        records = [record for record in records if is_search_match(record.label, terms)]
+    return records
+
+
 def _get_spending_records(session, start_date, end_date):
     """Common function to fetch records for spending calculations"""
     return (
@@ -161,6 +508,7 @@ def _calculate_daily_spending(records, start_date, end_date, cumulative=False):
     return result
 
 
+@cached_query
 def get_spending(start_date, end_date) -> list[float]:
     """Gets a list of spent amounts for each day in the period, less split amounts of the records"""
     session = Session()
@@ -173,6 +521,7 @@ def get_spending(start_date, end_date) -> list[float]:
         session.close()
 
 
+@cached_query
 def get_spending_trend(start_date, end_date) -> list[float]:
     """Gets a cumulative list of spent amounts for each day in the period"""
     session = Session()
@@ -186,77 +535,91 @@ def get_spending_trend(start_date, end_date) -> list[float]:
 def is_record_all_splits_paid(record_id: int):
     session = Session()
     try:
-        splits = get_splits_by_record_id(record_id)
-        return all(split.isPaid for split in splits)
+        unpaid = (
+            session.query(Split.id)
+            .filter(Split.recordId == record_id, Split.isPaid.is_(False))
+            .first()
+        )
+        return unpaid is None
     finally:
         session.close()
 
 
-def get_daily_balance(start_date, end_date) -> list[float]:
-    """Gets a list of account balances for each day in the period"""
-    # Calculating net beginning balance
-
-    # Handle records up till start_date, then process each day one by one.
-
-    # Records.isIncome ? add : subtract
+def _select_balance_delta(*columns):
+    """Selects the summed net balance effect of records, alongside the given columns.
+
+    Rules:
+    - Income records add their amount less their splits, expenses subtract it.
+    - Transfers only count when money crosses the "Outside source" account.
+    - Only records belonging to undeleted accounts are considered.
+    """
+    account = aliased(Account)
+    transfer_to_account = aliased(Account)
+    split_totals = get_split_totals_subquery()
+    splits_total = func.coalesce(split_totals.c.total, 0)
+    delta = case(
+        (
+            Record.isTransfer,
+            case(
+                (transfer_to_account.name == "Outside source", -Record.amount),
+                (account.name == "Outside source", Record.amount),
+                else_=0,
+            ),
+        ),
+        (Record.isIncome, Record.amount - splits_total),
+        else_=-Record.amount + splits_total,
+    )
+    return (
+        select(*columns, func.coalesce(func.sum(delta), 0))
+        .select_from(Record)
+        .join(account, Record.accountId == account.id)
+        .outerjoin(
+            transfer_to_account, Record.transferToAccountId == transfer_to_account.id
+        )
+        .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+        .where(account.deletedAt.is_(None))
+    )
 
-    # for Record.splits => Record.isIncome ? subtract Split.amount : add Split.amount
 
-    # Record.isTransfer ? Record.transferToAccount.name == "Outside source" ? subtract : Record.account.name == "Outside source" ? add : ignore
+@cached_query
+def get_daily_balance(start_date, end_date) -> list[float]:
+    """Gets a list of account balances for each day in the period
 
-    # return result
+    The opening balance (beginning balances and every record before start_date) is
+    computed in one aggregate, and the per-day deltas within the period in one
+    grouped query. The running balance is then accumulated in a single pass.
+    """
     session = Session()
     try:
-        accounts = session.query(Account).filter(Account.deletedAt.is_(None)).all()
-        total_balance = sum(a.beginningBalance for a in accounts)
-        old_records = (
-            session.query(Record)
-            .filter(
-                Record.date < start_date, Record.accountId.in_([a.id for a in accounts])
-            )
-            .options(
-                joinedload(Record.splits),
-                joinedload(Record.account),
-                joinedload(Record.transferToAccount),
+        beginning_balance = session.scalar(
+            select(func.coalesce(func.sum(Account.beginningBalance), 0)).where(
+                Account.deletedAt.is_(None)
             )
-            .all()
+        )
+        opening_delta = session.scalar(
+            _select_balance_delta().where(Record.date < start_date)
         )
 
-        def adjust_balance(r):
-            if r.isTransfer:
-                if r.transferToAccount and r.transferToAccount.name == "Outside source":
-                    return -r.amount
-                if r.account and r.account.name == "Outside source":
-                    return r.amount
-                return 0
-            if r.isIncome:
-                return r.amount - sum(s.amount for s in r.splits)
-            return -r.amount + sum(s.amount for s in r.splits)
-
-        for rec in old_records:
-            total_balance += adjust_balance(rec)
+        today = datetime.today()
+        period_end = datetime.combine(
+            min(end_date, today).date(), datetime.min.time()
+        ) + timedelta(days=1)
+        day_column = func.date(Record.date)
+        daily_deltas = dict(
+            session.execute(
+                _select_balance_delta(day_column)
+                .where(Record.date >= start_date, Record.date < period_end)
+                .group_by(day_column)
+            ).all()
+        )
 
+        total_balance = beginning_balance + opening_delta
         results = []
         current = start_date
-        today = datetime.today()
         while current <= end_date:
             if current > today:
                 break
-            day_records = (
-                session.query(Record)
-                .filter(
-                    func.date(Record.date) == current.date(),
-                    Record.accountId.in_([a.id for a in accounts]),
-                )
-                .options(
-                    joinedload(Record.splits),
-                    joinedload(Record.account),
-                    joinedload(Record.transferToAccount),
-                )
-                .all()
-            )
-            day_effect = sum(adjust_balance(dr) for dr in day_records)
-            total_balance += day_effect
+            total_balance += daily_deltas.get(current.strftime("%Y-%m-%d"), 0)
             results.append(total_balance)
             current += timedelta(days=1)
         return results
@@ -270,8 +633,22 @@ def update_record(record_id: int, updated_data: dict):
     try:
         record = session.query(Record).get(record_id)
         if record:
+            previous_changes = get_record_balance_changes(record, sign=-1)
+            previous_totals = get_record_total_changes(session, record, sign=-1)
             for key, value in updated_data.items():
                 setattr(record, key, value)
+            adjust_account_balances(
+                session,
+                merge_balance_changes(
+                    previous_changes, get_record_balance_changes(record)
+                ),
+            )
+            adjust_monthly_totals(
+                session, previous_totals, get_record_total_changes(session, record)
+            )
+            refresh_person_balances(
+                session, [split.personId for split in record.splits]
+            )
             session.commit()
             session.refresh(record)
             session.expunge(record)
@@ -283,15 +660,12 @@ def update_record(record_id: int, updated_data: dict):
 def update_record_and_splits(
     record_id: int, record_data: dict, splits_data: list[dict]
 ):
-    session = Session()
-    try:
+    with unit_of_work():
         record = update_record(record_id, record_data)
         record_splits = get_splits_by_record_id(record_id)
         for index, split in enumerate(record_splits):
             update_split(split.id, splits_data[index])
         return record
-    finally:
-        session.close()
 
 
 # region Delete
@@ -300,7 +674,15 @@ def delete_record(record_id: int):
     try:
         record = session.query(Record).get(record_id)
         if record:
+            adjust_account_balances(
+                session, get_record_balance_changes(record, sign=-1)
+            )
+            adjust_monthly_totals(
+                session, get_record_total_changes(session, record, sign=-1)
+            )
+            person_ids = [split.personId for split in record.splits]
             session.delete(record)
+            refresh_person_balances(session, person_ids)
             session.commit()
         return record
     finally:
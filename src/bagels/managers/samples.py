@@ -1,21 +1,25 @@
+import random
+from datetime import datetime, timedelta
 from pathlib import Path
-import yaml
 
+from bagels.managers.accounts import reset_account_balances
+from bagels.managers.persons import reset_person_balances
 from bagels.models.account import Account
-from bagels.models.database.app import db_engine
+from bagels.models.category import Category
+from bagels.models.database.app import Session
+from bagels.models.monthly_total import build_monthly_totals
 from bagels.models.person import Person
 from bagels.models.record import Record
 from bagels.models.record_template import RecordTemplate
 from bagels.models.split import Split
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select, func
-
-Session = sessionmaker(bind=db_engine)
+from sqlalchemy import insert, select, func
 
 
 def create_sample_entries():
     yaml_path = Path(__file__).parent.parent / "static" / "sample_entries.yaml"
 
+    import yaml  # only needed here, and slow to import
+
     with open(yaml_path, "r") as file:
         sample_entries = yaml.safe_load(file)
 
@@ -65,6 +69,156 @@ def create_sample_entries():
             template = RecordTemplate(**template_data)
             session.add(template)
 
+        reset_account_balances(session)
+        reset_person_balances(session)
+        build_monthly_totals(session)
+        session.commit()
+    finally:
+        session.close()
+
+
+# region Synthetic
+# ------------- synthetic ------------ #
+
+SYNTHETIC_BATCH_SIZE = 5000
+SYNTHETIC_LABELS = [
+    "Groceries",
+    "Coffee",
+    "Lunch",
+    "Dinner",
+    "Bus",
+    "Taxi",
+    "Rent",
+    "Phone bill",
+    "Cinema",
+    "Books",
+    "Pharmacy",
+    "Gym",
+]
+
+
+def create_synthetic_entries(
+    records: int = 10000,
+    accounts: int = 3,
+    people: int = 5,
+    years: int = 2,
+    seed: int = 0,
+) -> dict[str, int]:
+    """Bulk inserts a reproducible, randomly generated ledger for benchmarking.
+
+    Records are spread over the last `years` years: about 10% income, 5% transfers
+    between accounts and, of the expenses, 15% split with 1 to 3 people.
+    Returns the number of rows created per table.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    span = int(timedelta(days=365 * years).total_seconds())
+
+    session = Session()
+    try:
+        account_rows = [
+            Account(
+                name=f"Account {index + 1}",
+                description="",
+                beginningBalance=round(rng.uniform(1000, 10000), 2),
+            )
+            for index in range(accounts)
+        ]
+        person_rows = [Person(name=f"Person {index + 1}") for index in range(people)]
+        session.add_all(account_rows + person_rows)
+        session.flush()
+        account_ids = [account.id for account in account_rows]
+        person_ids = [person.id for person in person_rows]
+        category_ids = (
+            session.scalars(
+                select(Category.id).where(Category.parentCategoryId.isnot(None))
+            ).all()
+            or session.scalars(select(Category.id)).all()
+        )
+
+        # ids are assigned up front so splits can reference records within a batch
+        next_record_id = (session.scalar(select(func.max(Record.id))) or 0) + 1
+        split_count = 0
+        for batch_start in range(0, records, SYNTHETIC_BATCH_SIZE):
+            record_batch, split_batch = [], []
+            for _ in range(min(SYNTHETIC_BATCH_SIZE, records - batch_start)):
+                date = now - timedelta(seconds=rng.randrange(span))
+                kind = rng.random()
+                record = {
+                    "id": next_record_id,
+                    "label": rng.choice(SYNTHETIC_LABELS),
+                    "amount": round(rng.lognormvariate(3, 1) + 0.01, 2),
+                    "date": date,
+                    "accountId": rng.choice(account_ids),
+                    "categoryId": rng.choice(category_ids),
+                    "isIncome": False,
+                    "isTransfer": False,
+                    "transferToAccountId": None,
+                    "createdAt": now,
+                    "updatedAt": now,
+                }
+                if kind < 0.1:
+                    record.update(
+                        label="Salary", amount=round(rng.uniform(500, 4000), 2)
+                    )
+                    record["isIncome"] = True
+                elif kind < 0.15 and len(account_ids) > 1:
+                    record["label"] = "Transfer"
+                    record["isTransfer"] = True
+                    record["categoryId"] = None
+                    record["transferToAccountId"] = rng.choice(
+                        [id for id in account_ids if id != record["accountId"]]
+                    )
+                elif kind < 0.3 and person_ids:
+                    for person_id in rng.sample(
+                        person_ids, rng.randint(1, min(3, len(person_ids)))
+                    ):
+                        is_paid = rng.random() < 0.6
+                        split_batch.append(
+                            {
+                                "recordId": next_record_id,
+                                "amount": round(record["amount"] / 4, 2) or 0.01,
+                                "personId": person_id,
+                                "isPaid": is_paid,
+                                "paidDate": date if is_paid else None,
+                                "accountId": rng.choice(account_ids)
+                                if is_paid
+                                else None,
+                                "createdAt": now,
+                                "updatedAt": now,
+                            }
+                        )
+                record_batch.append(record)
+                next_record_id += 1
+
+            session.execute(insert(Record), record_batch)
+            if split_batch:
+                session.execute(insert(Split), split_batch)
+            split_count += len(split_batch)
+
+        templates = SYNTHETIC_LABELS[:5]
+        for label in templates:
+            # the order is assigned on insert, one template at a time
+            template = RecordTemplate(
+                label=label,
+                amount=round(rng.uniform(2, 50), 2),
+                accountId=rng.choice(account_ids),
+                categoryId=rng.choice(category_ids),
+                order=0,
+            )
+            session.add(template)
+            session.flush()
+
+        reset_account_balances(session)
+        reset_person_balances(session)
+        build_monthly_totals(session)
         session.commit()
+        return {
+            "accounts": accounts,
+            "people": people,
+            "records": records,
+            "splits": split_count,
+            "templates": len(templates),
+        }
     finally:
         session.close()
@@ -1,8 +1,15 @@
-from sqlalchemy.orm import sessionmaker
+from bagels.managers.accounts import (
+    adjust_account_balances,
+    get_split_balance_changes,
+    merge_balance_changes,
+)
+from bagels.managers.monthly_totals import (
+    adjust_monthly_totals,
+    get_split_total_changes,
+)
+from bagels.managers.persons import refresh_person_balances
 from bagels.models.split import Split
-from bagels.models.database.app import db_engine
-
-Session = sessionmaker(bind=db_engine)
+from bagels.models.database.app import Session
 
 
 def create_split(data):
@@ -10,6 +17,12 @@ def create_split(data):
     try:
         new_split = Split(**data)
         session.add(new_split)
+        session.flush()
+        adjust_account_balances(
+            session, get_split_balance_changes(new_split, new_split.record.isIncome)
+        )
+        adjust_monthly_totals(session, get_split_total_changes(session, new_split))
+        refresh_person_balances(session, [new_split.personId])
         session.commit()
         session.refresh(new_split)
         session.expunge(new_split)
@@ -21,7 +34,9 @@ def create_split(data):
 def get_splits_by_record_id(record_id):
     session = Session()
     try:
-        return session.query(Split).filter_by(recordId=record_id).all()
+        return (
+            session.query(Split).filter_by(recordId=record_id).order_by(Split.id).all()
+        )
     finally:
         session.close()
 
@@ -39,8 +54,22 @@ def update_split(split_id, updated_data):
     try:
         split = session.query(Split).get(split_id)
         if split:
+            is_income = split.record.isIncome
+            previous_changes = get_split_balance_changes(split, is_income, sign=-1)
+            previous_totals = get_split_total_changes(session, split, sign=-1)
+            previous_person_id = split.personId
             for key, value in updated_data.items():
                 setattr(split, key, value)
+            adjust_account_balances(
+                session,
+                merge_balance_changes(
+                    previous_changes, get_split_balance_changes(split, is_income)
+                ),
+            )
+            adjust_monthly_totals(
+                session, previous_totals, get_split_total_changes(session, split)
+            )
+            refresh_person_balances(session, [previous_person_id, split.personId])
             session.commit()
         return split
     finally:
@@ -52,7 +81,15 @@ def delete_split(split_id):
     try:
         split = session.query(Split).get(split_id)
         if split:
+            adjust_account_balances(
+                session,
+                get_split_balance_changes(split, split.record.isIncome, sign=-1),
+            )
+            adjust_monthly_totals(
+                session, get_split_total_changes(session, split, sign=-1)
+            )
             session.delete(split)
+            refresh_person_balances(session, [split.personId])
             session.commit()
         return split
     finally:
@@ -62,7 +99,22 @@ def delete_split(split_id):
 def delete_splits_by_record_id(record_id):
     session = Session()
     try:
+        splits = session.query(Split).filter_by(recordId=record_id).all()
+        adjust_account_balances(
+            session,
+            merge_balance_changes(
+                *[
+                    get_split_balance_changes(split, split.record.isIncome, sign=-1)
+                    for split in splits
+                ]
+            ),
+        )
+        adjust_monthly_totals(
+            session,
+            *[get_split_total_changes(session, split, sign=-1) for split in splits],
+        )
         session.query(Split).filter_by(recordId=record_id).delete()
+        refresh_person_balances(session, [split.personId for split in splits])
         session.commit()
     finally:
         session.close()
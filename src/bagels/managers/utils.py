@@ -1,16 +1,20 @@
 import re
+import unicodedata
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from functools import lru_cache
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func, select
 from textual.widget import Widget
 
 from bagels.config import CONFIG
-from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.managers.cache import cached_query
+from bagels.models.category import Category, Nature
+from bagels.models.database.app import Session
+from bagels.models.database.search import record_fts
+from bagels.models.monthly_total import MonthlyTotal, get_month
 from bagels.models.record import Record
+from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
 
 # --------------- query -------------- #
 
@@ -91,6 +95,91 @@ def get_start_end_of_period(offset: int = 0, offset_type: str = "month"):
 # -------------- figure -------------- #
 
 
+def get_split_totals_subquery():
+    """Returns a subquery of (recordId, total) summing the split amounts of each record."""
+    return (
+        select(Split.recordId, func.sum(Split.amount).label("total"))
+        .group_by(Split.recordId)
+        .subquery()
+    )
+
+
+def get_split_total_column():
+    """Returns a scalar subquery summing the split amounts of the selected record."""
+    return (
+        select(func.coalesce(func.sum(Split.amount), 0))
+        .where(Split.recordId == Record.id)
+        .correlate(Record)
+        .scalar_subquery()
+    )
+
+
+def get_period_months(offset_type=None, offset=None) -> tuple[str, str] | None:
+    """Returns the first and last month of a period made of whole months, to read its
+    figures from the monthly totals. Returns None for weeks and days."""
+    if offset_type not in ("month", "year"):
+        return None
+    start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
+    return get_month(start_of_period), get_month(end_of_period)
+
+
+def _get_period_totals(session, accountId=None, offset_type=None, offset=None):
+    """Returns the net amount of records less their splits, grouped by (isIncome, nature).
+
+    Transfers are excluded. Records without a category are grouped under a None nature.
+    Whole months and all time are read from the monthly totals.
+    """
+    all_time = offset_type is None or offset is None
+    months = None if all_time else get_period_months(offset_type, offset)
+    if all_time or months is not None:
+        stmt = select(
+            MonthlyTotal.isIncome, MonthlyTotal.nature, func.sum(MonthlyTotal.amount)
+        ).group_by(MonthlyTotal.isIncome, MonthlyTotal.nature)
+        if accountId is not None:
+            stmt = stmt.filter(MonthlyTotal.accountId == accountId)
+        if months is not None:
+            stmt = stmt.filter(MonthlyTotal.month.between(*months))
+        return {
+            (is_income, nature): total
+            for is_income, nature, total in session.execute(stmt).all()
+        }
+
+    split_totals = get_split_totals_subquery()
+    stmt = (
+        select(
+            Record.isIncome,
+            Category.nature,
+            func.sum(Record.amount - func.coalesce(split_totals.c.total, 0)),
+        )
+        .outerjoin(Record.category)
+        .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+        .filter(Record.isTransfer == False)  # noqa: E712
+        .group_by(Record.isIncome, Category.nature)
+    )
+
+    # Filter by account if specified
+    if accountId is not None:
+        stmt = stmt.filter(Record.accountId == accountId)
+
+    # Filter by date period, up to the start of the next one: periods end on their last
+    # second, and records of that second count in it, as in the monthly totals
+    start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
+    stmt = stmt.filter(
+        Record.date >= start_of_period,
+        Record.date < end_of_period + timedelta(seconds=1),
+    )
+
+    return {
+        (is_income, nature): total
+        for is_income, nature, total in session.execute(stmt).all()
+    }
+
+
+def _round_figure(total):
+    return abs(round(total, CONFIG.defaults.round_decimals))
+
+
+@cached_query
 def get_period_figures(
     accountId=None,
     offset_type=None,
@@ -121,50 +210,65 @@ def get_period_figures(
         should_close = False
 
     try:
-        query = session.query(Record)
-
-        # Filter by account if specified
-        if accountId is not None:
-            query = query.filter(Record.accountId == accountId)
+        totals = _get_period_totals(session, accountId, offset_type, offset)
 
-        # Filter by date period if specified
-        if offset_type is not None and offset is not None:
-            start_of_period, end_of_period = get_start_end_of_period(
-                offset, offset_type
-            )
-            query = query.filter(
-                Record.date >= start_of_period, Record.date < end_of_period
-            )
+        total = 0
+        for (is_income, record_nature), amount in totals.items():
+            if isIncome is not None and is_income != isIncome:
+                continue
+            if nature is not None and record_nature != nature:
+                continue
+            total += amount if is_income else -amount
 
-        # Filter by category nature if specified
-        if nature is not None:
-            query = query.join(Record.category).filter(Category.nature == nature)
+        return _round_figure(total)
+    finally:
+        if should_close:
+            session.close()
 
-        # Calculate net amount
-        total = 0
-        records = query.all()
 
-        for record in records:
-            # Skip records that are marked as transfers if filtering by income type
-            if isIncome is not None and record.isTransfer:
-                continue
+@dataclass
+class PeriodFigures:
+    income: float = 0
+    expense: float = 0
+    expense_by_nature: dict[Nature, float] = field(default_factory=dict)
 
-            # Skip records that don't match income filter if specified
-            if isIncome is not None and record.isIncome != isIncome:
-                continue
 
-            # Calculate amount after subtracting splits
-            split_total = sum(split.amount for split in record.splits)
-            record_amount = record.amount - split_total
+@cached_query
+def get_period_summary(
+    accountId=None, offset_type=None, offset=None, session=None
+) -> PeriodFigures:
+    """Returns the income, expense and expense of each nature for a given period in one query.
 
-            if not record.isTransfer:
-                # For regular income/expenses
-                if record.isIncome:
-                    total += record_amount
-                else:
-                    total -= record_amount
+    Figures follow the same rules as get_period_figures.
+    """
+    if session is None:
+        session = Session()
+        should_close = True
+    else:
+        should_close = False
 
-        return abs(round(total, CONFIG.defaults.round_decimals))
+    try:
+        totals = _get_period_totals(session, accountId, offset_type, offset)
+
+        income = 0
+        expense = 0
+        expense_by_nature = {nature: 0 for nature in Nature}
+        for (is_income, nature), amount in totals.items():
+            if is_income:
+                income += amount
+                continue
+            expense += amount
+            if nature is not None:
+                expense_by_nature[nature] += amount
+
+        return PeriodFigures(
+            income=_round_figure(income),
+            expense=_round_figure(expense),
+            expense_by_nature={
+                nature: _round_figure(amount)
+                for nature, amount in expense_by_nature.items()
+            },
+        )
     finally:
         if should_close:
             session.close()
@@ -207,6 +311,40 @@ def get_operator_amount(operator_amount: str = None):
         return None, None
 
 
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def get_search_terms(text: str | None) -> list[str]:
+    """Splits a search into lowercase terms without diacritics, like the FTS5 tokenizer."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _SEARCH_TERM.findall(text)
+
+
+def get_search_query(text: str | None) -> str | None:
+    """Returns an FTS5 query matching labels with a word starting with every term."""
+    terms = get_search_terms(text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def is_search_match(label: str, terms: list[str]) -> bool:
+    """In-memory equivalent of matching a label against get_search_query."""
+    words = get_search_terms(label)
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+def get_label_search_filter(label: str | None, id_column=Record.id, fts=record_fts):
+    """Returns a filter on the ids of the rows whose label matches the search, if any."""
+    query = get_search_query(label)
+    if query is None:
+        return None
+    return id_column.in_(select(fts.c.rowid).where(fts.c.label.match(query)))
+
+
 # region Budgeting
 # ------------- budgeting ------------ #
 
@@ -232,11 +370,3 @@ def get_income_to_use(offset: int):
         limit = fallback
 
     return limit
-
-
-def dynamic_cache(func, *args, **kwargs):
-    # Create a cached version of the function
-    cached_func = lru_cache()(func)
-    # Call the cached version with the provided arguments
-    result = cached_func(*args, **kwargs)
-    return result
@@ -0,0 +1,161 @@
+"""Read models of the list views.
+
+List views only read a handful of attributes of what they display, so their managers
+build these plain objects from Core rows instead of loading ORM entities. They carry
+no session state, so nothing lazy loads after the session is closed, and being frozen
+they are safe to share through the query cache. Accounts, categories and people
+referenced by many rows are shared between them.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from bagels.models.category import Nature
+
+VIEW_ID_CHUNK_SIZE = 500  # ids per IN (...) lookup, well under SQLite's variable limit
+
+
+# region References
+# ------------ references ------------ #
+
+
+@dataclass(slots=True, frozen=True)
+class AccountRef:
+    id: int
+    name: str
+    hidden: bool
+
+
+@dataclass(slots=True, frozen=True)
+class CategoryRef:
+    id: int
+    name: str
+    color: str
+
+
+@dataclass(slots=True, frozen=True)
+class PersonRef:
+    id: int
+    name: str
+
+
+def get_shared_ref(refs: dict, cls, id, *fields):
+    """Returns the `cls` reference to `id` from `refs`, creating it on first use.
+
+    Returns None without an id, as found in outer joined columns.
+    """
+    if id is None:
+        return None
+    key = (cls, id)
+    ref = refs.get(key)
+    if ref is None:
+        ref = refs[key] = cls(id, *fields)
+    return ref
+
+
+# region Records
+# ------------- records -------------- #
+
+
+@dataclass(slots=True, frozen=True)
+class SplitView:
+    id: int
+    amount: float
+    isPaid: bool
+    paidDate: datetime | None
+    person: PersonRef
+    account: AccountRef | None
+
+
+@dataclass(slots=True, frozen=True)
+class RecordView:
+    id: int
+    label: str
+    amount: float
+    date: datetime
+    isIncome: bool
+    isTransfer: bool
+    account: AccountRef
+    category: CategoryRef | None
+    transferToAccount: AccountRef | None
+    splitTotal: float
+    splits: tuple[SplitView, ...]
+
+
+# region People
+# -------------- people -------------- #
+
+
+@dataclass(slots=True, frozen=True)
+class SplitRecordView:
+    id: int
+    label: str
+    date: datetime
+    isIncome: bool
+    category: CategoryRef | None
+
+
+@dataclass(slots=True, frozen=True)
+class PersonSplitView:
+    id: int
+    amount: float
+    isPaid: bool
+    paidDate: datetime | None
+    account: AccountRef | None
+    record: SplitRecordView
+
+
+@dataclass(slots=True, frozen=True)
+class PersonView:
+    id: int
+    name: str
+    splits: tuple[PersonSplitView, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class PersonDueView:
+    id: int
+    name: str
+    owed: float  # unpaid splits of expenses, owed by the person
+    owing: float  # unpaid splits of income, owed to the person
+    paid: float
+    due: float  # owed less owing
+    lastActivity: datetime | None
+
+
+# region Accounts
+# ------------- accounts ------------- #
+
+
+@dataclass(slots=True, frozen=True)
+class AccountView:
+    id: int
+    name: str
+    description: str | None
+    beginningBalance: float
+    repaymentDate: int | None
+    hidden: bool
+    balance: float
+
+
+# region Categories
+# ------------ categories ------------ #
+
+
+@dataclass(slots=True, frozen=True)
+class CategoryView:
+    id: int
+    name: str
+    color: str
+    nature: Nature
+    parentCategoryId: int | None
+    parentCategory: CategoryRef | None
+
+
+@dataclass(slots=True, frozen=True)
+class CategoryAmountView:
+    id: int
+    name: str
+    color: str
+    nature: Nature
+    amount: float
@@ -1,6 +1,14 @@
 import sqlite3
 from datetime import datetime
 
+MIGRATION_CHUNK_SIZE = 1000  # transactions read and inserted per batch
+
+_TRANSACTIONS_FILTER = """
+    FROM v_transactions_internal
+    WHERE tombstone = 0 AND is_child = 0
+    AND (transfer_id IS NULL OR amount >= 0)
+"""
+
 
 def convert_date(date_str):
     """Convert YYYYMMDD to datetime with time set to 12:00 PM"""
@@ -37,7 +45,13 @@ def ensure_default_category(bagels_cur):
 
 
 class BudgetToBagelsMigration:
-    def __init__(self, budget_db_path: str, bagels_db_path: str):
+    def __init__(
+        self,
+        budget_db_path: str,
+        bagels_db_path: str,
+        chunk_size: int = MIGRATION_CHUNK_SIZE,
+    ):
+        self.chunk_size = chunk_size
         self.budget_conn = sqlite3.connect(budget_db_path)
         self.bagels_conn = sqlite3.connect(bagels_db_path)
         self.budget_cur = self.budget_conn.cursor()
@@ -128,60 +142,82 @@ class BudgetToBagelsMigration:
                 )
                 self.category_map[cat_id] = self.bagels_cur.lastrowid
 
-    def migrate_transactions(self):
-        transactions = self.budget_cur.execute("""
-            SELECT id, account, category, amount, date, 
-                   starting_balance_flag, transfer_id, is_parent
-            FROM v_transactions_internal 
-            WHERE tombstone = 0 AND is_child = 0
-            AND (transfer_id IS NULL OR amount >= 0)
-        """).fetchall()
+    def count_transactions(self) -> int:
+        """Number of transactions to migrate, for progress reporting"""
+        return self.budget_cur.execute(
+            f"SELECT COUNT(*) {_TRANSACTIONS_FILTER}"
+        ).fetchone()[0]
 
-        for (
-            trans_id,
-            account_id,
-            category_id,
-            amount,
-            date,
-            is_starting_balance,
-            transfer_id,
-            is_parent,
-        ) in transactions:
-            if account_id not in self.account_map:
-                continue
-
-            transaction_date = convert_date(date)
-
-            amount_float = abs(float(amount or 0) / 100)
-            if amount_float == 0:
-                continue
-
-            account_bagels_id = self.account_map[account_id]
-            category_bagels_id = self.category_map.get(
-                category_id, self.default_category_id
+    def migrate_transactions(self, on_progress=None):
+        """Stream transactions in chunks, inserting each chunk in one executemany.
+
+        Args:
+            on_progress: Called with the number of transactions read after each chunk.
+        """
+        # lookups done per transaction before, loaded once
+        category_income = dict(
+            self.budget_cur.execute("SELECT id, is_income FROM categories")
+        )
+        transfer_accounts = dict(
+            self.budget_cur.execute("""
+            SELECT id, account FROM v_transactions_internal
+            WHERE id IN (
+                SELECT transfer_id FROM v_transactions_internal
+                WHERE transfer_id IS NOT NULL
             )
+        """)
+        )
 
-            category_info = self.budget_cur.execute(
-                """
-                SELECT is_income FROM categories WHERE id = ?
-            """,
-                (category_id,),
-            ).fetchone()
-            is_income = category_info[0] if category_info else 0
-
-            transfer_to_account_id = None
-            is_transfer = bool(transfer_id)
-            if transfer_id:
-                transfer_account = self.budget_cur.execute(
-                    """
-                    SELECT account FROM v_transactions_internal WHERE id = ?
-                """,
-                    (transfer_id,),
-                ).fetchone()
-                if transfer_account and transfer_account[0] in self.account_map:
-                    transfer_to_account_id = self.account_map[transfer_account[0]]
+        # a separate cursor, as the lookups above share the default one
+        transactions = self.budget_conn.cursor()
+        transactions.execute(f"""
+            SELECT id, account, category, amount, date,
+                   starting_balance_flag, transfer_id, is_parent
+            {_TRANSACTIONS_FILTER}
+        """)
+        while chunk := transactions.fetchmany(self.chunk_size):
+            # formatted as sqlite3's datetime adapter would, which is slow and deprecated
+            now = datetime.now().isoformat(" ")
+            rows = []
+            for (
+                trans_id,
+                account_id,
+                category_id,
+                amount,
+                date,
+                is_starting_balance,
+                transfer_id,
+                is_parent,
+            ) in chunk:
+                if account_id not in self.account_map:
+                    continue
 
-            self.bagels_cur.execute(
+                amount_float = abs(float(amount or 0) / 100)
+                if amount_float == 0:
+                    continue
+
+                transfer_to_account_id = None
+                if transfer_id:
+                    transfer_account = transfer_accounts.get(transfer_id)
+                    transfer_to_account_id = self.account_map.get(transfer_account)
+
+                rows.append(
+                    (
+                        now,
+                        now,
+                        "Imported transaction",
+                        amount_float,
+                        convert_date(date).isoformat(" "),
+                        self.account_map[account_id],
+                        self.category_map.get(category_id, self.default_category_id),
+                        bool(category_income.get(category_id, 0)),
+                        bool(transfer_id),
+                        transfer_to_account_id,
+                        False,
+                    )
+                )
+
+            self.bagels_cur.executemany(
                 """
                 INSERT INTO record (
                     createdAt, updatedAt, label, amount, date,
@@ -189,20 +225,10 @@ class BudgetToBagelsMigration:
                     transferToAccountId, isInProgress
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-                (
-                    datetime.now(),
-                    datetime.now(),
-                    "Imported transaction",
-                    amount_float,
-                    transaction_date,
-                    account_bagels_id,
-                    category_bagels_id,
-                    bool(is_income),
-                    is_transfer,
-                    transfer_to_account_id,
-                    False,
-                ),
+                rows,
             )
+            if on_progress:
+                on_progress(len(chunk))
 
     def verify_and_fix_categories(self):
         """Verify all records have valid categories and fix any issues"""
@@ -227,13 +253,29 @@ class BudgetToBagelsMigration:
                 f"Found {null_categories} records with NULL categories after fix"
             )
 
-    def migrate(self):
+    def drop_search_index(self):
+        """Drop the label search index, as indexing each inserted record is slow. It is
+        rebuilt from the records once migrated."""
+        for trigger in ("insert", "delete", "update"):
+            self.bagels_cur.execute(f"DROP TRIGGER IF EXISTS record_fts_{trigger}")
+        self.bagels_cur.execute("DROP TABLE IF EXISTS record_fts")
+        # until it is rebuilt, launches must not take the schema as up to date
+        self.bagels_cur.execute("DELETE FROM schema_meta WHERE key = 'fingerprint'")
+
+    def reset_account_balances(self):
+        """Drop the balance ledgers, so balances are recomputed with the imported records"""
+        self.bagels_cur.execute("DELETE FROM account_balance")
+        self.bagels_cur.execute("DELETE FROM person_balance")
+
+    def migrate(self, on_progress=None):
         self.bagels_conn.execute("BEGIN TRANSACTION")
         try:
             self.migrate_accounts()
             self.migrate_categories()
-            self.migrate_transactions()
+            self.drop_search_index()
+            self.migrate_transactions(on_progress)
             self.verify_and_fix_categories()
+            self.reset_account_balances()
             self.bagels_conn.commit()
             print("Migration completed successfully!")
         except Exception as e:
@@ -244,6 +286,19 @@ class BudgetToBagelsMigration:
             self.bagels_conn.close()
 
 
+def rebuild_derived_data() -> None:
+    """Rebuilds what the migration writes around, once it is committed: the balance
+    ledgers, the monthly totals and the label search index."""
+    from bagels.managers.accounts import rebuild_account_balances
+    from bagels.managers.monthly_totals import rebuild_monthly_totals
+    from bagels.models.database.app import db_engine
+    from bagels.models.database.search import sync_search_indexes
+
+    rebuild_account_balances()
+    rebuild_monthly_totals()
+    sync_search_indexes(db_engine)
+
+
 if __name__ == "__main__":
     migrator = BudgetToBagelsMigration("db.sqlite", "bagels.db")
     migrator.migrate()
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    case,
+    func,
+    insert,
+    select,
+    union_all,
+)
+
+from .account import Account
+from .database.db import Base
+from .record import Record
+from .split import Split
+
+
+class AccountBalance(Base):
+    """Running net movement of an account, maintained on every record and split write.
+
+    The balance of an account is its beginningBalance plus this net. Rows are created
+    with their account, and built from history at database setup and by rebuilds. An
+    account without one has its balance computed from history when read.
+    """
+
+    __tablename__ = "account_balance"
+
+    updatedAt = Column(
+        DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+
+    accountId = Column(Integer, ForeignKey("account.id"), primary_key=True)
+    net = Column(Float, nullable=False, default=0)
+
+
+def select_account_nets():
+    """Returns a select computing (account ID, net) of every account from records and
+    splits, as maintained in AccountBalance."""
+    changes = union_all(
+        # records move money out of their account, except income
+        select(
+            Record.accountId.label("accountId"),
+            case(
+                (Record.isIncome & ~Record.isTransfer, Record.amount),
+                else_=-Record.amount,
+            ).label("amount"),
+        ),
+        select(Record.transferToAccountId, Record.amount).where(
+            Record.isTransfer == True  # noqa: E712
+        ),
+        # paid splits move money back out for income, in for expenses
+        select(
+            Split.accountId,
+            case((Record.isIncome, -Split.amount), else_=Split.amount),
+        )
+        .join(Record, Split.recordId == Record.id)
+        .where(Split.isPaid == True, Split.accountId.isnot(None)),  # noqa: E712
+    ).subquery()
+    return (
+        select(Account.id, func.coalesce(func.sum(changes.c.amount), 0))
+        .outerjoin(changes, changes.c.accountId == Account.id)
+        .group_by(Account.id)
+    )
+
+
+def build_account_balances(session) -> None:
+    """Builds the ledger rows of accounts without one from history, within the caller's
+    transaction."""
+    session.execute(
+        insert(AccountBalance).from_select(
+            ["accountId", "net"],
+            select_account_nets().where(
+                Account.id.not_in(select(AccountBalance.accountId))
+            ),
+        )
+    )
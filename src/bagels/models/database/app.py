@@ -1,23 +1,224 @@
-from datetime import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha256
 from pathlib import Path
 
-import yaml
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, func, inspect, select, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
 
+from bagels.config import CONFIG
 from bagels.locations import database_file
 
 # -------- create all imports -------- #
 from bagels.models.account import Account
+from bagels.models.account_balance import build_account_balances
 from bagels.models.category import Category, Nature
 from bagels.models.database.db import Base
+from bagels.models.database.migrations import (
+    SCHEMA_VERSION,
+    get_schema_meta,
+    run_migrations,
+    set_schema_meta,
+)
+from bagels.models.database.search import get_search_index_ddl, sync_search_indexes
+from bagels.models.monthly_total import MonthlyTotal, build_monthly_totals
 from bagels.models.person import Person  # noqa: F401
-from bagels.models.record import Record  # noqa: F401
+from bagels.models.person_balance import PersonBalance  # noqa: F401
+from bagels.models.record import Record
 from bagels.models.record_template import RecordTemplate  # noqa: F401
-from bagels.models.split import Split  # noqa: F401
+from bagels.models.split import Split
 
 db_engine = create_engine(f"sqlite:///{database_file().resolve()}")
-Session = sessionmaker(bind=db_engine)
+
+
+# region Pragmas
+# ------------- pragmas ------------- #
+
+PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+)
+
+
+@event.listens_for(db_engine, "connect")
+def _apply_pragmas(dbapi_connection, connection_record):
+    settings = CONFIG.database
+    cursor = dbapi_connection.cursor()
+    for pragma in PRAGMAS:
+        value = getattr(settings, pragma)
+        if isinstance(value, bool):
+            value = "ON" if value else "OFF"
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+# SQLite reports these pragmas as numbers
+_PRAGMA_NAMES = {
+    "synchronous": ("off", "normal", "full", "extra"),
+    "temp_store": ("default", "file", "memory"),
+    "foreign_keys": ("off", "on"),
+}
+
+
+def get_pragmas() -> dict[str, str]:
+    """Returns the pragma values in effect on a database connection."""
+    pragmas = {}
+    with db_engine.connect() as conn:
+        for pragma in PRAGMAS:
+            value = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+            if pragma in _PRAGMA_NAMES:
+                value = _PRAGMA_NAMES[pragma][value]
+            pragmas[pragma] = str(value)
+    return pragmas
+
+
+# region Unit of work
+# ---------- unit of work ---------- #
+
+
+class _UnitOfWork:
+    def __init__(self) -> None:
+        self.session = None
+        self.has_writes = False
+
+
+_current_unit_of_work: ContextVar[_UnitOfWork | None] = ContextVar(
+    "unit_of_work", default=None
+)
+
+
+class _UnitOfWorkSession:
+    """The shared session of a unit of work, as handed to each manager call.
+
+    Managers commit and close their session when done: within a unit of work, a commit
+    only flushes, and closing is left to the unit of work.
+    """
+
+    def __init__(self, unit: _UnitOfWork) -> None:
+        self._unit = unit
+
+    def commit(self) -> None:
+        self._unit.has_writes = True
+        self._unit.session.flush()
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._unit.session, name)
+
+
+class UnitOfWorkSessionmaker(sessionmaker):
+    """Creates a new session, or hands out the shared one while a unit of work is active."""
+
+    def __call__(self, **local_kw):
+        unit = _current_unit_of_work.get()
+        if unit is None:
+            return super().__call__(**local_kw)
+        if unit.session is None:
+            # objects outlive the unit of work, so keep them loaded past the commit
+            unit.session = super().__call__(expire_on_commit=False, **local_kw)
+        return _UnitOfWorkSession(unit)
+
+
+Session = UnitOfWorkSessionmaker(bind=db_engine)
+
+
+@contextmanager
+def unit_of_work():
+    """Shares one session, connection and transaction between all manager calls in the block.
+
+    The session is only opened on the first manager call. Writes are committed together
+    when the block exits, or rolled back if it raises. Nested units join the outer one.
+    """
+    if _current_unit_of_work.get() is not None:
+        yield
+        return
+
+    unit = _UnitOfWork()
+    token = _current_unit_of_work.set(unit)
+    try:
+        yield
+        if unit.session is not None and unit.has_writes:
+            unit.session.commit()
+    except BaseException:
+        if unit.session is not None:
+            unit.session.rollback()
+        raise
+    finally:
+        _current_unit_of_work.reset(token)
+        if unit.session is not None:
+            unit.session.close()
+
+
+def has_uncommitted_writes() -> bool:
+    """Returns whether the active unit of work holds writes that are not committed yet."""
+    unit = _current_unit_of_work.get()
+    return unit is not None and unit.has_writes
+
+
+# region Indexes
+# ------------- indexes ------------- #
+
+
+def _get_plan_queries():
+    # representative lookups of the managers, keyed by a description
+    period = (
+        Record.date >= func.datetime("now", "start of month"),
+        Record.date < func.datetime("now", "start of month", "+1 month"),
+    )
+    return {
+        "records in period": select(Record.id).where(*period),
+        "account records in period": select(Record.id).where(
+            *period, Record.accountId == 1
+        ),
+        "account records": select(Record.id).where(Record.accountId == 1),
+        "transfers to account": select(Record.id).where(
+            Record.transferToAccountId == 1
+        ),
+        "category records": select(Record.id).where(Record.categoryId == 1),
+        "split totals": select(Split.recordId, func.sum(Split.amount)).group_by(
+            Split.recordId
+        ),
+        "person splits": select(Split.id).where(Split.personId == 1),
+        "account splits": select(Split.id).where(Split.accountId == 1),
+    }
+
+
+def get_query_plans(engine=None) -> dict[str, list[str]]:
+    """Returns the SQLite query plan of the hot manager lookups on the given engine."""
+    engine = engine if engine is not None else db_engine
+    plans = {}
+    with engine.connect() as conn:
+        for name, query in _get_plan_queries().items():
+            sql = query.compile(engine, compile_kwargs={"literal_binds": True})
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+def get_unindexed_query_plans() -> dict[str, list[str]]:
+    """Returns the query plans on an empty copy of the schema without secondary indexes."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                if index.name != f"ix_{table.name}_id":
+                    conn.exec_driver_sql(f"DROP INDEX {index.name}")
+    plans = get_query_plans(engine)
+    engine.dispose()
+    return plans
+
+
+# region Init
+# -------------- init -------------- #
 
 
 def _create_outside_source_account(session):
@@ -42,6 +243,8 @@ def _create_default_categories(session):
         Path(__file__).parent.parent.parent / "static" / "default_categories.yaml"
     )
 
+    import yaml  # only needed on a new database
+
     with open(yaml_path, "r") as file:
         default_categories = yaml.safe_load(file)
 
@@ -66,34 +269,17 @@ def _create_default_categories(session):
             session.commit()
 
 
-def _fix_dangling_categories(session):
-    dangling_subcategories = (
-        session.query(Category)
-        .filter(
-            Category.parentCategoryId.isnot(None),
-            Category.deletedAt.is_(None),
-            Category.parentCategoryId.in_(
-                session.query(Category.id).filter(Category.deletedAt.isnot(None))
-            ),
-        )
-        .all()
-    )
-
-    for subcategory in dangling_subcategories:
-        subcategory.deletedAt = datetime.now()
-        session.add(subcategory)
-
-    session.commit()
-
-
-def _sync_database_schema():
+def _sync_database_schema() -> set[str]:
+    """Creates missing tables, columns and indexes. Returns the names of created tables."""
     try:
         inspector = inspect(db_engine)
         existing_tables = inspector.get_table_names()
+        created_tables = set()
 
         for table in Base.metadata.tables.values():
             if table.name not in existing_tables:
                 table.create(db_engine)
+                created_tables.add(table.name)
             else:
                 existing_columns = {
                     col["name"] for col in inspector.get_columns(table.name)
@@ -111,25 +297,86 @@ def _sync_database_schema():
                                 f"{'DEFAULT ' + str(column.default.arg) if column.default is not None else ''}"
                             )
                         )
+
+                existing_indexes = {
+                    index["name"] for index in inspector.get_indexes(table.name)
+                }
+                for index in table.indexes:
+                    if index.name not in existing_indexes:
+                        index.create(db_engine)
+
+        sync_search_indexes(db_engine)
+        return created_tables
     except Exception as e:
         raise Exception(f"Failed to sync database schema: {str(e)}")
 
 
-def init_db():
-    _sync_database_schema()
+def _build_new_monthly_totals(created_tables: set[str]) -> None:
+    # totals are maintained on writes from then on
+    if MonthlyTotal.__tablename__ in created_tables:
+        session = Session()
+        try:
+            build_monthly_totals(session)
+            session.commit()
+        finally:
+            session.close()
+
+
+def get_schema_fingerprint() -> str:
+    """Returns a hash of the DDL of every table, index and search index of the models."""
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(db_engine)))
+        statements.extend(
+            str(CreateIndex(index).compile(db_engine))
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        )
+    statements.extend(get_search_index_ddl())
+    return sha256("\n".join(statements).encode()).hexdigest()
+
+
+def _is_database_current(fingerprint: str) -> bool:
+    session = Session()
+    try:
+        meta = get_schema_meta(session)
+    except OperationalError:
+        return False  # created before the schema was fingerprinted
+    finally:
+        session.close()
+    return meta.get("fingerprint") == fingerprint and meta.get("version") == str(
+        SCHEMA_VERSION
+    )
+
+
+def _set_up_database(fingerprint: str) -> None:
+    created_tables = _sync_database_schema()
     Base.metadata.create_all(db_engine)
+    _build_new_monthly_totals(created_tables)
     session = Session()
-    _create_outside_source_account(session)
-    _create_default_categories(session)
-    _fix_dangling_categories(session)
-    session.close()
+    try:
+        _create_outside_source_account(session)
+        _create_default_categories(session)
+        # for accounts created before the ledger, or by other tools
+        build_account_balances(session)
+        run_migrations(session)
+        # last, so an interrupted setup runs again on the next launch
+        set_schema_meta(session, fingerprint=fingerprint)
+        session.commit()
+    finally:
+        session.close()
+
+
+def init_db():
+    """Brings the database up to date with the models and migrations.
+
+    A database set up by this version is recognized by its schema fingerprint, and
+    left as it is without reflecting its schema.
+    """
+    fingerprint = get_schema_fingerprint()
+    if not _is_database_current(fingerprint):
+        _set_up_database(fingerprint)
 
 
 def wipe_database():
     Base.metadata.drop_all(db_engine)
-    _sync_database_schema()
-    Base.metadata.create_all(db_engine)
-    session = Session()
-    _create_outside_source_account(session)
-    _create_default_categories(session)
-    session.close()
+    _set_up_database(get_schema_fingerprint())
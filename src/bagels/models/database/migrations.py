@@ -0,0 +1,82 @@
+"""Versioned migrations of the data in the database.
+
+The database stores the version it was migrated to, and each launch only runs the
+migrations after it, in order. Schema changes the models describe, such as new tables,
+columns and indexes, are created by init_db and need no migration: migrations are for
+data, and run after the schema is in sync.
+
+To add one, append a function taking the session to MIGRATIONS. It must only flush:
+the runner commits it together with the new version, so it runs exactly once.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Table, select
+from sqlalchemy.dialects.sqlite import insert
+
+from bagels.models.category import Category
+
+from .db import Base
+
+# key-value settings of the database itself: the schema version and fingerprint
+schema_meta = Table(
+    "schema_meta",
+    Base.metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+
+def get_schema_meta(session) -> dict[str, str]:
+    return dict(session.execute(select(schema_meta.c.key, schema_meta.c.value)).all())
+
+
+def set_schema_meta(session, **values: str) -> None:
+    for key, value in values.items():
+        statement = insert(schema_meta).values(key=key, value=value)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[schema_meta.c.key], set_={"value": value}
+            )
+        )
+
+
+# region Migrations
+# ------------ migrations ------------ #
+
+
+def _fix_dangling_categories(session) -> None:
+    """Deletes the remaining subcategories of deleted categories."""
+    deleted_parents = select(Category.id).where(Category.deletedAt.isnot(None))
+    dangling_subcategories = session.scalars(
+        select(Category).where(
+            Category.parentCategoryId.in_(deleted_parents),
+            Category.deletedAt.is_(None),
+        )
+    ).all()
+    for subcategory in dangling_subcategories:
+        subcategory.deletedAt = datetime.now()
+    session.flush()
+
+
+# version N is the database after the first N migrations
+MIGRATIONS = [
+    _fix_dangling_categories,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(session) -> int:
+    return int(get_schema_meta(session).get("version", 0))
+
+
+def run_migrations(session) -> list[str]:
+    """Runs the migrations the database has not run yet. Returns their names."""
+    version = get_schema_version(session)
+    names = []
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(session)
+        set_schema_meta(session, version=str(number))
+        session.commit()
+        names.append(migration.__name__.strip("_"))
+    return names
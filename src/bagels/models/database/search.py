@@ -0,0 +1,66 @@
+from sqlalchemy import DDL, column, event, inspect, table
+
+from bagels.models.record import Record
+from bagels.models.record_template import RecordTemplate
+
+# Full-text indexes over labels. They are external content FTS5 tables: only the index
+# is stored, the text stays in the source table, and triggers keep the two in sync.
+SEARCH_TOKENIZER = "unicode61 remove_diacritics 2"
+
+record_fts = table("record_fts", column("rowid"), column("label"), column("rank"))
+record_template_fts = table(
+    "record_template_fts", column("rowid"), column("label"), column("rank")
+)
+
+_INDEXED_TABLES = {
+    Record.__table__: record_fts.name,
+    RecordTemplate.__table__: record_template_fts.name,
+}
+
+
+def _get_search_ddl(source: str, fts: str) -> list[str]:
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"label, content='{source}', content_rowid='id', tokenize='{SEARCH_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, label) VALUES (new.id, new.label); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, label) VALUES ('delete', old.id, old.label); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF label ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, label) VALUES ('delete', old.id, old.label); "
+        f"INSERT INTO {fts}(rowid, label) VALUES (new.id, new.label); END",
+    ]
+
+
+def get_search_index_ddl() -> list[str]:
+    """Returns the statements creating every search index and its triggers."""
+    return [
+        statement
+        for source, fts in _INDEXED_TABLES.items()
+        for statement in _get_search_ddl(source.name, fts)
+    ]
+
+
+for _source, _fts in _INDEXED_TABLES.items():
+    for _statement in _get_search_ddl(_source.name, _fts):
+        event.listen(_source, "after_create", DDL(_statement))
+    event.listen(_source, "before_drop", DDL(f"DROP TABLE IF EXISTS {_fts}"))
+
+
+def sync_search_indexes(engine) -> None:
+    """Creates missing search indexes of existing tables, and fills them from their table."""
+    existing_tables = inspect(engine).get_table_names()
+    with engine.begin() as conn:
+        for source, fts in _INDEXED_TABLES.items():
+            if fts in existing_tables:
+                continue
+            for statement in _get_search_ddl(source.name, fts):
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def rebuild_search_indexes(engine) -> None:
+    """Rebuilds every search index from its table."""
+    with engine.begin() as conn:
+        for fts in _INDEXED_TABLES.values():
+            conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum as SQLEnum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    delete,
+    func,
+    insert,
+    select,
+)
+
+from bagels.config import CONFIG
+
+from .category import Category, Nature
+from .database.db import Base
+from .record import Record
+from .split import Split
+
+
+class MonthlyTotal(Base):
+    """Net amount of records less their splits, per month, account, category and flow.
+
+    Maintained on every record and split write, so period figures and category totals
+    read a few rows per month instead of every record. Transfers are not included.
+    The nature is the category's, kept here to total natures without joining categories.
+    """
+
+    __tablename__ = "monthly_total"
+    __table_args__ = (
+        Index(
+            "ix_monthly_total_key",
+            "month",
+            "accountId",
+            "categoryId",
+            "isIncome",
+            "nature",
+        ),
+    )
+
+    updatedAt = Column(
+        DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+
+    id = Column(Integer, primary_key=True)
+    month = Column(String, nullable=False)  # YYYY-MM
+    accountId = Column(Integer, ForeignKey("account.id"), nullable=False)
+    categoryId = Column(Integer, ForeignKey("category.id"), nullable=True)
+    isIncome = Column(Boolean, nullable=False)
+    nature = Column(SQLEnum(Nature), nullable=True)
+    amount = Column(Float, nullable=False, default=0)
+
+
+def get_month(date: datetime) -> str:
+    return date.strftime("%Y-%m")
+
+
+def select_monthly_totals():
+    """Returns a select computing the rows of MonthlyTotal from records and splits."""
+    split_total = (
+        select(func.coalesce(func.sum(Split.amount), 0))
+        .where(Split.recordId == Record.id)
+        .correlate(Record)
+        .scalar_subquery()
+    )
+    month = func.strftime("%Y-%m", Record.date)
+    return (
+        select(
+            month,
+            Record.accountId,
+            Record.categoryId,
+            Record.isIncome,
+            Category.nature,
+            func.round(
+                func.sum(Record.amount - split_total), CONFIG.defaults.round_decimals
+            ),
+        )
+        .outerjoin(Category, Record.categoryId == Category.id)
+        .where(Record.isTransfer == False)  # noqa: E712
+        .group_by(
+            month, Record.accountId, Record.categoryId, Record.isIncome, Category.nature
+        )
+    )
+
+
+def build_monthly_totals(session) -> None:
+    """Recomputes every monthly total from history, within the caller's transaction."""
+    session.execute(delete(MonthlyTotal))
+    session.execute(
+        insert(MonthlyTotal).from_select(
+            ["month", "accountId", "categoryId", "isIncome", "nature", "amount"],
+            select_monthly_totals(),
+        )
+    )
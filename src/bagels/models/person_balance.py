@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+
+from .database.db import Base
+
+
+class PersonBalance(Base):
+    """Split totals of a person, refreshed on every record and split write.
+
+    A missing row means the totals have not been built for the person yet, and are
+    computed from history.
+    """
+
+    __tablename__ = "person_balance"
+
+    updatedAt = Column(
+        DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
+
+    personId = Column(Integer, ForeignKey("person.id"), primary_key=True)
+    owed = Column(Float, nullable=False, default=0)  # unpaid splits of expenses
+    owing = Column(Float, nullable=False, default=0)  # unpaid splits of income
+    paid = Column(Float, nullable=False, default=0)
+    lastActivity = Column(DateTime, nullable=True)
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -19,6 +20,10 @@ from .database.db import Base
 
 class Record(Base):
     __tablename__ = "record"
+    __table_args__ = (
+        # period queries filter on date, and often account
+        Index("ix_record_date_accountId", "date", "accountId"),
+    )
 
     createdAt = Column(DateTime, nullable=False, default=datetime.now)
     updatedAt = Column(
@@ -29,8 +34,8 @@ class Record(Base):
     label = Column(String, nullable=False)
     amount = Column(Float, CheckConstraint("amount > 0"), nullable=False)
     date = Column(DateTime, nullable=False, default=datetime.now)
-    accountId = Column(Integer, ForeignKey("account.id"), nullable=False)
-    categoryId = Column(Integer, ForeignKey("category.id"), nullable=True)
+    accountId = Column(Integer, ForeignKey("account.id"), nullable=False, index=True)
+    categoryId = Column(Integer, ForeignKey("category.id"), nullable=True, index=True)
 
     tags = Column(String, nullable=True)  # unimplemented
     isInProgress = Column(Boolean, nullable=False, default=False)  # unimplemented
@@ -44,7 +49,9 @@ class Record(Base):
         nullable=False,
         default=False,
     )
-    transferToAccountId = Column(Integer, ForeignKey("account.id"), nullable=True)
+    transferToAccountId = Column(
+        Integer, ForeignKey("account.id"), nullable=True, index=True
+    )
 
     account = relationship(
         "Account", foreign_keys=[accountId], back_populates="records"
@@ -56,7 +63,10 @@ class Record(Base):
         back_populates="transferFromRecords",
     )
     splits = relationship(
-        "Split", back_populates="record", cascade="all, delete-orphan"
+        "Split",
+        back_populates="record",
+        cascade="all, delete-orphan",
+        order_by="Split.id",
     )
 
     @validates("amount")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship, validates
 
 from bagels.config import CONFIG
@@ -10,6 +10,10 @@ from .database.db import Base
 
 class Split(Base):
     __tablename__ = "split"
+    __table_args__ = (
+        # covers the per-record split totals without reading the table
+        Index("ix_split_recordId_amount", "recordId", "amount"),
+    )
 
     createdAt = Column(DateTime, nullable=False, default=datetime.now)
     updatedAt = Column(
@@ -21,10 +25,10 @@ class Split(Base):
         Integer, ForeignKey("record.id", ondelete="CASCADE"), nullable=False
     )
     amount = Column(Float, nullable=False)
-    personId = Column(Integer, ForeignKey("person.id"), nullable=False)
+    personId = Column(Integer, ForeignKey("person.id"), nullable=False, index=True)
     isPaid = Column(Boolean, nullable=False, default=False)
     paidDate = Column(DateTime, nullable=True)
-    accountId = Column(Integer, ForeignKey("account.id"), nullable=True)
+    accountId = Column(Integer, ForeignKey("account.id"), nullable=True, index=True)
 
     record = relationship("Record", foreign_keys=[recordId], back_populates="splits")
     person = relationship("Person", foreign_keys=[personId], back_populates="splits")
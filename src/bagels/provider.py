@@ -8,6 +8,7 @@ from textual.types import IgnoreReturnCallbackType
 
 from bagels.config import CONFIG, write_state
 from bagels.locations import config_file
+from bagels.managers.cache import get_cache_stats
 from bagels.managers.samples import create_sample_entries
 from bagels.models.database.app import wipe_database
 
@@ -48,6 +49,12 @@ class AppProvider(Provider):
                 "Create sample entries defined in static/sample_entries.yaml",
                 False,
             ),
+            (
+                "dev: query cache stats",
+                self._action_show_cache_stats,
+                "Show hit / miss statistics of the query cache",
+                False,
+            ),
             (
                 "dev: wipe database",
                 self._action_wipe_database,
@@ -129,6 +136,15 @@ class AppProvider(Provider):
         #     callback=check_delete,
         # )
 
+    def _action_show_cache_stats(self) -> None:
+        stats = get_cache_stats()
+        self.app.notify(
+            f"Hits: {stats['hits']}, misses: {stats['misses']} ({stats['hit_rate']:.0%})\n"
+            f"Entries: {stats['size']} / {stats['max_size']}, evictions: {stats['evictions']}\n"
+            f"Data version: {stats['version']}",
+            title="Query cache",
+        )
+
     def _action_toggle_update_check(self) -> None:
         cur = CONFIG.state.check_for_updates
         write_state("check_for_updates", not cur)
@@ -0,0 +1,118 @@
+"""Profiles the startup of the app: how long each phase takes until the first frame,
+and which modules the time goes to importing.
+
+The profile runs the app's startup in a fresh interpreter under `-X importtime`, since
+the modules of the current process are already imported. The child times its phases
+and prints them as JSON on stdout; the import times are read from its stderr.
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+
+def run_startup_phases() -> dict[str, float]:
+    """Starts the app as the launcher does, headless, timing each phase in ms."""
+    phases = {}
+    start = perf_counter()
+
+    def lap(phase: str) -> None:
+        nonlocal start
+        now = perf_counter()
+        phases[phase] = round((now - start) * 1000, 3)
+        start = now
+
+    from bagels.config import load_config
+
+    load_config()
+    lap("config")
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+    lap("database")
+
+    from bagels.app import App
+
+    lap("app import")
+
+    async def first_frame() -> None:
+        app = App()
+        async with app.run_test(size=(140, 40)) as pilot:
+            await pilot.pause()
+            lap("first frame")
+
+    asyncio.run(first_frame())
+    return phases
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, float, float]]:
+    """Returns (module, self ms, cumulative ms) of `-X importtime` lines."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return imports
+
+
+def summarize_imports(stderr: str, top: int = 15) -> dict:
+    """Summarizes `-X importtime` output by top level package and by module."""
+    imports = _parse_importtime(stderr)
+    packages = {}
+    for name, self_ms, _ in imports:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_ms
+    bagels_modules = [entry for entry in imports if entry[0].startswith("bagels.")]
+    return {
+        "modules": len(imports),
+        "total": round(sum(entry[1] for entry in imports), 3),
+        "packages": {
+            package: round(total, 3)
+            for package, total in sorted(
+                packages.items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        },
+        # what each of our modules costs to import, with what it imports
+        "bagels": {
+            name: round(cumulative_ms, 3)
+            for name, _, cumulative_ms in sorted(
+                bagels_modules, key=lambda entry: entry[2], reverse=True
+            )[:top]
+        },
+        "slowest": {
+            name: round(self_ms, 3)
+            for name, self_ms, _ in sorted(
+                imports, key=lambda entry: entry[1], reverse=True
+            )[:top]
+        },
+    }
+
+
+def profile_startup(root: Path | None = None, top: int = 15) -> dict:
+    """Profiles a startup of the app in a child process. Times are in milliseconds."""
+    command = [sys.executable, "-X", "importtime", "-m", "bagels"]
+    if root is not None:
+        command += ["--at", str(root)]
+    command += ["profile-startup", "--child"]
+
+    start = perf_counter()
+    child = subprocess.run(command, capture_output=True, text=True)
+    total = round((perf_counter() - start) * 1000, 3)
+    if child.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{child.stderr[-2000:]}")
+
+    phases = json.loads(child.stdout.strip().splitlines()[-1])
+    # the interpreter, the command line interface, and shutting down
+    phases = {"interpreter and cli": round(total - sum(phases.values()), 3), **phases}
+    return {
+        "total": total,
+        "phases": phases,
+        "imports": summarize_imports(child.stderr, top),
+    }
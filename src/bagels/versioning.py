@@ -1,12 +1,22 @@
-import requests
-from packaging import version
+import json
+import os
+from datetime import datetime, timedelta
 from importlib.metadata import metadata
 
+from packaging import version
+
+from bagels.locations import update_check_file
 
-def get_pypi_version():
+UPDATE_CHECK_TTL = timedelta(days=1)  # how long a check, failed or not, is reused
+UPDATE_CHECK_TIMEOUT = 3  # seconds, to connect and to read
+
+
+def get_pypi_version(timeout: float = UPDATE_CHECK_TIMEOUT):
     """Fetch the latest version from PyPI."""
+    import requests  # slow to import, and only needed off the startup path
+
     try:
-        response = requests.get("https://pypi.org/pypi/bagels/json")
+        response = requests.get("https://pypi.org/pypi/bagels/json", timeout=timeout)
         return response.json()["info"]["version"]
     except Exception:
         return None
@@ -16,11 +26,58 @@ def get_current_version():
     return metadata("bagels")["Version"]
 
 
+def _read_update_check() -> dict | None:
+    try:
+        with open(update_check_file(), "r") as f:
+            check = json.load(f)
+        checked_at = datetime.fromisoformat(check["checkedAt"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not timedelta(0) <= datetime.now() - checked_at < UPDATE_CHECK_TTL:
+        return None
+    return check
+
+
+def _write_update_check(latest_version: str | None) -> None:
+    path = update_check_file()
+    temp_path = path.with_suffix(".tmp")
+    try:
+        with open(temp_path, "w") as f:
+            json.dump(
+                {"checkedAt": datetime.now().isoformat(), "version": latest_version}, f
+            )
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # checked again next time
+
+
+def get_latest_version():
+    """Returns the latest version on PyPI, checked at most once per UPDATE_CHECK_TTL.
+
+    Failed checks, such as when offline, are cached too, so they only cost a timeout
+    once per TTL.
+    """
+    check = _read_update_check()
+    if check is not None:
+        return check["version"]
+    latest_version = get_pypi_version()
+    _write_update_check(latest_version)
+    return latest_version
+
+
+def get_available_update():
+    """Returns the latest version if it is newer than the current one, else None."""
+    latest_version = get_latest_version()
+    if not latest_version:
+        return None
+    try:
+        if version.parse(latest_version) > version.parse(get_current_version()):
+            return latest_version
+    except version.InvalidVersion:
+        pass
+    return None
+
+
 def needs_update():
     """Check if the current version needs an update."""
-    pypi_version = get_pypi_version()
-    current_version = get_current_version()
-    if not pypi_version:
-        return False
-
-    return version.parse(pypi_version) > version.parse(current_version)
+    return get_available_update() is not None
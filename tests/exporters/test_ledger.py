@@ -0,0 +1,101 @@
+import csv
+import json
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.exporters import ledger
+from bagels.exporters.ledger import LedgerExportError, export_ledger
+
+# Test fixtures
+@pytest.fixture(scope="function")
+def session(monkeypatch):
+    """Create all tables and a new session for a test, and point the exporter at it."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(ledger, "Session", Session)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_data(session):
+    """Create accounts, a category, a person, and records across two months."""
+    checking = Account(name="Checking", beginningBalance=1000.0)
+    savings = Account(name="Savings", beginningBalance=0.0)
+    category = Category(name="Food", nature=Nature.NEED, color="#FF0000")
+    person = Person(name="Alex")
+    session.add_all([checking, savings, category, person])
+    session.flush()
+    records = [
+        Record(label="Lunch", amount=12.5, date=datetime(2024, 1, 10, 12), accountId=checking.id, categoryId=category.id),
+        Record(label="Dinner", amount=40.0, date=datetime(2024, 2, 3, 20), accountId=checking.id, categoryId=category.id),
+        Record(label="Interest", amount=1.25, date=datetime(2024, 2, 28), accountId=savings.id, isIncome=True),
+        Record(label="Save", amount=100.0, date=datetime(2024, 2, 29), accountId=checking.id, isTransfer=True, transferToAccountId=savings.id),
+    ]
+    session.add_all(records)
+    session.flush()
+    session.add(Split(recordId=records[1].id, amount=20.0, personId=person.id))
+    session.commit()
+    return {"checking": checking, "savings": savings, "records": records}
+
+def _read_csv(path):
+    with open(path, newline="") as file:
+        return list(csv.DictReader(file))
+
+def test_export_csv(session, test_data, tmp_path):
+    """Test every table is exported in chunks, records in date order."""
+    chunks = []
+
+    counts = export_ledger(tmp_path, "csv", chunk_size=2, on_progress=lambda table, rows: chunks.append((table, rows)))
+
+    assert counts == {"records": 4, "splits": 1, "accounts": 2, "categories": 1, "persons": 1}
+    assert ("records", 2) in chunks and chunks.count(("records", 2)) == 2
+    records = _read_csv(tmp_path / "records.csv")
+    assert [record["label"] for record in records] == ["Lunch", "Dinner", "Interest", "Save"]
+    assert records[0]["date"] == "2024-01-10T12:00:00"
+    assert records[0]["transferToAccountId"] == ""
+    assert _read_csv(tmp_path / "categories.csv")[0]["nature"] == "Need"
+
+def test_export_filters(session, test_data, tmp_path):
+    """Test records and splits are filtered by period and account, and other tables are not."""
+    counts = export_ledger(
+        tmp_path, "jsonl", start=datetime(2024, 2, 1), end=datetime(2024, 3, 1), account_names=["Savings"]
+    )
+
+    with open(tmp_path / "records.jsonl") as file:
+        records = [json.loads(line) for line in file]
+    # records of the account, and transfers into it
+    assert [(record["label"], record["isIncome"]) for record in records] == [("Interest", True), ("Save", False)]
+    assert counts["splits"] == 0
+    assert counts["accounts"] == 2
+
+    counts = export_ledger(tmp_path, "csv", tables=["splits"], end=datetime(2024, 2, 4))
+    assert counts == {"splits": 1}
+
+    with pytest.raises(LedgerExportError, match="No account named 'Cash'"):
+        export_ledger(tmp_path / "missing", "csv", account_names=["Cash"])
+    assert not (tmp_path / "missing").exists()
+
+def test_export_parquet(session, test_data, tmp_path):
+    """Test Parquet files keep the column types."""
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    export_ledger(tmp_path, "parquet", chunk_size=3)
+
+    table = pq.read_table(tmp_path / "records.parquet")
+    assert table.num_rows == 4
+    assert table.schema.field("date").type == pa.timestamp("us")
+    assert table.schema.field("isIncome").type == pa.bool_()
+    assert table.column("amount").to_pylist() == [12.5, 40.0, 1.25, 100.0]
@@ -0,0 +1,218 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.category import Category, Nature
+from bagels.managers import accounts, categories, monthly_totals, persons, records
+from bagels.importers.parsers import parse_amount, parse_csv, parse_ofx, parse_qif
+from bagels.importers.rules import ImportRules, StatementImportError, load_rules
+from bagels.importers.statement import import_statement
+
+# Test fixtures
+@pytest.fixture(scope="function")
+def session(monkeypatch):
+    """Create all tables and a new session for a test, and point the managers at it."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    for module in (accounts, categories, monthly_totals, persons, records):
+        monkeypatch.setattr(module, "Session", Session)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_data(session):
+    """Create test accounts and categories."""
+    checking = Account(name="Checking", beginningBalance=1000.0)
+    savings = Account(name="Savings", beginningBalance=0.0)
+    groceries = Category(name="Groceries", nature=Nature.NEED, color="#00FF00")
+    transport = Category(name="Transport", nature=Nature.NEED, color="#0000FF")
+    session.add_all([checking, savings, groceries, transport])
+    session.commit()
+    return {"checking": checking, "savings": savings, "groceries": groceries, "transport": transport}
+
+CSV_STATEMENT = """Example Bank export
+Date,Payee,Reference,Amount
+31/01/2024,Corner Shop,,-12.50
+31/01/2024,Corner Shop,,-12.50
+01/02/2024,UBER TRIP,ABC123,-8.20
+02/02/2024,Salary,,"1,500.00"
+03/02/2024,Transfer to savings,,-100.00
+
+04/02/2024,Nothing,,0.00
+"""
+
+CSV_RULES = """
+account: Checking
+csv:
+  skip_rows: 1
+  date_format: "%d/%m/%Y"
+  label: [Payee, Reference]
+rules:
+  - match: uber
+    category: Transport
+    label: Ride
+  - match: transfer to savings
+    skip: true
+"""
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+def test_parse_amount():
+    """Test amounts with symbols, separators and the usual ways of writing negatives."""
+    assert parse_amount("$1,234.50") == 1234.5
+    assert parse_amount("(12.00)") == -12.0
+    assert parse_amount("12.00-") == -12.0
+    assert parse_amount("-1.234,5", decimal_separator=",") == -1234.5
+    with pytest.raises(ValueError):
+        parse_amount("n/a")
+
+def test_parse_csv_with_debit_and_credit(tmp_path):
+    """Test CSV statements with separate debit and credit columns, read without a header."""
+    path = _write(tmp_path, "statement.csv", "2024-01-05;Shop;12,50;\n2024-01-06;Refund;;3,00\n")
+    rules = ImportRules(
+        csv={"delimiter": ";", "has_header": False, "date": 0, "label": 1, "amount": None, "debit": 2, "credit": 3, "decimal_separator": ","}
+    )
+
+    lines = list(parse_csv(path, rules))
+
+    assert [(line.date, line.amount, line.label) for line in lines] == [
+        (datetime(2024, 1, 5), -12.5, "Shop"),
+        (datetime(2024, 1, 6), 3.0, "Refund"),
+    ]
+
+def test_parse_csv_errors(tmp_path):
+    """Test missing columns and invalid rows are reported."""
+    path = _write(tmp_path, "statement.csv", "Date,Description,Amount\n2024-01-05,Shop,abc\n")
+    with pytest.raises(StatementImportError, match="row 2"):
+        list(parse_csv(path, ImportRules()))
+    with pytest.raises(StatementImportError, match="not found"):
+        list(parse_csv(path, ImportRules(csv={"amount": "Value"})))
+
+def test_parse_ofx(tmp_path):
+    """Test OFX 1.x statements, whose leaf elements are not closed."""
+    path = _write(
+        tmp_path,
+        "statement.ofx",
+        "OFXHEADER:100\n<OFX><BANKACCTFROM><ACCTID>12345</BANKACCTFROM><BANKTRANLIST>"
+        "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105120000[0:GMT]<TRNAMT>-12.50<NAME>Shop</STMTTRN>"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240106<TRNAMT>3.00<MEMO>Refund</STMTTRN>"
+        "</BANKTRANLIST></OFX>",
+    )
+
+    lines = list(parse_ofx(path, ImportRules()))
+
+    assert [(line.date, line.amount, line.label, line.account) for line in lines] == [
+        (datetime(2024, 1, 5), -12.5, "Shop", "12345"),
+        (datetime(2024, 1, 6), 3.0, "Refund", "12345"),
+    ]
+
+def test_parse_qif(tmp_path):
+    """Test QIF statements, with Quicken's 'YY years and split lines."""
+    path = _write(
+        tmp_path,
+        "statement.qif",
+        "!Type:Bank\nD1/05'24\nT-12.50\nPShop\nLGroceries\nSGroceries\n$-10.00\nSHome\n$-2.50\n^\n"
+        "D01/06/2024\nU3.00\nMRefund\n^\n",
+    )
+
+    lines = list(parse_qif(path, ImportRules()))
+
+    assert [(line.date, line.amount, line.label, line.category) for line in lines] == [
+        (datetime(2024, 1, 5), -12.5, "Shop", "Groceries"),
+        (datetime(2024, 1, 6), 3.0, "Refund", None),
+    ]
+
+def test_load_rules(tmp_path):
+    """Test rules are read from YAML, and invalid rules are reported."""
+    rules = load_rules(_write(tmp_path, "rules.yaml", CSV_RULES))
+    assert rules.account == "Checking"
+    assert rules.csv.label == ["Payee", "Reference"]
+    assert rules.rules[1].skip
+
+    with pytest.raises(StatementImportError, match="rules.0.match"):
+        load_rules(_write(tmp_path, "bad.yaml", "rules:\n  - match: '('\n"))
+
+def test_import_statement(session, test_data, tmp_path):
+    """Test a statement is imported following the rules, and importing it again adds nothing."""
+    path = _write(tmp_path, "statement.csv", CSV_STATEMENT)
+    rules = load_rules(_write(tmp_path, "rules.yaml", CSV_RULES))
+    accounts.rebuild_account_balances()
+
+    result = import_statement(path, rules)
+
+    # both shop lines are imported: duplicates within a statement are real purchases
+    assert (result.imported, result.duplicates, result.skipped) == (4, 0, 2)
+    imported = session.scalars(select(Record).order_by(Record.id)).all()
+    assert [(record.label, record.amount, record.isIncome) for record in imported] == [
+        ("Corner Shop", 12.5, False),
+        ("Corner Shop", 12.5, False),
+        ("Ride", 8.2, False),
+        ("Salary", 1500.0, True),
+    ]
+    assert imported[2].categoryId == test_data["transport"].id
+    assert {record.accountId for record in imported} == {test_data["checking"].id}
+    assert accounts.verify_account_balances() == []
+    assert monthly_totals.verify_monthly_totals() == []
+
+    result = import_statement(path, rules)
+    assert (result.imported, result.duplicates, result.skipped) == (0, 4, 2)
+
+    # a record entered by hand is not imported again
+    session.query(Record).filter(Record.label == "Salary").delete()
+    session.commit()
+    accounts.rebuild_account_balances()
+    monthly_totals.rebuild_monthly_totals()
+    result = import_statement(path, rules, dry_run=True, chunk_size=2)
+    assert (result.imported, result.duplicates, result.skipped) == (1, 3, 2)
+    assert session.query(Record).count() == 3
+
+def test_import_statement_unknown_names(session, test_data, tmp_path):
+    """Test unknown accounts and categories fail before anything is imported."""
+    path = _write(tmp_path, "statement.csv", CSV_STATEMENT)
+    rules = load_rules(_write(tmp_path, "rules.yaml", CSV_RULES))
+
+    with pytest.raises(StatementImportError, match="No account named 'Current'"):
+        import_statement(path, rules, account="Current")
+    rules.rules[0].category = "Taxis"
+    with pytest.raises(StatementImportError, match="No category named 'Taxis'"):
+        import_statement(path, rules)
+    assert session.query(Record).count() == 0
+
+def test_import_statement_without_rules(session, test_data, tmp_path):
+    """Test lines nothing categorizes go to an Uncategorized category, so their records display."""
+    from bagels.components.modules.records._table_builder import RecordTableBuilder
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    path = _write(tmp_path, "statement.csv", f"Date,Description,Amount\n{today},Shop,-12.50\n{today},Refund,3.00\n")
+
+    result = import_statement(path, ImportRules(), dry_run=True, account="Checking")
+    assert result.imported == 2
+    assert session.query(Category).filter_by(name="Uncategorized").count() == 0
+
+    import_statement(path, ImportRules(), account="Checking")
+    uncategorized = session.query(Category).filter_by(name="Uncategorized").one()
+    assert uncategorized.nature == Nature.WANT
+    assert {record.categoryId for record in session.scalars(select(Record))} == {uncategorized.id}
+
+    builder = RecordTableBuilder()
+    builder.show_splits = False
+    fetched = records.get_records()
+    assert len(fetched) == 2
+    for record in fetched:
+        category_string, _, account_string = builder._format_record_fields(record, "-")
+        assert "Uncategorized" in category_string
+        assert account_string == "Checking"
+
+    # the category is created once
+    import_statement(_write(tmp_path, "more.csv", f"Date,Description,Amount\n{today},Bakery,-4.00\n"), ImportRules(), account="Checking")
+    assert session.query(Category).filter_by(name="Uncategorized").count() == 1
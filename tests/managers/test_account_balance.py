@@ -5,11 +5,12 @@ from sqlalchemy.orm import sessionmaker
 
 from bagels.models.database.db import Base
 from bagels.models.account import Account
+from bagels.models.account_balance import AccountBalance
 from bagels.models.record import Record
 from bagels.models.split import Split
 from bagels.models.person import Person
 from bagels.models.category import Category, Nature
-from bagels.managers import accounts
+from bagels.managers import accounts, records, splits
 
 # Test fixtures
 @pytest.fixture(scope="function")
@@ -209,3 +210,133 @@ def test_combined_balance_calculation(session, test_data):
     # 500 (beginning) + 300 (transfer in) = 800
     balance2 = accounts.get_account_balance(test_data["account2"].id, session)
     assert balance2 == 800.0
+
+
+# Ledger maintained on write
+@pytest.fixture
+def managers(engine, monkeypatch):
+    """Point the record, split and account managers at the test database."""
+    Session = sessionmaker(bind=engine)
+    for module in (accounts, records, splits):
+        monkeypatch.setattr(module, "Session", Session)
+
+def _assert_ledger_matches(test_data):
+    for account in (test_data["account1"], test_data["account2"]):
+        assert accounts.get_account_balance_by_id(account.id) == accounts.get_account_balance(account.id)
+    assert accounts.verify_account_balances() == []
+
+def test_ledger_read_only(session, test_data, managers):
+    """Test accounts without a ledger row are read from history without writing, and get
+    one from a rebuild or when created."""
+    session.add(Record(
+        label="Existing",
+        amount=100.0,
+        accountId=test_data["account1"].id,
+        categoryId=test_data["category"].id,
+        date=datetime.now()
+    ))
+    session.commit()
+
+    balances = {a.id: a.balance for a in accounts.get_all_accounts_with_balance()}
+    assert balances[test_data["account1"].id] == 900.0
+    assert balances[test_data["account2"].id] == 500.0
+    assert accounts.get_account_balance_by_id(test_data["account1"].id) == 900.0
+    assert session.query(AccountBalance).count() == 0
+
+    assert accounts.rebuild_account_balances() == 2
+    assert {row.accountId: row.net for row in session.query(AccountBalance)} == {
+        test_data["account1"].id: -100.0,
+        test_data["account2"].id: 0,
+    }
+    _assert_ledger_matches(test_data)
+
+    account = accounts.create_account({"name": "Account 3", "beginningBalance": 50.0})
+    assert session.get(AccountBalance, account.id).net == 0
+    assert accounts.get_account_balance_by_id(account.id) == 50.0
+
+def test_ledger_maintained_on_write(session, test_data, managers):
+    """Test record and split writes keep the ledger in sync."""
+    accounts.rebuild_account_balances()
+
+    record = records.create_record_and_splits(
+        {
+            "label": "Dinner",
+            "amount": 300.0,
+            "accountId": test_data["account1"].id,
+            "categoryId": test_data["category"].id,
+            "date": datetime.now(),
+        },
+        [
+            {"amount": 100.0, "personId": test_data["person"].id, "isPaid": True, "accountId": test_data["account2"].id},
+            {"amount": 50.0, "personId": test_data["person"].id},
+        ],
+    )
+    assert accounts.get_account_balance_by_id(test_data["account1"].id) == 700.0
+    assert accounts.get_account_balance_by_id(test_data["account2"].id) == 600.0
+    _assert_ledger_matches(test_data)
+
+    records.update_record(record.id, {"isIncome": True, "amount": 250.0})
+    _assert_ledger_matches(test_data)
+
+    unpaid = [s for s in splits.get_splits_by_record_id(record.id) if not s.isPaid][0]
+    splits.update_split(unpaid.id, {"isPaid": True, "accountId": test_data["account1"].id})
+    _assert_ledger_matches(test_data)
+
+    transfer = records.create_record({
+        "label": "Transfer",
+        "amount": 75.0,
+        "accountId": test_data["account2"].id,
+        "isTransfer": True,
+        "transferToAccountId": test_data["account1"].id,
+        "date": datetime.now(),
+    })
+    _assert_ledger_matches(test_data)
+
+    splits.delete_split(unpaid.id)
+    _assert_ledger_matches(test_data)
+
+    records.delete_record(transfer.id)
+    records.delete_record(record.id)
+    assert accounts.get_account_balance_by_id(test_data["account1"].id) == 1000.0
+    assert accounts.get_account_balance_by_id(test_data["account2"].id) == 500.0
+    _assert_ledger_matches(test_data)
+
+def test_verify_and_rebuild_ledger(session, test_data, managers):
+    """Test out-of-band writes are detected and fixed by a rebuild."""
+    accounts.rebuild_account_balances()
+    session.add(Record(
+        label="Out of band",
+        amount=100.0,
+        accountId=test_data["account1"].id,
+        categoryId=test_data["category"].id,
+        date=datetime.now()
+    ))
+    session.commit()
+
+    mismatches = accounts.verify_account_balances()
+    assert [(a.id, ledger, computed) for a, ledger, computed in mismatches] == [
+        (test_data["account1"].id, 1000.0, 900.0)
+    ]
+
+    assert accounts.rebuild_account_balances() == 2
+    _assert_ledger_matches(test_data)
+
+def test_row_balance_changes_match_entities(session, test_data):
+    """Test the ledger reads the same changes from rows as from entities."""
+    account1, account2 = test_data["account1"].id, test_data["account2"].id
+    cases = [
+        ({"amount": 80.0, "accountId": account1, "isIncome": True}, [{"amount": 30.0, "isPaid": True, "accountId": account2}]),
+        ({"amount": 80.0, "accountId": account1}, [{"amount": 30.0, "isPaid": True, "accountId": account2}, {"amount": 20.0}]),
+        ({"amount": 45.0, "accountId": account1, "isTransfer": True, "transferToAccountId": account2}, []),
+    ]
+    for record_data, splits_data in cases:
+        record = Record(label="Case", **record_data, splits=[Split(personId=test_data["person"].id, **split) for split in splits_data])
+        session.add(record)
+        session.flush()
+        rows = (
+            records._get_row(Record, record_data),
+            [records._get_row(Split, split) for split in splits_data],
+        )
+        for sign in (1, -1):
+            assert accounts.get_row_balance_changes(*rows, sign=sign) == accounts.get_record_balance_changes(record, sign=sign)
+    session.rollback()
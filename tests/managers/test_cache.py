@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.managers import accounts, cache
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(accounts, "Session", sessionmaker(bind=engine))
+    cache.clear_cache()
+    yield engine
+    Base.metadata.drop_all(engine)
+
+def test_cache_hits_until_write(test_db):
+    accounts.create_account({"name": "Account 1", "beginningBalance": 100.0})
+
+    first = accounts.get_all_accounts()
+    second = accounts.get_all_accounts()
+    assert second is first
+    assert cache.get_cache_stats()["hits"] == 1
+    assert cache.get_cache_stats()["misses"] == 1
+
+    version = cache.get_data_version()
+    accounts.create_account({"name": "Account 2", "beginningBalance": 100.0})
+    assert cache.get_data_version() > version
+
+    assert len(accounts.get_all_accounts()) == 2
+    assert cache.get_cache_stats()["misses"] == 2
+
+def test_cache_invalidated_by_any_commit(test_db):
+    assert accounts.get_accounts_count() == 0
+
+    session = sessionmaker(bind=test_db)()
+    session.add(Account(name="Direct", beginningBalance=0.0))
+    session.commit()
+    session.close()
+
+    assert accounts.get_accounts_count() == 1
+
+def test_cache_keyed_by_arguments(test_db):
+    accounts.create_account({"name": "Hidden", "beginningBalance": 0.0, "hidden": True})
+
+    assert accounts.get_accounts_count() == 0
+    assert accounts.get_accounts_count(get_hidden=True) == 1
+    assert accounts.get_accounts_count(True) == 1
+    assert cache.get_cache_stats()["misses"] == 3
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    cache.clear_cache()
+    calls = []
+
+    @cache.cached_query
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    square(1)
+    square(2)
+    square(1)  # 1 is now the most recently used
+    square(3)  # evicts 2
+    square(1)
+    square(2)
+
+    assert calls == [1, 2, 3, 2]
+    assert cache.get_cache_stats()["evictions"] == 2
+
+def test_cache_bypassed_with_session(test_db):
+    calls = []
+
+    @cache.cached_query
+    def query(session=None):
+        calls.append(session)
+        return len(calls)
+
+    assert query(session="session") == 1
+    assert query(session="session") == 2
+    assert query() == 3
+    assert query() == 3
@@ -213,3 +213,41 @@ def test_delete_nonexistent_category(test_db):
     
     # Assertions
     assert result is False
+
+def test_get_all_categories_records(test_db):
+    from datetime import datetime
+    from bagels.models.account import Account
+    from bagels.models.monthly_total import build_monthly_totals
+    from bagels.models.person import Person
+    from bagels.models.record import Record
+    from bagels.models.split import Split
+
+    parent = categories.create_category({"name": "Food", "nature": Nature.NEED, "color": "red"})
+    child = categories.create_category(
+        {"name": "Dining", "nature": Nature.WANT, "color": "blue", "parentCategoryId": parent.id}
+    )
+    other = categories.create_category({"name": "Bills", "nature": Nature.MUST, "color": "green"})
+
+    session = sessionmaker(bind=test_db)()
+    session.add_all([Account(name="Account", beginningBalance=0), Person(name="Person")])
+    session.flush()
+    dinner = Record(label="Dinner", amount=30.0, accountId=1, categoryId=child.id, date=datetime.now())
+    session.add_all(
+        [
+            dinner,
+            Record(label="Groceries", amount=25.0, accountId=1, categoryId=parent.id, date=datetime.now()),
+            Record(label="Rent", amount=100.0, accountId=1, categoryId=other.id, date=datetime.now()),
+            Record(label="Salary", amount=500.0, accountId=1, categoryId=other.id, isIncome=True, date=datetime.now()),
+        ]
+    )
+    session.flush()
+    session.add(Split(recordId=dinner.id, amount=10.0, personId=1))
+    build_monthly_totals(session)  # records were added without the managers
+    session.commit()
+    session.close()
+
+    totals = categories.get_all_categories_records(is_income=False)
+    assert [(c.name, c.amount) for c in totals] == [("Bills", 100.0), ("Food", 45.0)]
+
+    totals = categories.get_all_categories_records(is_income=False, subcategories=True)
+    assert [(c.name, c.amount) for c in totals] == [("Bills", 100.0), ("Food", 25.0), ("Dining", 20.0)]
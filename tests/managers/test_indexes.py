@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine
+
+from bagels.models.database.db import Base
+from bagels.models.database.app import get_query_plans, get_unindexed_query_plans
+
+def test_hot_lookups_use_indexes():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+
+    for name, steps in get_query_plans(engine).items():
+        assert any("INDEX" in step for step in steps), name
+        assert "SCAN record" not in steps, name
+        assert "SCAN split" not in steps, name
+
+def test_unindexed_lookups_scan():
+    plans = get_unindexed_query_plans()
+
+    assert plans["records in period"] == ["SCAN record"]
+    assert plans["person splits"] == ["SCAN split"]
@@ -0,0 +1,141 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.models.monthly_total import MonthlyTotal
+from bagels.managers import categories, monthly_totals, records, splits, utils
+
+# Test fixtures
+@pytest.fixture(scope="function")
+def engine():
+    """Create a test-specific database engine."""
+    return create_engine("sqlite:///:memory:")
+
+@pytest.fixture(scope="function")
+def session(engine, monkeypatch):
+    """Create all tables and a new session for a test, and point the managers at it."""
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    for module in (categories, monthly_totals, records, splits, utils):
+        monkeypatch.setattr(module, "Session", Session)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_data(session):
+    """Create test accounts, categories, and people."""
+    account = Account(name="Account 1", beginningBalance=1000.0)
+    need = Category(name="Need", nature=Nature.NEED, color="#FF0000")
+    want = Category(name="Want", nature=Nature.WANT, color="#00FF00")
+    person = Person(name="Test Person")
+    session.add_all([account, need, want, person])
+    session.commit()
+    return {"account": account, "need": need, "want": want, "person": person}
+
+def _totals(session):
+    session.expire_all()
+    return {
+        (row.month, row.categoryId, row.isIncome, row.nature): row.amount
+        for row in session.scalars(select(MonthlyTotal))
+        if row.amount
+    }
+
+def test_totals_maintained_on_write(session, test_data):
+    """Test record and split writes keep the monthly totals in sync."""
+    need, want = test_data["need"].id, test_data["want"].id
+    record = records.create_record_and_splits(
+        {
+            "label": "Dinner",
+            "amount": 300.0,
+            "accountId": test_data["account"].id,
+            "categoryId": need,
+            "date": datetime(2024, 2, 10),
+        },
+        [
+            {"amount": 100.0, "personId": test_data["person"].id},
+            {"amount": 50.0, "personId": test_data["person"].id},
+        ],
+    )
+    assert _totals(session) == {("2024-02", need, False, Nature.NEED): 150.0}
+    assert monthly_totals.verify_monthly_totals() == []
+
+    records.update_record(record.id, {"categoryId": want, "date": datetime(2024, 3, 1)})
+    assert _totals(session) == {("2024-03", want, False, Nature.WANT): 150.0}
+
+    split = splits.get_splits_by_record_id(record.id)[0]
+    splits.update_split(split.id, {"amount": 20.0})
+    splits.delete_split(splits.get_splits_by_record_id(record.id)[1].id)
+    assert _totals(session) == {("2024-03", want, False, Nature.WANT): 280.0}
+
+    categories.update_category(want, {"nature": Nature.MUST})
+    assert _totals(session) == {("2024-03", want, False, Nature.MUST): 280.0}
+
+    records.create_record(
+        {
+            "label": "Transfer",
+            "amount": 75.0,
+            "accountId": test_data["account"].id,
+            "isTransfer": True,
+            "transferToAccountId": test_data["account"].id,
+            "date": datetime(2024, 3, 2),
+        }
+    )
+    records.delete_record(record.id)
+    assert _totals(session) == {}
+    assert monthly_totals.verify_monthly_totals() == []
+
+def test_verify_and_rebuild_totals(session, test_data):
+    """Test out-of-band writes are detected and fixed by a rebuild."""
+    session.add(Record(
+        label="Out of band",
+        amount=100.0,
+        accountId=test_data["account"].id,
+        categoryId=test_data["need"].id,
+        date=datetime(2024, 2, 10),
+    ))
+    session.commit()
+
+    key = ("2024-02", test_data["account"].id, test_data["need"].id, False, Nature.NEED)
+    assert monthly_totals.verify_monthly_totals() == [(key, 0, 100.0)]
+
+    assert monthly_totals.rebuild_monthly_totals() == 1
+    assert monthly_totals.verify_monthly_totals() == []
+
+def test_adjust_monthly_totals_in_batch(session, test_data):
+    """Test one adjustment updates existing totals and creates missing ones, uncategorized included."""
+    month = "2024-03"
+    account_id, need = test_data["account"].id, test_data["need"]
+    existing_key = (month, account_id, need.id, False, Nature.NEED)
+    uncategorized_key = (month, account_id, None, True, None)
+    session.add(MonthlyTotal(month=month, accountId=account_id, categoryId=need.id, isIncome=False, nature=Nature.NEED, amount=10.0))
+    session.commit()
+
+    monthly_totals.adjust_monthly_totals(
+        session,
+        {existing_key: 5.004, uncategorized_key: 7.0},
+        {existing_key: 2.0, uncategorized_key: -7.0},
+        {(month, account_id, test_data["want"].id, False, Nature.WANT): 3.0},
+    )
+    session.commit()
+
+    totals = {
+        (total.categoryId, total.isIncome): total.amount
+        for total in session.scalars(select(MonthlyTotal))
+    }
+    # changes netting to nothing create no total
+    assert totals == {(need.id, False): 17.0, (test_data["want"].id, False): 3.0}
+
+    monthly_totals.adjust_monthly_totals(session, {uncategorized_key: 4.0})
+    session.commit()
+    assert session.scalar(select(MonthlyTotal.amount).where(MonthlyTotal.categoryId.is_(None))) == 4.0
+    monthly_totals.adjust_monthly_totals(session, {uncategorized_key: 1.5})
+    session.commit()
+    assert session.scalar(select(MonthlyTotal.amount).where(MonthlyTotal.categoryId.is_(None))) == 5.5
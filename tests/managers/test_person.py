@@ -1,7 +1,13 @@
 import pytest
+from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.models.person import Person
+from bagels.models.record import Record
+from bagels.models.split import Split
 from bagels.managers import persons
 
 @pytest.fixture(scope="function")
@@ -104,9 +110,97 @@ def test_delete_person(test_db):
     assert result is True
     assert persons.get_person_by_id(new_person.id) is None
 
+def test_delete_person_after_net_due(test_db):
+    """Test a person whose totals were built can be deleted with foreign keys enforced."""
+    with test_db.connect() as connection:  # the in-memory database has one connection
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    new_person = persons.create_person({"name": "John Doe"})
+    persons.get_persons_with_net_due()  # builds their totals, as the People page does
+
+    assert persons.delete_person(new_person.id) is True
+    assert persons.get_person_by_id(new_person.id) is None
+    assert persons.get_persons_with_net_due() == []
+
 def test_delete_nonexistent_person(test_db):
     # Try to delete non-existent person
     result = persons.delete_person(999)
     
     # Assertions
     assert result is False
+
+def test_get_persons_with_net_due(test_db):
+    """Test unpaid, paid and net due amounts are totalled per person."""
+    session = sessionmaker(bind=test_db)()
+    account = Account(name="Account", beginningBalance=0.0)
+    category = Category(name="Category", nature=Nature.NEED, color="#FF0000")
+    alice, bob, idle = Person(name="Alice"), Person(name="Bob"), Person(name="Idle")
+    deleted = Person(name="Deleted", deletedAt=datetime(2024, 1, 1))
+    session.add_all([account, category, alice, bob, idle, deleted])
+    session.flush()
+
+    expense = Record(label="Dinner", amount=100.0, accountId=account.id, categoryId=category.id, date=datetime(2024, 2, 1))
+    income = Record(label="Refund", amount=50.0, accountId=account.id, categoryId=category.id, isIncome=True, date=datetime(2024, 2, 3))
+    session.add_all([expense, income])
+    session.flush()
+    session.add_all(
+        [
+            Split(recordId=expense.id, personId=alice.id, amount=30.0),
+            Split(recordId=expense.id, personId=bob.id, amount=20.0, isPaid=True, paidDate=datetime(2024, 2, 5)),
+            Split(recordId=income.id, personId=alice.id, amount=12.5),
+            Split(recordId=income.id, personId=bob.id, amount=5.0),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    result = {person.name: person for person in persons.get_persons_with_net_due()}
+
+    assert list(result) == ["Alice", "Bob", "Idle"]  # largest net due first
+    assert (result["Alice"].owed, result["Alice"].owing, result["Alice"].paid) == (30.0, 12.5, 0)
+    assert result["Alice"].due == 17.5
+    assert result["Alice"].lastActivity == datetime(2024, 2, 3)
+    assert (result["Bob"].owed, result["Bob"].owing, result["Bob"].paid) == (0, 5.0, 20.0)
+    assert result["Bob"].due == -5.0
+    assert result["Bob"].lastActivity == datetime(2024, 2, 5)
+    assert result["Idle"].due == 0
+    assert result["Idle"].lastActivity is None
+
+def test_net_due_follows_split_writes(test_db, monkeypatch):
+    """Test person totals are refreshed by record and split writes through the managers."""
+    from bagels.managers import records, splits
+
+    Session = sessionmaker(bind=test_db)
+    monkeypatch.setattr(records, "Session", Session)
+    monkeypatch.setattr(splits, "Session", Session)
+    session = Session()
+    account = Account(name="Account", beginningBalance=0.0)
+    category = Category(name="Category", nature=Nature.NEED, color="#FF0000")
+    alice, bob = Person(name="Alice"), Person(name="Bob")
+    session.add_all([account, category, alice, bob])
+    session.commit()
+    account_id, category_id, alice_id, bob_id = account.id, category.id, alice.id, bob.id
+    session.close()
+
+    def dues():
+        return {person.name: (person.due, person.lastActivity) for person in persons.get_persons_with_net_due()}
+
+    assert dues() == {"Alice": (0, None), "Bob": (0, None)}
+
+    record = records.create_record_and_splits(
+        {"label": "Dinner", "amount": 90.0, "accountId": account_id, "categoryId": category_id, "date": datetime(2024, 3, 1)},
+        [{"personId": alice_id, "amount": 30.0}, {"personId": alice_id, "amount": 10.0}],
+    )
+    assert dues() == {"Alice": (40.0, datetime(2024, 3, 1)), "Bob": (0, None)}
+
+    first, second = splits.get_splits_by_record_id(record.id)
+    splits.update_split(first.id, {"personId": bob_id, "isPaid": True, "paidDate": datetime(2024, 3, 4)})
+    assert dues() == {"Alice": (10.0, datetime(2024, 3, 1)), "Bob": (0, datetime(2024, 3, 4))}
+
+    records.update_record(record.id, {"isIncome": True, "date": datetime(2024, 3, 2)})
+    assert dues() == {"Alice": (-10.0, datetime(2024, 3, 2)), "Bob": (0, datetime(2024, 3, 4))}
+
+    splits.delete_split(second.id)
+    assert dues()["Alice"] == (0, None)
+
+    records.delete_record(record.id)
+    assert dues() == {"Alice": (0, None), "Bob": (0, None)}
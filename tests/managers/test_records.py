@@ -0,0 +1,288 @@
+import pytest
+from datetime import datetime
+from freezegun import freeze_time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.managers import records
+
+# Test fixtures
+@pytest.fixture(scope="function")
+def engine():
+    """Create a test-specific database engine."""
+    return create_engine("sqlite:///:memory:")
+
+@pytest.fixture(scope="function")
+def session(engine):
+    """Create all tables and a new session for a test, and point the manager at it."""
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    records.Session = Session
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_data(session):
+    """Create test accounts, categories, and people."""
+    account1 = Account(name="Account 1", beginningBalance=1000.0)
+    account2 = Account(name="Account 2", beginningBalance=500.0)
+    outside = Account(name="Outside source", beginningBalance=0.0, hidden=True)
+    session.add_all([account1, account2, outside])
+
+    category = Category(name="Test Category", nature=Nature.NEED, color="#FF0000")
+    session.add(category)
+
+    person = Person(name="Test Person")
+    session.add(person)
+
+    session.commit()
+
+    return {
+        "account1": account1,
+        "account2": account2,
+        "outside": outside,
+        "category": category,
+        "person": person
+    }
+
+def _record(data, **kwargs):
+    return Record(
+        label=kwargs.pop("label", "Test"),
+        accountId=kwargs.pop("accountId", data["account1"].id),
+        categoryId=data["category"].id,
+        **kwargs
+    )
+
+@freeze_time("2024-02-15 12:00:00")
+def test_get_daily_balance(session, test_data):
+    """Test daily balances across opening records, splits and transfers."""
+    old_expense = _record(test_data, amount=100.0, date=datetime(2024, 1, 20))
+    income = _record(test_data, amount=200.0, isIncome=True, date=datetime(2024, 2, 10, 9))
+    split_expense = _record(test_data, amount=300.0, date=datetime(2024, 2, 10, 18))
+    internal_transfer = _record(
+        test_data,
+        amount=50.0,
+        isTransfer=True,
+        transferToAccountId=test_data["account2"].id,
+        date=datetime(2024, 2, 12),
+    )
+    transfer_out = _record(
+        test_data,
+        amount=40.0,
+        isTransfer=True,
+        transferToAccountId=test_data["outside"].id,
+        date=datetime(2024, 2, 13),
+    )
+    transfer_in = _record(
+        test_data,
+        amount=10.0,
+        isTransfer=True,
+        accountId=test_data["outside"].id,
+        transferToAccountId=test_data["account1"].id,
+        date=datetime(2024, 2, 14),
+    )
+    future = _record(test_data, amount=999.0, date=datetime(2024, 2, 20))
+    session.add_all(
+        [old_expense, income, split_expense, internal_transfer, transfer_out, transfer_in, future]
+    )
+    session.flush()
+    session.add(Split(recordId=split_expense.id, amount=100.0, personId=test_data["person"].id))
+    session.commit()
+
+    balances = records.get_daily_balance(
+        datetime(2024, 2, 9), datetime(2024, 2, 29, 23, 59, 59)
+    )
+
+    # Stops at today, and starts from 1500 (beginning) - 100 (before period)
+    assert balances == [1400.0, 1400.0, 1400.0, 1400.0, 1360.0, 1370.0, 1370.0]
+
+@freeze_time("2024-02-15 12:00:00")
+def test_get_daily_balance_ignores_deleted_accounts(session, test_data):
+    """Test records and beginning balances of deleted accounts are excluded."""
+    test_data["account2"].deletedAt = datetime(2024, 1, 1)
+    session.add(_record(test_data, amount=25.0, accountId=test_data["account2"].id, date=datetime(2024, 2, 14)))
+    session.add(_record(test_data, amount=25.0, date=datetime(2024, 2, 15)))
+    session.commit()
+
+    balances = records.get_daily_balance(datetime(2024, 2, 14), datetime(2024, 2, 15, 23, 59, 59))
+
+    assert balances == [1000.0, 975.0]
+
+@freeze_time("2024-02-15 12:00:00")
+def test_get_daily_balance_empty_period(session, test_data):
+    """Test a period entirely in the future yields no data points."""
+    assert records.get_daily_balance(datetime(2024, 3, 1), datetime(2024, 3, 31)) == []
+
+def test_is_records_filter_refinement():
+    """Test narrower filters are refinements, and anything else is not."""
+    base = {"offset": 0, "offset_type": "month"}
+    refinement = records.is_records_filter_refinement
+
+    assert refinement(base, {**base, "label": "din"})
+    assert refinement({**base, "label": "din"}, {**base, "label": "Dinner"})
+    assert not refinement({**base, "label": "dinner"}, {**base, "label": "din"})
+    assert not refinement({**base, "label": "din"}, base)
+    assert refinement({**base, "label": "din fri"}, {**base, "label": "friends dinner"})
+    assert not refinement({**base, "label": "din fri"}, {**base, "label": "dinner"})
+    assert not refinement(base, {"offset": -1, "offset_type": "month"})
+    assert not refinement(base, {**base, "account_id": 1})
+
+    assert refinement({**base, "category_piped_names": "Food|Bills"}, {**base, "category_piped_names": "Food"})
+    assert not refinement({**base, "category_piped_names": "Food"}, {**base, "category_piped_names": "Food|Bills"})
+
+    assert refinement({**base, "operator_amount": ">10"}, {**base, "operator_amount": ">=20"})
+    assert refinement({**base, "operator_amount": ">=10"}, {**base, "operator_amount": ">10"})
+    assert not refinement({**base, "operator_amount": ">10"}, {**base, "operator_amount": ">=10"})
+    assert refinement({**base, "operator_amount": "<=10"}, {**base, "operator_amount": "=5"})
+    assert not refinement({**base, "operator_amount": "<10"}, {**base, "operator_amount": ">5"})
+    assert not refinement({**base, "operator_amount": "<10"}, base)
+
+def test_filter_records_matches_get_records(session, test_data):
+    """Test filtering loaded records in memory gives the same result as querying."""
+    session.add_all(
+        [
+            _record(test_data, label="Dinner out", amount=40.0, date=datetime.now()),
+            _record(test_data, label="dinner in", amount=15.0, date=datetime.now()),
+            _record(test_data, label="Lunch", amount=12.0, date=datetime.now()),
+        ]
+    )
+    session.commit()
+
+    loaded = records.get_records()
+    for filters in [
+        {"label": "dinner"},
+        {"label": "DIN  ou"},
+        {"label": "nner"},
+        {"operator_amount": ">=15"},
+        {"label": "n", "operator_amount": "<40"},
+        {"category_piped_names": "Test Category|Other", "operator_amount": "=12"},
+        {"category_piped_names": "Other"},
+    ]:
+        expected = [record.id for record in records.get_records(**filters)]
+        assert [record.id for record in records.filter_records(loaded, **filters)] == expected
+
+def test_search_records(session, test_data):
+    """Test labels are searched by word prefixes across all periods, kept in sync on writes."""
+    old = _record(test_data, label="Uber ride home", amount=20.0, date=datetime(2019, 5, 1))
+    recent = _record(test_data, label="uber Ride", amount=10.0, date=datetime(2024, 1, 1))
+    other = _record(test_data, label="Café rider", amount=5.0, date=datetime(2024, 1, 2))
+    session.add_all([old, recent, other])
+    session.commit()
+
+    assert {r.id for r in records.search_records("uber")} == {old.id, recent.id}
+    assert {r.id for r in records.search_records("rid")} == {old.id, recent.id, other.id}
+    assert [r.id for r in records.search_records("ub ri ho")] == [old.id]
+    assert [r.id for r in records.search_records("cafe")] == [other.id]
+    assert records.search_records("ber") == []
+    assert records.search_records("  -- ") == []
+
+    session.delete(old)
+    other.label = "Uber eats"
+    session.commit()
+
+    assert {r.id for r in records.search_records("uber")} == {recent.id, other.id}
+    assert records.search_records("cafe") == []
+
+def test_get_records_loads_split_totals(session, test_data):
+    """Test records are loaded with the sum of their splits."""
+    with_splits = _record(test_data, label="Shared", amount=90.0, date=datetime.now())
+    without_splits = _record(test_data, label="Alone", amount=10.0, date=datetime.now())
+    session.add_all([with_splits, without_splits])
+    session.flush()
+    session.add_all(
+        [
+            Split(recordId=with_splits.id, amount=30.0, personId=test_data["person"].id),
+            Split(recordId=with_splits.id, amount=20.5, personId=test_data["person"].id),
+        ]
+    )
+    session.commit()
+
+    totals = {record.label: record.splitTotal for record in records.get_records()}
+    assert totals == {"Shared": 50.5, "Alone": 0}
+    assert [record.splitTotal for record in records.search_records("shared")] == [50.5]
+
+def test_get_records_returns_views(session, test_data):
+    """Test records are returned as read-only views sharing their references."""
+    session.add_all(
+        [
+            _record(test_data, label="First", amount=1.0, date=datetime.now()),
+            _record(test_data, label="Second", amount=2.0, date=datetime.now()),
+        ]
+    )
+    session.commit()
+
+    first, second = records.get_records()
+    assert first.account is second.account
+    assert first.account.name == "Account 1"
+    assert first.category.name == "Test Category"
+    assert first.transferToAccount is None
+    with pytest.raises(AttributeError):
+        first.label = "Changed"
+
+def test_create_records_and_splits(session, test_data, monkeypatch):
+    """Test a batch of records and splits is created in order, with the ledgers kept in step."""
+    from bagels.managers import accounts, monthly_totals, persons
+
+    for module in (accounts, monthly_totals, persons):
+        monkeypatch.setattr(module, "Session", records.Session)
+    account_id, person_id = test_data["account1"].id, test_data["person"].id
+    accounts.rebuild_account_balances()
+
+    def entry(label, amount, splits=()):
+        record_data = {"label": label, "amount": amount, "accountId": account_id, "categoryId": test_data["category"].id, "date": datetime(2024, 3, 1)}
+        return record_data, [{"personId": person_id, "amount": split} for split in splits]
+
+    record_ids = records.create_records_and_splits(
+        [entry("First", 10.004), entry("Second", 90.0, [30.0, 20.0]), entry("Third", 5.0)]
+    )
+
+    assert [session.get(Record, record_id).label for record_id in record_ids] == ["First", "Second", "Third"]
+    assert session.get(Record, record_ids[0]).amount == 10.0
+    assert [split.amount for split in session.get(Record, record_ids[1]).splits] == [30.0, 20.0]
+    assert records.create_records_and_splits([]) == []
+
+    record = records.create_record_and_splits(*entry("Fourth", 12.0, [2.0]))
+    assert record.id == record_ids[-1] + 1
+    assert records.get_record_total_split_amount(record.id) == 2.0
+
+    assert accounts.verify_account_balances() == []
+    assert monthly_totals.verify_monthly_totals() == []
+    assert persons.get_persons_with_net_due()[0].due == 52.0
+
+def test_create_records_and_splits_applies_model_rules(session, test_data, monkeypatch):
+    """Test batched rows get the models' column defaults and validated amounts."""
+    from bagels.managers import accounts, monthly_totals, persons
+
+    for module in (accounts, monthly_totals, persons):
+        monkeypatch.setattr(module, "Session", records.Session)
+    accounts.rebuild_account_balances()
+    account1, account2 = test_data["account1"].id, test_data["account2"].id
+
+    [expense_id, transfer_id] = records.create_records_and_splits(
+        [
+            (
+                {"label": "Dinner", "amount": 60.006, "accountId": account1, "categoryId": test_data["category"].id, "date": datetime(2024, 3, 1)},
+                [
+                    {"personId": test_data["person"].id, "amount": 20.004, "isPaid": True, "accountId": account2},
+                    {"personId": test_data["person"].id, "amount": 20.0},
+                ],
+            ),
+            ({"label": "Move", "amount": 15.0, "accountId": account1, "isTransfer": True, "transferToAccountId": account2, "date": datetime(2024, 3, 2)}, []),
+        ]
+    )
+
+    expense = session.get(Record, expense_id)
+    assert expense.amount == 60.01
+    assert expense.isIncome is False and expense.isTransfer is False
+    assert expense.createdAt is not None
+    assert [(split.amount, split.isPaid) for split in expense.splits] == [(20.0, True), (20.0, False)]
+    assert session.get(Record, transfer_id).isTransfer is True
+    assert accounts.verify_account_balances() == []
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.category import Category, Nature
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.managers import accounts, samples
+
+@pytest.fixture(scope="function")
+def session(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(samples, "Session", Session)
+    monkeypatch.setattr(accounts, "Session", Session)
+    session = Session()
+    parent = Category(name="Food", nature=Nature.NEED, color="#FF0000")
+    session.add(parent)
+    session.flush()
+    session.add(Category(name="Groceries", nature=Nature.MUST, color="#FF0000", parentCategoryId=parent.id))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+def test_create_synthetic_entries(session, monkeypatch):
+    monkeypatch.setattr(samples, "SYNTHETIC_BATCH_SIZE", 300)
+
+    counts = samples.create_synthetic_entries(records=1000, accounts=2, people=3, years=1)
+
+    assert counts["records"] == 1000
+    assert session.scalar(select(func.count(Record.id))) == 1000
+    assert session.scalar(select(func.count(Split.id))) == counts["splits"] > 0
+    assert session.scalar(select(func.count(Record.id)).where(Record.isTransfer)) > 0
+    assert accounts.verify_account_balances() == []
+
+def test_create_synthetic_entries_is_reproducible(session):
+    samples.create_synthetic_entries(records=50, seed=1)
+    first = session.scalars(select(Record.amount).order_by(Record.id)).all()
+    samples.create_synthetic_entries(records=50, seed=1)
+    second = session.scalars(select(Record.amount).order_by(Record.id)).all()
+
+    assert first == second[50:]
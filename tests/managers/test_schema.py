@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.account import Account
+from bagels.models.account_balance import AccountBalance
+from bagels.models.category import Category, Nature
+from bagels.models.database import app
+from bagels.models.database.db import Base
+from bagels.models.database.migrations import (
+    SCHEMA_VERSION,
+    get_schema_meta,
+    run_migrations,
+    schema_meta,
+)
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Point init_db at an empty database file."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.db'}")
+    monkeypatch.setattr(app, "db_engine", engine)
+    monkeypatch.setattr(app, "Session", sessionmaker(bind=engine))
+    yield engine
+    engine.dispose()
+
+def test_init_db_skips_current_database(engine, monkeypatch):
+    """Test a database set up by this version is not reflected or set up again."""
+    app.init_db()
+
+    session = app.Session()
+    meta = get_schema_meta(session)
+    assert meta == {"version": str(SCHEMA_VERSION), "fingerprint": app.get_schema_fingerprint()}
+    assert session.query(Account).filter_by(name="Outside source").count() == 1
+    assert session.query(AccountBalance).count() == 1  # the ledger is built at setup
+    assert session.query(Category).count() > 0
+    session.close()
+
+    calls = []
+    monkeypatch.setattr(app, "_sync_database_schema", lambda: calls.append(1) or set())
+    app.init_db()
+    assert calls == []
+
+    # a database of another schema, or set up halfway, is set up again
+    with engine.begin() as conn:
+        conn.execute(delete(schema_meta).where(schema_meta.c.key == "fingerprint"))
+    app.init_db()
+    assert calls == [1]
+    app.init_db()
+    assert calls == [1]
+
+def test_run_migrations_once(engine):
+    """Test pending migrations run in order, and only once."""
+    Base.metadata.create_all(engine)
+    session = app.Session()
+    parent = Category(name="Parent", nature=Nature.NEED, color="red", deletedAt=datetime(2024, 1, 1))
+    session.add(parent)
+    session.flush()
+    child = Category(name="Child", nature=Nature.NEED, color="red", parentCategoryId=parent.id)
+    session.add(child)
+    session.commit()
+
+    assert run_migrations(session) == ["fix_dangling_categories"]
+    assert child.deletedAt is not None
+    assert get_schema_meta(session)["version"] == str(SCHEMA_VERSION)
+
+    child.deletedAt = None
+    session.commit()
+    assert run_migrations(session) == []
+    assert child.deletedAt is None
+    session.close()
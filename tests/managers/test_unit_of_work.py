@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import create_engine
+
+from bagels.models.database.db import Base
+from bagels.models.database.app import UnitOfWorkSessionmaker, unit_of_work
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.managers import accounts, cache, records, splits
+
+@pytest.fixture(scope="function")
+def test_db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = UnitOfWorkSessionmaker(bind=engine)
+    for module in (accounts, records, splits):
+        monkeypatch.setattr(module, "Session", Session)
+    cache.clear_cache()
+    session = Session()
+    account = Account(name="Account 1", beginningBalance=100.0)
+    category = Category(name="Food", nature=Nature.NEED, color="#FF0000")
+    session.add_all([account, category])
+    session.commit()
+    ids = {"accountId": account.id, "categoryId": category.id}
+    session.close()
+    yield ids
+    Base.metadata.drop_all(engine)
+
+def _record_data(ids, amount=10.0):
+    return {"label": "Lunch", "amount": amount, **ids}
+
+def test_unit_of_work_shares_session(test_db):
+    with unit_of_work():
+        first = accounts.Session()
+        second = records.Session()
+        first.close()
+        assert first._unit.session is second._unit.session
+
+def test_unit_of_work_commits_on_exit(test_db):
+    with unit_of_work():
+        records.create_record(_record_data(test_db))
+        # uncommitted writes are visible within the unit, bypassing the cache
+        assert len(records.get_records()) == 1
+
+    assert len(records.get_records()) == 1
+    assert accounts.get_account_balance_by_id(test_db["accountId"]) == 90.0
+
+def test_unit_of_work_rolls_back_on_error(test_db):
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            records.create_record(_record_data(test_db))
+            raise RuntimeError("failed")
+
+    assert records.get_records() == []
+    assert accounts.get_account_balance_by_id(test_db["accountId"]) == 100.0
+
+def test_create_record_and_splits_is_atomic(test_db):
+    with pytest.raises(Exception):
+        records.create_record_and_splits(
+            _record_data(test_db), [{"amount": 5.0, "personId": None, "isPaid": None}]
+        )
+
+    assert records.get_records() == []
+
+def test_nested_units_join_outer(test_db):
+    with unit_of_work():
+        records.create_record_and_splits(_record_data(test_db), [])
+        records.create_record_and_splits(_record_data(test_db, 20.0), [])
+
+    assert accounts.get_account_balance_by_id(test_db["accountId"]) == 70.0
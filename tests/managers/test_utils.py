@@ -10,6 +10,7 @@ from bagels.models.record import Record
 from bagels.models.split import Split
 from bagels.models.person import Person
 from bagels.models.category import Category, Nature
+from bagels.models.monthly_total import build_monthly_totals
 from bagels.managers import utils
 from bagels.config import CONFIG
 
@@ -209,6 +210,7 @@ def test_get_period_figures(session, test_data):
         paidDate=datetime(2024, 2, 15)
     )
     session.add(split)
+    build_monthly_totals(session)  # records were added without the managers
     session.commit()
     
     # Test income figures
@@ -231,6 +233,89 @@ def test_get_period_figures(session, test_data):
     )
     assert expenses == 350.0  # 150 (expense) + 200 (split expense after paid split)
 
+@freeze_time("2024-02-15")
+def test_get_period_figures_on_boundaries(session, test_data):
+    """Test records on the boundary of two periods count in one period only."""
+    for amount, date in [
+        (1.0, datetime(2024, 1, 1, 0, 0, 0)),
+        (10.0, datetime(2024, 1, 31, 23, 59, 59)),
+        (100.0, datetime(2024, 2, 1, 0, 0, 0)),
+        (1000.0, datetime(2024, 2, 29, 23, 59, 59)),
+        (10000.0, datetime(2024, 3, 1, 0, 0, 0)),
+    ]:
+        session.add(
+            Record(
+                label="Boundary",
+                amount=amount,
+                accountId=test_data["account1"].id,
+                categoryId=test_data["category"].id,
+                isIncome=False,
+                date=date,
+            )
+        )
+    build_monthly_totals(session)  # records were added without the managers
+    session.commit()
+
+    def figures(offset_type, offset):
+        return utils.get_period_figures(
+            offset_type=offset_type, offset=offset, isIncome=False, session=session
+        )
+
+    # months are read from the monthly totals
+    assert figures("month", -1) == 11.0
+    assert figures("month", 0) == 1100.0
+    assert figures("month", 1) == 10000.0
+    assert figures("year", 0) == 11111.0
+    # days are read from the records, bounded likewise
+    assert figures("day", -15) == 10.0  # January 31
+    assert figures("day", -14) == 100.0  # February 1
+    assert figures("day", 14) == 1000.0  # February 29
+    assert figures("day", 15) == 10000.0  # March 1
+
+@freeze_time("2024-02-15")
+def test_get_period_summary(session, test_data):
+    """Test income, expense and nature figures are aggregated in one summary."""
+    want = Category(name="Want Category", nature=Nature.WANT, color="#00FF00")
+    session.add(want)
+    session.flush()
+    session.add_all([
+        Record(label="Income", amount=1000.0, accountId=test_data["account1"].id,
+               categoryId=test_data["category"].id, isIncome=True, date=datetime(2024, 2, 1)),
+        Record(label="Need", amount=150.0, accountId=test_data["account1"].id,
+               categoryId=test_data["category"].id, date=datetime(2024, 2, 2)),
+        Record(label="Want", amount=80.0, accountId=test_data["account2"].id,
+               categoryId=want.id, date=datetime(2024, 2, 3)),
+        Record(label="Transfer", amount=300.0, accountId=test_data["account1"].id,
+               isTransfer=True, transferToAccountId=test_data["account2"].id, date=datetime(2024, 2, 4)),
+        Record(label="Last month", amount=999.0, accountId=test_data["account1"].id,
+               categoryId=want.id, date=datetime(2024, 1, 31)),
+    ])
+    split_record = Record(label="Split", amount=400.0, accountId=test_data["account1"].id,
+                          categoryId=want.id, date=datetime(2024, 2, 5))
+    session.add(split_record)
+    session.flush()
+    session.add(Split(recordId=split_record.id, amount=100.0, personId=test_data["person"].id))
+    build_monthly_totals(session)  # records were added without the managers
+    session.commit()
+
+    summary = utils.get_period_summary(offset_type="month", offset=0, session=session)
+    assert summary.income == 1000.0
+    assert summary.expense == 530.0  # 150 + 80 + (400 - 100)
+    assert summary.expense_by_nature == {Nature.WANT: 380.0, Nature.NEED: 150.0, Nature.MUST: 0}
+
+    # Matches the individual figures
+    assert summary.expense == utils.get_period_figures(offset_type="month", offset=0, isIncome=False, session=session)
+    assert utils.get_period_figures(
+        offset_type="month", offset=0, isIncome=False, nature=Nature.WANT, session=session
+    ) == 380.0
+    assert utils.get_period_figures(offset_type="month", offset=0, session=session) == 470.0
+
+    account_summary = utils.get_period_summary(
+        accountId=test_data["account2"].id, offset_type="month", offset=0, session=session
+    )
+    assert account_summary.income == 0
+    assert account_summary.expense == 80.0
+
 # Test average calculations
 def test_get_days_in_period():
     """Test days in period calculations."""
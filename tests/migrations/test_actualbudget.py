@@ -0,0 +1,129 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from bagels.managers import accounts, monthly_totals, records
+from bagels.migrations import migrate_actualbudget
+from bagels.migrations.migrate_actualbudget import (
+    BudgetToBagelsMigration,
+    rebuild_derived_data,
+)
+from bagels.models.account import Account
+from bagels.models.account_balance import AccountBalance
+from bagels.models.category import Category
+from bagels.models.database import app
+from bagels.models.record import Record
+
+# id, account, category, amount in cents, date, transfer_id, is_child, tombstone
+TRANSACTIONS = [
+    ("t1", "checking", "salary", 250000, 20240105, None, 0, 0),
+    ("t2", "checking", "food", -1250, 20240106, None, 0, 0),
+    ("t3", "checking", None, -50000, 20240107, "t4", 0, 0),
+    ("t4", "savings", None, 50000, 20240107, "t3", 0, 0),
+    ("t5", "savings", "food", -999, 20240201, None, 0, 0),
+    ("t6", "checking", None, -700, 20240202, None, 0, 0),  # uncategorized
+    ("t7", "checking", "food", -100, 20240203, None, 1, 0),  # a split of a parent
+    ("t8", "checking", "food", -100, 20240204, None, 0, 1),  # deleted
+    ("t9", "checking", "food", 0, 20240205, None, 0, 0),
+]
+
+
+def _create_budget(path):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id, name, balance_current, official_name, offbudget, closed, tombstone);
+        CREATE TABLE category_groups (id, name, is_income, tombstone);
+        CREATE TABLE categories (id, name, is_income, cat_group, tombstone);
+        CREATE TABLE v_transactions_internal (
+            id, account, category, amount, date, starting_balance_flag, transfer_id,
+            is_parent, is_child, tombstone
+        );
+        INSERT INTO accounts VALUES ('checking', 'Checking', 100000, 'Main', 0, 0, 0);
+        INSERT INTO accounts VALUES ('savings', 'Savings', 0, NULL, 0, 0, 0);
+        INSERT INTO category_groups VALUES ('income', 'Income', 1, 0);
+        INSERT INTO category_groups VALUES ('living', 'Living', 0, 0);
+        INSERT INTO categories VALUES ('salary', 'Salary', 1, 'income', 0);
+        INSERT INTO categories VALUES ('food', 'Food', 0, 'living', 0);
+    """)
+    conn.executemany(
+        "INSERT INTO v_transactions_internal VALUES (?, ?, ?, ?, ?, 0, ?, 0, ?, ?)",
+        TRANSACTIONS,
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def bagels_db(tmp_path, monkeypatch):
+    """Point the app and the managers at a new database file."""
+    path = tmp_path / "db.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(app, "db_engine", engine)
+    for module in (app, accounts, monthly_totals, records):
+        monkeypatch.setattr(module, "Session", Session)
+    app.init_db()
+    yield path, Session
+    engine.dispose()
+
+
+def test_migrate_actualbudget(tmp_path, bagels_db):
+    """Test transactions are migrated over several chunks, then the ledgers and search index are rebuilt."""
+    bagels_path, Session = bagels_db
+    budget_path = tmp_path / "budget.sqlite"
+    _create_budget(budget_path)
+
+    migrator = BudgetToBagelsMigration(str(budget_path), str(bagels_path), chunk_size=2)
+    # neither the split, the deleted transaction, nor the negative leg of the transfer
+    assert migrator.count_transactions() == 6
+    progress = []
+    migrator.migrate(on_progress=progress.append)
+    rebuild_derived_data()
+
+    assert progress == [2, 2, 2]
+    session = Session()
+    account_ids = {
+        account.name: account.id for account in session.scalars(select(Account))
+    }
+    category_names = {
+        category.id: category.name for category in session.scalars(select(Category))
+    }
+    migrated = [
+        (
+            record.date.strftime("%Y%m%d"),
+            record.amount,
+            record.accountId,
+            category_names[record.categoryId],
+            record.isIncome,
+            record.isTransfer,
+            record.transferToAccountId,
+        )
+        for record in session.scalars(select(Record).order_by(Record.date))
+    ]
+    checking, savings = account_ids["Checking"], account_ids["Savings"]
+    assert migrated == [
+        ("20240105", 2500.0, checking, "Salary", True, False, None),
+        ("20240106", 12.5, checking, "Food", False, False, None),
+        # a transfer is migrated once, from its positive leg, to the account of the other leg
+        ("20240107", 500.0, savings, "Uncategorized", False, True, checking),
+        ("20240201", 9.99, savings, "Food", False, False, None),
+        ("20240202", 7.0, checking, "Uncategorized", False, False, None),
+    ]
+
+    # the ledgers were rebuilt with the migrated records
+    assert session.query(AccountBalance).count() == len(account_ids)
+    assert accounts.verify_account_balances() == []
+    nets = dict(
+        session.execute(select(AccountBalance.accountId, AccountBalance.net)).all()
+    )
+    assert nets[checking] == 2500.0 - 12.5 + 500.0 - 7.0
+    assert nets[savings] == -500.0 - 9.99
+    assert monthly_totals.verify_monthly_totals() == []
+    assert session.execute(text("SELECT count(*) FROM record_fts")).scalar() == len(
+        migrated
+    )
+    assert [record.label for record in records.search_records("imported")] == [
+        "Imported transaction"
+    ] * len(migrated)
+    session.close()
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+import yaml
+
+from bagels import config
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    """Point the config and state files at a temporary directory, with a fresh store."""
+    config_path = tmp_path / "config.yaml"
+    state_path = tmp_path / "state.json"
+    monkeypatch.setattr(config, "config_file", lambda: config_path)
+    monkeypatch.setattr(config, "state_file", lambda: state_path)
+    monkeypatch.setattr(config, "config_cache_file", lambda: tmp_path / "config.msgpack")
+    monkeypatch.setattr(config, "_state_store", config._StateStore())
+    monkeypatch.setattr(config, "STATE_FLUSH_DELAY", 60)
+    monkeypatch.setattr(config, "CONFIG", None)
+    config.load_config()
+    return config_path, state_path
+
+
+def test_write_state_is_buffered(files):
+    """Test state changes apply at once, and are saved together on flush."""
+    config_path, state_path = files
+    config_before = config_path.read_text()
+
+    config.write_state("theme", "dracula")
+    config.write_state("budgeting.savings_percentage", 0.3)
+    config.write_state("budgeting.savings_percentage", 0.35)
+
+    assert config.CONFIG.state.theme == "dracula"
+    assert config.CONFIG.state.budgeting.savings_percentage == 0.35
+    assert not state_path.exists()
+
+    config.flush_state()
+    assert json.loads(state_path.read_text()) == {
+        "theme": "dracula",
+        "budgeting": {"savings_percentage": 0.35},
+    }
+    assert config_path.read_text() == config_before
+
+    # unchanged state is not written again
+    mtime = state_path.stat().st_mtime_ns
+    config.write_state("theme", "dracula")
+    config.flush_state()
+    assert state_path.stat().st_mtime_ns == mtime
+
+
+def test_saved_state_overrides_config_file(files):
+    """Test the saved state is loaded over the state of the config file."""
+    config_path, state_path = files
+    data = yaml.safe_load(config_path.read_text())
+    data["state"]["footer_visibility"] = False
+    data["state"]["theme"] = "nord"
+    config_path.write_text(yaml.dump(data))
+    state_path.write_text(json.dumps({"theme": "dracula"}))
+
+    config.load_config()
+
+    assert config.CONFIG.state.theme == "dracula"
+    assert config.CONFIG.state.footer_visibility is False
+
+
+def test_config_file_is_only_rewritten_when_fields_are_missing(files):
+    """Test loading a complete config file leaves it untouched."""
+    config_path, _ = files
+    mtime = config_path.stat().st_mtime_ns
+
+    config.load_config()
+    assert config_path.stat().st_mtime_ns == mtime
+
+    data = yaml.safe_load(config_path.read_text())
+    del data["symbols"]["split_paid"]
+    config_path.write_text(yaml.dump(data))
+    config.load_config()
+    assert "split_paid" in yaml.safe_load(config_path.read_text())["symbols"]
+
+
+def test_load_config_from_snapshot(files, monkeypatch):
+    """Test an unchanged config is loaded from its snapshot, and a changed one is not."""
+    config_path, _ = files
+    config.write_state("theme", "dracula")
+    config.flush_state()
+    config.load_config()  # the state file changed: loaded from the files
+
+    def fail(self):
+        raise AssertionError("the config file was read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(config.Config, "_load_yaml_config", fail)
+        config.load_config()
+    assert config.CONFIG.state.theme == "dracula"
+    assert config.CONFIG.hotkeys.home.datemode.go_to_day == "g"
+    assert isinstance(config.CONFIG.hotkeys.home, config.HomeHotkeys)
+
+    data = yaml.safe_load(config_path.read_text())
+    data["defaults"]["round_decimals"] = 3
+    config_path.write_text(yaml.dump(data))
+    config.load_config()
+    assert config.CONFIG.defaults.round_decimals == 3
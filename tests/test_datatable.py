@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from textual.app import App
+
+from bagels.components.datatable import DataTable, RowDoesNotExist, RowKey
+
+
+def run_with_table(check) -> None:
+    """Run check on a mounted table of two columns, with a regular row and three virtual
+    rows. It runs before the table renders, which would build the rows in view."""
+
+    async def run() -> None:
+        app = App()
+        async with app.run_test():
+            table = DataTable()
+            await app.mount(table)
+            table.VIRTUAL_SAMPLE_SIZE = 0  # measure no rows up front
+            table.add_columns("Name", "Amount")
+            table.add_row("Plain", 1, key="plain")
+            built = []
+
+            def source(name, amount):
+                def build():
+                    built.append(name)
+                    return name, amount
+
+                return build
+
+            for index in range(3):
+                table.add_virtual_row(
+                    source(f"Virtual {index}", index * 10), key=f"v{index}"
+                )
+            check(table, built)
+
+    asyncio.run(run())
+
+
+def test_virtual_rows_are_built_on_access():
+    """Test the cells of a virtual row are only built once, when first accessed."""
+
+    def check(table, built):
+        assert built == []
+        assert dict.__len__(table._data) == 1  # only the regular row is stored
+
+        assert list(table._data[RowKey("v1")].values()) == ["Virtual 1", 10]
+        assert built == ["Virtual 1"]
+        table._data[RowKey("v1")]
+        assert built == ["Virtual 1"]
+        assert table.get_cell("v2", table.ordered_columns[1].key) == 20
+        assert built == ["Virtual 1", "Virtual 2"]
+
+    run_with_table(check)
+
+
+def test_virtual_rows_count_and_iterate():
+    """Test virtual rows are counted and found without being built, and built to iterate."""
+
+    def check(table, built):
+        assert len(table._data) == 4
+        assert table.row_count == 4
+        assert RowKey("v0") in table._data
+        assert RowKey("missing") not in table._data
+        assert built == []
+
+        assert [key.value for key in table._data] == ["plain", "v0", "v1", "v2"]
+        assert built == ["Virtual 0", "Virtual 1", "Virtual 2"]
+        assert len(table._data) == 4
+
+    run_with_table(check)
+
+
+def test_get_row_and_update_cell_of_virtual_rows():
+    """Test rows not built yet are read and updated like any other."""
+
+    def check(table, built):
+        assert table.get_row("v0") == ["Virtual 0", 0]
+        table.update_cell("v1", table.ordered_columns[1].key, 99)
+        assert table.get_row("v1") == ["Virtual 1", 99]
+        assert built == ["Virtual 0", "Virtual 1"]
+
+    run_with_table(check)
+
+
+def test_clear_and_remove_virtual_rows():
+    """Test virtual rows are removed, built or not, and cleared with the table."""
+
+    def check(table, built):
+        table._data[RowKey("v1")]
+        table.remove_row("v1")
+        table.remove_row("v2")
+        assert [key.value for key in table.rows] == ["plain", "v0"]
+        assert len(table._data) == 2
+        assert RowKey("v2") not in table._data
+        assert built == ["Virtual 1"]  # removing a row does not build it
+        with pytest.raises(RowDoesNotExist):
+            table.remove_row("v2")
+
+        table.clear()
+        assert len(table._data) == 0
+        assert table.row_count == 0
+        table.add_virtual_row(lambda: ("Again", 1), key="v0")
+        assert table.get_row("v0") == ["Again", 1]
+
+    run_with_table(check)
@@ -0,0 +1,20 @@
+from bagels.startup import summarize_imports
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     sqlalchemy.util
+import time:      2000 |       2100 |   sqlalchemy
+import time:       500 |        500 |     textual.app
+import time:      1000 |       3600 | bagels.app
+some other output
+"""
+
+
+def test_summarize_imports():
+    """Test import times are totalled by package, and our modules by cumulative time."""
+    summary = summarize_imports(IMPORTTIME, top=2)
+
+    assert summary["modules"] == 4
+    assert summary["total"] == 3.6
+    assert summary["packages"] == {"sqlalchemy": 2.1, "bagels": 1.0}
+    assert summary["bagels"] == {"bagels.app": 3.6}
+    assert list(summary["slowest"]) == ["sqlalchemy", "bagels.app"]
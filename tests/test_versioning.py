@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from bagels import versioning
+
+
+@pytest.fixture
+def check_file(tmp_path, monkeypatch):
+    """Point the update check cache at a temporary file, and count PyPI requests."""
+    path = tmp_path / "update_check.json"
+    monkeypatch.setattr(versioning, "update_check_file", lambda: path)
+    monkeypatch.setattr(versioning, "get_current_version", lambda: "1.0.0")
+    return path
+
+
+def _fake_pypi(monkeypatch, result):
+    calls = []
+
+    def get_pypi_version(timeout=versioning.UPDATE_CHECK_TIMEOUT):
+        calls.append(timeout)
+        return result
+
+    monkeypatch.setattr(versioning, "get_pypi_version", get_pypi_version)
+    return calls
+
+
+def test_update_check_is_cached(check_file, monkeypatch):
+    """Test PyPI is asked once per TTL, and asked again once the cache is stale."""
+    calls = _fake_pypi(monkeypatch, "1.2.0")
+
+    assert versioning.get_available_update() == "1.2.0"
+    assert versioning.get_available_update() == "1.2.0"
+    assert len(calls) == 1
+
+    stale = datetime.now() - versioning.UPDATE_CHECK_TTL - timedelta(minutes=1)
+    check_file.write_text(json.dumps({"checkedAt": stale.isoformat(), "version": "1.1.0"}))
+    assert versioning.get_available_update() == "1.2.0"
+    assert len(calls) == 2
+
+
+def test_failed_update_check_is_cached(check_file, monkeypatch):
+    """Test offline checks are not retried until the TTL expires."""
+    calls = _fake_pypi(monkeypatch, None)
+
+    assert not versioning.needs_update()
+    assert not versioning.needs_update()
+    assert len(calls) == 1
+    assert json.loads(check_file.read_text())["version"] is None
+
+
+def test_update_check_ignores_bad_cache(check_file, monkeypatch):
+    """Test an unreadable cache is checked again, and older versions are no update."""
+    calls = _fake_pypi(monkeypatch, "0.9.0")
+    check_file.write_text("not json")
+
+    assert versioning.get_available_update() is None
+    assert len(calls) == 1